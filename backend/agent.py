@@ -29,6 +29,7 @@ from openai import AsyncOpenAI
 from openai import BadRequestError
 
 from client import MCPClient
+from conversation_memory import ConversationMemory
 from logger import logger
 from prompts import Prompts
 from postgres_storage import PostgreSQLConversationStorage
@@ -45,6 +46,7 @@ class State(TypedDict, total=False):
     messages: List[AnyMessage]
     chat_id: Optional[str]
     image_data: Optional[str]
+    memory_context: Optional[str]
 
 
 class ChatAgent:
@@ -57,17 +59,19 @@ class ChatAgent:
     - Manage conversation history via Redis
     """
 
-    def __init__(self, vector_store, config_manager, postgres_storage: PostgreSQLConversationStorage):
+    def __init__(self, vector_store, config_manager, postgres_storage: PostgreSQLConversationStorage, memory: Optional[ConversationMemory] = None):
         """Initialize the chat agent.
         
         Args:
             vector_store: VectorStore instance for document retrieval
             config_manager: ConfigManager for reading configuration
             postgres_storage: PostgreSQL storage for conversation persistence
+            memory: Optional semantic memory of earlier exchanges per chat
         """
         self.vector_store = vector_store
         self.config_manager = config_manager
         self.conversation_store = postgres_storage
+        self.memory = memory
         self.current_model = None
         
         self.current_model = None
@@ -83,14 +87,14 @@ class ChatAgent:
         self.last_state = None
 
     @classmethod
-    async def create(cls, vector_store, config_manager, postgres_storage: PostgreSQLConversationStorage):
+    async def create(cls, vector_store, config_manager, postgres_storage: PostgreSQLConversationStorage, memory: Optional[ConversationMemory] = None):
         """
         Asynchronously creates and initializes a ChatAgent instance.
         
         This factory method ensures that all async setup, like loading tools,
         is completed before the agent is ready to be used.
         """
-        agent = cls(vector_store, config_manager, postgres_storage)
+        agent = cls(vector_store, config_manager, postgres_storage, memory)
         await agent.init_tools()
         
         available_tools = list(agent.tools_by_name.values()) if agent.tools_by_name else []
@@ -299,6 +303,14 @@ class ChatAgent:
         full_messages = state.get("messages", [])
         model_messages = self._truncate_messages_for_model(full_messages)
         messages = convert_langgraph_messages_to_openai(model_messages)
+        if state.get("memory_context"):
+            # Chat templates such as gpt-oss only honour messages[0] as the system
+            # prompt, so the recalled text extends it instead of adding a message.
+            memory_text = f"Relevant earlier parts of this conversation:\n\n{state['memory_context']}"
+            if messages and messages[0].get("role") == "system" and isinstance(messages[0].get("content"), str):
+                messages[0] = {**messages[0], "content": f"{messages[0]['content']}\n\n{memory_text}"}
+            else:
+                messages.insert(0, {"role": "system", "content": memory_text})
         logger.debug({
             "message": "GRAPH: ENTERING NODE - generate",
             "chat_id": state.get("chat_id"),
@@ -576,8 +588,15 @@ class ChatAgent:
                     if not isinstance(msg, SystemMessage):
                         messages_to_process.append(msg)
 
+            history_base = len(messages_to_process)
             messages_to_process.append(HumanMessage(content=query_text))
 
+            memory_context = None
+            if self.memory:
+                visible = self._truncate_messages_for_model(messages_to_process)
+                visible_start = len(messages_to_process) - sum(1 for msg in visible if not isinstance(msg, SystemMessage))
+                memory_context = await self.memory.recall(chat_id, query_text, before=visible_start)
+
             config_obj = self.config_manager.read_config()
 
             initial_state = {
@@ -585,7 +604,8 @@ class ChatAgent:
                 "chat_id": chat_id,
                 "messages": messages_to_process,
                 "image_data": image_data if image_data else None,
-                "process_image_used": False
+                "process_image_used": False,
+                "memory_context": memory_context
             }
             
 
@@ -605,7 +625,7 @@ class ChatAgent:
             self.last_state = None
             token_q: asyncio.Queue[Any] = asyncio.Queue()
             self.stream_callback = lambda event: self._queue_writer(event, token_q)
-            runner = asyncio.create_task(self._run_graph(initial_state, config, chat_id, token_q))
+            runner = asyncio.create_task(self._run_graph(initial_state, config, chat_id, token_q, history_base))
 
             try:
                 while True:
@@ -639,7 +659,7 @@ class ChatAgent:
         """
         await token_q.put(event)
 
-    async def _run_graph(self, initial_state: Dict[str, Any], config: Dict[str, Any], chat_id: str, token_q: asyncio.Queue) -> None:
+    async def _run_graph(self, initial_state: Dict[str, Any], config: Dict[str, Any], chat_id: str, token_q: asyncio.Queue, history_base: Optional[int] = None) -> None:
         """Run the graph execution in background task.
         
         Args:
@@ -647,6 +667,7 @@ class ChatAgent:
             config: LangGraph configuration
             chat_id: Chat identifier
             token_q: Queue for streaming events
+            history_base: Number of stored messages the initial state was built from
         """
         try:
             async for final_state in self.graph.astream(
@@ -662,7 +683,9 @@ class ChatAgent:
                     final_msg = self.last_state["messages"][-1]
                     try:
                         logger.debug(f'Saving messages to conversation store for chat: {chat_id}')
-                        await self.conversation_store.save_messages(chat_id, self.last_state["messages"])
+                        await self.conversation_store.save_messages(chat_id, self.last_state["messages"], base_count=history_base)
+                        if self.memory and not self.conversation_store.is_deleted(chat_id):
+                            self.memory.remember_in_background(chat_id, self.last_state["messages"])
                     except Exception as save_err:
                         logger.warning({"message": "Failed to persist conversation", "chat_id": chat_id, "error": str(save_err)})
 
@@ -0,0 +1,166 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Recall@k and search latency of Milvus ANN index settings on a synthetic corpus.
+
+A clustered, normalized corpus is inserted into a scratch collection once. Each
+VectorIndexConfig under test is built on it in turn, and the same query set is
+searched one query at a time. Results are scored against exact nearest
+neighbours computed with NumPy. The scratch collection is dropped at the end.
+
+Configs are given as JSON objects in the config.json ``vector_indexes`` format:
+    uv run python benchmarks/bench_ann_index.py --vectors 100000 \\
+        --config '{"index_type": "HNSW", "build_params": {"M": 32}, "search_params": {"ef": 128}}'
+
+Without --config a default sweep over HNSW, IVF_FLAT, IVF_SQ8 and DISKANN runs.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from models import VectorIndexConfig
+
+DEFAULT_SWEEP = [
+    {"index_type": "FLAT"},
+    {"index_type": "HNSW", "build_params": {"M": 8, "efConstruction": 64}, "search_params": {"ef": 16}},
+    {"index_type": "HNSW", "build_params": {"M": 16, "efConstruction": 200}, "search_params": {"ef": 64}},
+    {"index_type": "HNSW", "build_params": {"M": 32, "efConstruction": 400}, "search_params": {"ef": 128}},
+    {"index_type": "IVF_FLAT", "search_params": {"nprobe": 8}},
+    {"index_type": "IVF_FLAT", "search_params": {"nprobe": 32}},
+    {"index_type": "IVF_SQ8", "search_params": {"nprobe": 32}},
+    {"index_type": "DISKANN", "search_params": {"search_list": 100}},
+]
+
+
+def synthetic_corpus(count: int, dimensions: int, clusters: int, seed: int) -> np.ndarray:
+    """Gaussian clusters on the unit sphere, roughly what chunk embeddings look like."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dimensions)).astype(np.float32)
+    vectors = centers[rng.integers(0, clusters, count)] + 0.35 * rng.standard_normal((count, dimensions)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_neighbours(corpus: np.ndarray, queries: np.ndarray, k: int, metric: str) -> np.ndarray:
+    """Indices of the exact top-k neighbours of each query."""
+    results = []
+    for start in range(0, len(queries), 64):
+        batch = queries[start:start + 64]
+        if metric == "L2":
+            scores = -((batch ** 2).sum(1)[:, None] - 2 * batch @ corpus.T + (corpus ** 2).sum(1)[None, :])
+        else:
+            scores = batch @ corpus.T
+        top = np.argpartition(-scores, k, axis=1)[:, :k]
+        order = np.take_along_axis(scores, top, axis=1).argsort(axis=1)[:, ::-1]
+        results.append(np.take_along_axis(top, order, axis=1))
+    return np.vstack(results)
+
+
+def create_collection(name: str, corpus: np.ndarray) -> Collection:
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    schema = CollectionSchema([
+        FieldSchema("pk", DataType.INT64, is_primary=True),
+        FieldSchema("vector", DataType.FLOAT_VECTOR, dim=corpus.shape[1]),
+    ])
+    collection = Collection(name, schema)
+    for start in range(0, len(corpus), 5000):
+        batch = corpus[start:start + 5000]
+        collection.insert([list(range(start, start + len(batch))), batch.tolist()])
+    collection.flush()
+    return collection
+
+
+def run_config(collection: Collection, config: VectorIndexConfig, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    collection.release()
+    for index in collection.indexes:
+        collection.drop_index(index_name=index.index_name)
+
+    started = time.perf_counter()
+    collection.create_index("vector", config.index_params())
+    utility.wait_for_index_building_complete(collection.name)
+    build_seconds = time.perf_counter() - started
+    collection.load()
+
+    search_params = config.milvus_search_params()
+    for query in queries[:10]:
+        collection.search([query.tolist()], "vector", search_params, limit=k)
+
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        result = collection.search([query.tolist()], "vector", search_params, limit=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len({hit.id for hit in result[0]} & set(expected.tolist()))
+
+    latencies.sort()
+    return {
+        "build_s": build_seconds,
+        "recall": hits / (len(queries) * k),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--milvus-uri", default="http://localhost:19530")
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=2560)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--metric", default="L2", choices=["L2", "IP", "COSINE"])
+    parser.add_argument("--config", action="append", default=[], help="VectorIndexConfig as JSON; repeatable")
+    parser.add_argument("--collection", default="ann_index_benchmark")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    configs = [
+        VectorIndexConfig(**{"metric_type": args.metric, **params})
+        for params in ([json.loads(raw) for raw in args.config] or DEFAULT_SWEEP)
+    ]
+
+    corpus = synthetic_corpus(args.vectors + args.queries, args.dimensions, args.clusters, args.seed)
+    corpus, queries = corpus[:args.vectors], corpus[args.vectors:]
+    truth = exact_neighbours(corpus, queries, args.k, args.metric)
+
+    connections.connect(uri=args.milvus_uri)
+    print(f"Inserting {args.vectors} x {args.dimensions}d vectors...")
+    collection = create_collection(args.collection, corpus)
+    try:
+        print(f"{'index':<10} | {'build params':<32} | {'search params':<28} | "
+              f"{'build s':>7} | {'recall@' + str(args.k):>9} | {'p50 ms':>7} | {'p99 ms':>7}")
+        for config in configs:
+            result = run_config(collection, config, queries, truth, args.k)
+            print(f"{config.index_type:<10} | {json.dumps(config.index_params()['params']):<32} | "
+                  f"{json.dumps(config.milvus_search_params()['params']):<28} | {result['build_s']:>7.1f} | "
+                  f"{result['recall']:>9.3f} | {result['p50_ms']:>7.2f} | {result['p99_ms']:>7.2f}")
+    finally:
+        utility.drop_collection(args.collection)
+        connections.disconnect("default")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measure the effect of cold-storage archiving on a synthetic chat dataset.
+
+Seeds a scratch database with synthetic chats, most of them idle, then reports
+table sizes, list_conversations latency and restore latency before and after
+archive_inactive_conversations. The scratch database is created if missing and
+its tables are truncated, so never point this at a real deployment.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_cold_storage.py --database chatbot_bench
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bench_message_codec import build_history
+from postgres_storage import PostgreSQLConversationStorage
+
+
+async def seed(storage: PostgreSQLConversationStorage, chats: int, messages: int, idle_fraction: float) -> list:
+    """Insert synthetic chats with COPY; idle ones get an old updated_at."""
+    payload = storage.codec.encode_messages(build_history(messages))
+    idle_cutoff = int(chats * idle_fraction)
+    chat_ids = [str(uuid.uuid4()) for _ in range(chats)]
+
+    now, idle_since = datetime.utcnow(), datetime(2000, 1, 1)
+    records = [
+        (chat_id, payload, messages, idle_since if i < idle_cutoff else now)
+        for i, chat_id in enumerate(chat_ids)
+    ]
+
+    async with storage.pool.acquire() as conn:
+        await conn.execute("TRUNCATE conversations CASCADE")
+        await conn.execute("ALTER TABLE conversations DISABLE TRIGGER update_conversations_updated_at")
+        try:
+            for offset in range(0, chats, 10000):
+                await conn.copy_records_to_table(
+                    "conversations",
+                    records=records[offset:offset + 10000],
+                    columns=["chat_id", "messages", "message_count", "updated_at"]
+                )
+        finally:
+            await conn.execute("ALTER TABLE conversations ENABLE TRIGGER update_conversations_updated_at")
+        await conn.execute("VACUUM ANALYZE conversations")
+    return chat_ids[:idle_cutoff]
+
+
+async def table_sizes(storage: PostgreSQLConversationStorage) -> dict:
+    async with storage.pool.acquire() as conn:
+        row = await conn.fetchrow("""
+            SELECT pg_total_relation_size('conversations') AS hot,
+                   pg_total_relation_size('conversation_archive') AS archive
+        """)
+    return {"hot_mb": row["hot"] / 2**20, "archive_mb": row["archive"] / 2**20}
+
+
+async def list_latency(storage: PostgreSQLConversationStorage, repeat: int) -> float:
+    """Median uncached list_conversations latency in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        storage._chat_list_cache = None
+        started = time.perf_counter()
+        await storage.list_conversations()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+async def restore_latency(storage: PostgreSQLConversationStorage, chat_ids: list, repeat: int) -> float:
+    """Median get_messages latency for chats that start out archived."""
+    samples = []
+    for chat_id in chat_ids[:repeat]:
+        storage._message_cache.pop(chat_id, None)
+        started = time.perf_counter()
+        await storage.get_messages(chat_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples) if samples else 0.0
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database", default="chatbot_bench")
+    parser.add_argument("--chats", type=int, default=100000)
+    parser.add_argument("--messages", type=int, default=40)
+    parser.add_argument("--idle-fraction", type=float, default=0.9)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    storage = PostgreSQLConversationStorage(
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", 5432)),
+        database=args.database,
+        user=os.getenv("POSTGRES_USER", "chatbot_user"),
+        password=os.getenv("POSTGRES_PASSWORD", "chatbot_password")
+    )
+    await storage.init_pool()
+    try:
+        print(f"Seeding {args.chats} chats x {args.messages} messages ({args.idle_fraction:.0%} idle)...")
+        idle_ids = await seed(storage, args.chats, args.messages, args.idle_fraction)
+
+        before_sizes = await table_sizes(storage)
+        before_list = await list_latency(storage, args.repeat)
+
+        started = time.perf_counter()
+        archive = await storage.archive_inactive_conversations(idle_days=30, batch_size=1000)
+        archive_seconds = time.perf_counter() - started
+
+        async with storage.pool.acquire() as conn:
+            await conn.execute("VACUUM FULL ANALYZE conversations")
+        after_sizes = await table_sizes(storage)
+        after_list = await list_latency(storage, args.repeat)
+        restore = await restore_latency(storage, idle_ids, args.repeat)
+
+        ratio = archive["raw_bytes"] / archive["compressed_bytes"] if archive["compressed_bytes"] else 0
+        print(f"archived {archive['archived']} chats in {archive_seconds:.1f}s (zstd ratio {ratio:.1f}x)")
+        print(f"{'':>22} | {'before':>10} | {'after':>10}")
+        print(f"{'conversations (MB)':>22} | {before_sizes['hot_mb']:>10.1f} | {after_sizes['hot_mb']:>10.1f}")
+        print(f"{'archive (MB)':>22} | {before_sizes['archive_mb']:>10.1f} | {after_sizes['archive_mb']:>10.1f}")
+        print(f"{'list_conversations ms':>22} | {before_list:>10.1f} | {after_list:>10.1f}")
+        print(f"restore on access (median ms): {restore:.1f}")
+    finally:
+        await storage.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Ingestion throughput of CustomEmbeddings against a local fake embedding server.
+
+The fake server speaks the OpenAI /v1/embeddings protocol, charges a fixed
+per-request latency plus a per-text cost, and returns deterministic vectors.
+The script compares one-request-per-text (the previous behaviour) with batched,
+pooled and parallel configurations and prints chunks per second. A second
+section fires concurrent retrieval queries, with repeats, and compares plain
+per-query requests with the query LRU and micro-batcher by server request count
+and p99 latency.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_embeddings.py --chunks 2000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from vector_store import CustomEmbeddings
+
+
+def make_handler(dimensions: int, request_latency: float, per_text_latency: float):
+    class FakeEmbeddingHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        requests_served = 0
+        counter_lock = threading.Lock()
+
+        def do_POST(self):
+            with self.counter_lock:
+                FakeEmbeddingHandler.requests_served += 1
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            texts = body["input"] if isinstance(body["input"], list) else [body["input"]]
+            time.sleep(request_latency + per_text_latency * len(texts))
+
+            data = []
+            for index, text in enumerate(texts):
+                seed = hashlib.sha256(text.encode("utf-8")).digest()
+                vector = [seed[i % len(seed)] / 255.0 for i in range(dimensions)]
+                data.append({"object": "embedding", "index": index, "embedding": vector})
+
+            payload = json.dumps({"object": "list", "data": data, "model": body.get("model")}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeEmbeddingHandler
+
+
+def embed_one_by_one(url: str, model: str, texts: list) -> list:
+    """The previous CustomEmbeddings behaviour: one un-pooled POST per text."""
+    embeddings = []
+    for text in texts:
+        response = requests.post(url, json={"input": text, "model": model}, headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+        embeddings.append(response.json()["data"][0]["embedding"])
+    return embeddings
+
+
+async def run_queries(embed, users: int, queries_per_user: int, questions: list) -> list:
+    """Simulate concurrent users issuing retrieval queries; returns latencies in ms."""
+    latencies = []
+
+    async def user(seed: int):
+        rng = random.Random(seed)
+        for _ in range(queries_per_user):
+            started = time.perf_counter()
+            await embed(rng.choice(questions))
+            latencies.append((time.perf_counter() - started) * 1000)
+            await asyncio.sleep(rng.random() * 0.01)
+
+    await asyncio.gather(*(user(i) for i in range(users)))
+    return sorted(latencies)
+
+
+def bench_queries(host: str, handler, users: int, queries_per_user: int, distinct: int) -> None:
+    questions = [f"How do I configure feature {i} of the vector store?" for i in range(distinct)]
+
+    print(f"\n{users} concurrent users x {queries_per_user} queries over {distinct} distinct questions")
+    for name, cache_size, use_batcher in [("per-query requests", 0, False), ("LRU + micro-batcher", 1024, True)]:
+        embeddings = CustomEmbeddings(model="fake", host=host, query_cache_size=cache_size)
+        embed = embeddings.aembed_query if use_batcher else (lambda text: embeddings._aembed_batch([text]))
+
+        async def run():
+            try:
+                return await run_queries(embed, users, queries_per_user, questions)
+            finally:
+                await embeddings.aclose()
+
+        served_before = handler.requests_served
+        latencies = asyncio.run(run())
+        server_requests = handler.requests_served - served_before
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"{name:<22} server requests {server_requests:>6}   "
+              f"p50 {statistics.median(latencies):>7.1f}ms   p99 {p99:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--dimensions", type=int, default=2560)
+    parser.add_argument("--request-latency-ms", type=float, default=5.0, help="Fixed server cost per request")
+    parser.add_argument("--per-text-latency-ms", type=float, default=1.0, help="Server cost per embedded text")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--queries-per-user", type=int, default=20)
+    parser.add_argument("--distinct-queries", type=int, default=200)
+    args = parser.parse_args()
+
+    handler = make_handler(args.dimensions, args.request_latency_ms / 1000, args.per_text_latency_ms / 1000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host = f"http://127.0.0.1:{server.server_address[1]}"
+
+    texts = [f"chunk {i}: " + "lorem ipsum dolor sit amet " * 30 for i in range(args.chunks)]
+    reference = None
+
+    configs = [("one request per text", None)] + [
+        (f"batch={batch_size:<3} concurrency={concurrency}", (batch_size, concurrency))
+        for batch_size, concurrency in [(1, 1), (16, 1), (32, 1), (32, 4), (64, 4), (64, 8)]
+    ]
+
+    print(f"{args.chunks} chunks, {args.dimensions} dims, "
+          f"{args.request_latency_ms}ms/request + {args.per_text_latency_ms}ms/text on the fake server")
+    try:
+        for name, params in configs:
+            started = time.perf_counter()
+            if params is None:
+                vectors = embed_one_by_one(f"{host}/v1/embeddings", "fake", texts)
+            else:
+                embeddings = CustomEmbeddings(model="fake", host=host, batch_size=params[0], max_concurrency=params[1])
+                vectors = embeddings.embed_documents(texts)
+                embeddings.close()
+            elapsed = time.perf_counter() - started
+
+            if reference is None:
+                reference = vectors
+            assert vectors == reference, f"{name} returned embeddings in a different order"
+            print(f"{name:<28} {args.chunks / elapsed:>10.1f} chunks/s  ({elapsed:.2f}s)")
+
+        bench_queries(host, handler, args.users, args.queries_per_user, args.distinct_queries)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Event-loop lag while documents are embedded, sync path vs. async path.
+
+A heartbeat coroutine stands in for a chat stream: it wakes every --tick-ms and
+records how late it woke up. While it runs, a batch of chunks is embedded
+against the local fake embedding server from bench_embeddings, first through
+the blocking embed_documents call (as ingestion used to do inside a coroutine)
+and then through aembed_documents. With --milvus-uri the full
+index_documents / aindex_documents paths are measured instead.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_event_loop_lag.py --chunks 1000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from langchain_core.documents import Document
+
+from bench_embeddings import make_handler
+from vector_store import CustomEmbeddings, VectorStore
+
+
+async def heartbeat(tick: float, lags: list, stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def measure(work, tick: float) -> dict:
+    lags: list = []
+    stop = asyncio.Event()
+    beat = asyncio.create_task(heartbeat(tick, lags, stop))
+    await asyncio.sleep(tick * 5)
+
+    started = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await beat
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "ticks": len(lags),
+        "p50_ms": statistics.median(lags),
+        "p99_ms": lags[int(len(lags) * 0.99) - 1] if len(lags) >= 100 else lags[-1],
+        "max_ms": lags[-1]
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--dimensions", type=int, default=2560)
+    parser.add_argument("--tick-ms", type=float, default=10.0)
+    parser.add_argument("--milvus-uri", default=None, help="Also exercise the Milvus insert path")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(args.dimensions, 0.005, 0.001))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    embeddings = CustomEmbeddings(model="fake", host=f"http://127.0.0.1:{server.server_address[1]}")
+    texts = [f"chunk {i}: " + "lorem ipsum dolor sit amet " * 30 for i in range(args.chunks)]
+
+    if args.milvus_uri:
+        store = VectorStore(embeddings=embeddings, uri=args.milvus_uri)
+        documents = [Document(page_content=text, metadata={"source": "lag-benchmark"}) for text in texts]
+
+        async def sync_path():
+            store.index_documents(documents)
+
+        async def async_path():
+            await store.aindex_documents(documents)
+    else:
+        async def sync_path():
+            embeddings.embed_documents(texts)
+
+        async def async_path():
+            await embeddings.aembed_documents(texts)
+
+    tick = args.tick_ms / 1000
+    try:
+        print(f"{args.chunks} chunks, heartbeat every {args.tick_ms}ms")
+        print(f"{'path':>8} | {'elapsed s':>9} | {'ticks':>6} | {'p50 lag ms':>10} | {'p99 lag ms':>10} | {'max lag ms':>10}")
+        for name, work in [("sync", sync_path), ("async", async_path)]:
+            result = await measure(work, tick)
+            print(f"{name:>8} | {result['elapsed_s']:>9.2f} | {result['ticks']:>6} | "
+                  f"{result['p50_ms']:>10.1f} | {result['p99_ms']:>10.1f} | {result['max_ms']:>10.1f}")
+    finally:
+        await embeddings.aclose()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
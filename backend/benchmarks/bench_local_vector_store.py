@@ -0,0 +1,170 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Local memory-mapped vector index vs. Milvus on the same synthetic corpus.
+
+Reports insert throughput, cold open time, single-query p50/p99 latency
+(unfiltered and filtered to a few sources) and recall@k against exact search.
+The Milvus side is skipped unless --milvus-uri is given; it uses the default
+HNSW VectorIndexConfig.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_local_vector_store.py --vectors 50000 --milvus-uri http://localhost:19530
+"""
+import argparse
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bench_ann_index import exact_neighbours, synthetic_corpus
+from local_vector_store import LocalVectorIndex
+from models import VectorIndexConfig
+
+
+def timed_queries(search, queries: np.ndarray, truth: np.ndarray, k: int) -> dict:
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        found = search(query)
+        latencies.append((time.perf_counter() - started) * 1000)
+        hits += len(set(found) & set(expected.tolist()))
+    latencies.sort()
+    return {
+        "recall": hits / (len(queries) * k),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[max(0, int(len(latencies) * 0.99) - 1)],
+    }
+
+
+def bench_local(corpus, sources, queries, truth, filtered_truth, selected, k) -> dict:
+    directory = tempfile.mkdtemp(prefix="local_vector_store_")
+    try:
+        index = LocalVectorIndex(directory)
+        started = time.perf_counter()
+        for start in range(0, len(corpus), 5000):
+            batch = corpus[start:start + 5000]
+            index.add(
+                ["chunk"] * len(batch),
+                batch,
+                [{"source": sources[i], "task_id": "bench"} for i in range(start, start + len(batch))]
+            )
+        insert_s = time.perf_counter() - started
+        index.close()
+
+        started = time.perf_counter()
+        index = LocalVectorIndex(directory)
+        open_s = time.perf_counter() - started
+
+        result = {"insert_per_s": len(corpus) / insert_s, "open_s": open_s}
+        result["all"] = timed_queries(lambda q: [row for row, _ in index.search(q, k)], queries, truth, k)
+        result["filtered"] = timed_queries(
+            lambda q: [row for row, _ in index.search(q, k, selected)], queries, filtered_truth, k
+        )
+        index.close()
+        return result
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def bench_milvus(uri, corpus, sources, queries, truth, filtered_truth, selected, k) -> dict:
+    from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
+
+    connections.connect(uri=uri)
+    name = "local_vector_store_benchmark"
+    if utility.has_collection(name):
+        utility.drop_collection(name)
+    schema = CollectionSchema([
+        FieldSchema("pk", DataType.INT64, is_primary=True),
+        FieldSchema("source", DataType.VARCHAR, max_length=256, is_partition_key=True),
+        FieldSchema("vector", DataType.FLOAT_VECTOR, dim=corpus.shape[1]),
+    ])
+    collection = Collection(name, schema, num_partitions=64)
+    config = VectorIndexConfig()
+    try:
+        started = time.perf_counter()
+        for start in range(0, len(corpus), 5000):
+            batch = corpus[start:start + 5000]
+            collection.insert([list(range(start, start + len(batch))), sources[start:start + len(batch)], batch.tolist()])
+        collection.flush()
+        collection.create_index("vector", config.index_params())
+        utility.wait_for_index_building_complete(name)
+        insert_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        collection.load()
+        open_s = time.perf_counter() - started
+
+        params = config.milvus_search_params()
+        expr = f"source in {selected!r}".replace("'", '"')
+
+        def search(query, expr=None):
+            return [hit.id for hit in collection.search([query.tolist()], "vector", params, limit=k, expr=expr)[0]]
+
+        result = {"insert_per_s": len(corpus) / insert_s, "open_s": open_s}
+        result["all"] = timed_queries(search, queries, truth, k)
+        result["filtered"] = timed_queries(lambda q: search(q, expr), queries, filtered_truth, k)
+        return result
+    finally:
+        utility.drop_collection(name)
+        connections.disconnect("default")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=50000)
+    parser.add_argument("--dimensions", type=int, default=2560)
+    parser.add_argument("--sources", type=int, default=50)
+    parser.add_argument("--selected-sources", type=int, default=3)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=8)
+    parser.add_argument("--milvus-uri", default=None)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.vectors + args.queries, args.dimensions, 200, seed=7)
+    corpus, queries = corpus[:args.vectors], corpus[args.vectors:]
+    sources = [f"source-{i % args.sources}.pdf" for i in range(args.vectors)]
+    selected = [f"source-{i}.pdf" for i in range(args.selected_sources)]
+
+    truth = exact_neighbours(corpus, queries, args.k, "L2")
+    in_selected = np.array([source in selected for source in sources])
+    filtered_rows = np.flatnonzero(in_selected)
+    filtered_truth = filtered_rows[exact_neighbours(corpus[filtered_rows], queries, args.k, "L2")]
+
+    results = {"local": bench_local(corpus, sources, queries, truth, filtered_truth, selected, args.k)}
+    if args.milvus_uri:
+        results["milvus"] = bench_milvus(args.milvus_uri, corpus, sources, queries, truth, filtered_truth, selected, args.k)
+
+    print(f"{args.vectors} x {args.dimensions}d vectors, {args.sources} sources, "
+          f"filtered queries select {args.selected_sources}")
+    print(f"{'backend':>8} | {'insert/s':>9} | {'open s':>7} | {'scope':>8} | "
+          f"{'recall@' + str(args.k):>9} | {'p50 ms':>7} | {'p99 ms':>7}")
+    for backend, result in results.items():
+        for scope in ("all", "filtered"):
+            row = result[scope]
+            print(f"{backend:>8} | {result['insert_per_s']:>9.0f} | {result['open_s']:>7.2f} | {scope:>8} | "
+                  f"{row['recall']:>9.3f} | {row['p50_ms']:>7.2f} | {row['p99_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
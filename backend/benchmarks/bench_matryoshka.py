@@ -0,0 +1,115 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Index size, search latency and recall of truncated (Matryoshka) Qwen3 embeddings.
+
+Chunks a directory of documents the same way ingestion does and embeds every
+chunk once at full size with the running embedding server. Each truncated
+size is then derived with CustomEmbeddings.truncate. Recall@k is measured
+against the full-size ranking, and index size and latency come from a
+LocalVectorIndex built per size.
+
+Queries come from --queries-file (one per line); otherwise the first sentence
+of randomly chosen chunks is used.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_matryoshka.py --corpus-dir uploads --dimensions 2560 1024 512 256
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bench_ann_index import exact_neighbours
+from bench_local_vector_store import timed_queries
+from local_vector_store import LocalVectorIndex
+from vector_store import CustomEmbeddings
+
+
+def read_corpus(directory: str) -> list:
+    texts = []
+    for path in sorted(Path(directory).rglob("*")):
+        if not path.is_file():
+            continue
+        if path.suffix.lower() == ".pdf":
+            from pypdf import PdfReader
+            texts.append("\n\n".join(page.extract_text() or "" for page in PdfReader(str(path)).pages))
+        else:
+            texts.append(path.read_text(encoding="utf-8", errors="ignore"))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return [chunk for text in texts for chunk in splitter.split_text(text) if chunk.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus-dir", required=True)
+    parser.add_argument("--queries-file", default=None)
+    parser.add_argument("--queries", type=int, default=200, help="Sampled queries when no --queries-file is given")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[2560, 2048, 1024, 512, 256, 128])
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    chunks = read_corpus(args.corpus_dir)
+    if args.queries_file:
+        queries = [line.strip() for line in open(args.queries_file, encoding="utf-8") if line.strip()]
+    else:
+        rng = random.Random(7)
+        queries = [chunk.split(". ")[0][:200] for chunk in rng.sample(chunks, min(args.queries, len(chunks)))]
+
+    embeddings = CustomEmbeddings.from_env(model=os.getenv("EMBEDDING_MODEL", "qwen3-embedding-custom"))
+    embeddings.dimensions = None
+    try:
+        print(f"Embedding {len(chunks)} chunks and {len(queries)} queries at full size...")
+        full_chunks = np.asarray(embeddings.embed_documents(chunks), dtype=np.float32)
+        full_queries = np.asarray(embeddings.embed_documents(queries), dtype=np.float32)
+    finally:
+        embeddings.close()
+
+    full_size = full_chunks.shape[1]
+    truth = exact_neighbours(full_chunks, full_queries, args.k, "L2")
+
+    print(f"{'dims':>6} | {'index MB':>9} | {'vs full':>7} | {'recall@' + str(args.k):>9} | {'p50 ms':>7} | {'p99 ms':>7}")
+    for dimensions in sorted({min(d, full_size) for d in args.dimensions}, reverse=True):
+        corpus = np.asarray(CustomEmbeddings.truncate(full_chunks.tolist(), dimensions), dtype=np.float32)
+        query_vectors = np.asarray(CustomEmbeddings.truncate(full_queries.tolist(), dimensions), dtype=np.float32)
+
+        directory = tempfile.mkdtemp(prefix="matryoshka_bench_")
+        try:
+            index = LocalVectorIndex(directory)
+            for start in range(0, len(corpus), 5000):
+                batch = corpus[start:start + 5000]
+                index.add(["chunk"] * len(batch), batch, [{"source": "bench"}] * len(batch))
+            size = index.stats()["vector_bytes"]
+            result = timed_queries(lambda q: [row for row, _ in index.search(q, args.k)], query_vectors, truth, args.k)
+            index.close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        print(f"{dimensions:>6} | {size / 2**20:>9.1f} | {full_size / dimensions:>6.1f}x | "
+              f"{result['recall']:>9.3f} | {result['p50_ms']:>7.2f} | {result['p99_ms']:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
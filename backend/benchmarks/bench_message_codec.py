@@ -0,0 +1,93 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Micro-benchmark of conversation serialization: json + dicts vs. MessageCodec.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_message_codec.py
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from message_codec import MessageCodec
+
+
+def build_history(size: int) -> list:
+    """Build a synthetic chat with a mix of user, assistant and tool messages."""
+    messages = [SystemMessage(content="You are a helpful assistant. " * 20)]
+    for i in range(size - 1):
+        kind = i % 4
+        if kind == 0:
+            messages.append(HumanMessage(content=f"질문 {i}: how do I configure the vector store? " * 3))
+        elif kind == 1:
+            messages.append(AIMessage(
+                content="",
+                tool_calls=[{"name": "search_documents", "args": {"query": f"question {i}"}, "id": f"call_{i}"}]
+            ))
+        elif kind == 2:
+            messages.append(ToolMessage(content=f"Retrieved context {i}. " * 40, tool_call_id=f"call_{i}", name="search_documents"))
+        else:
+            messages.append(AIMessage(content=f"Here is the answer to question {i}. " * 30))
+    return messages
+
+
+def baseline_encode(codec: MessageCodec, messages: list) -> str:
+    return json.dumps([codec.to_dict(msg) for msg in messages])
+
+
+def baseline_decode(codec: MessageCodec, payload: str) -> list:
+    return [codec.from_dict(data) for data in json.loads(payload)]
+
+
+def bench(func, number: int) -> float:
+    """Return the best per-call time in microseconds."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'messages':>8} | {'json enc':>10} | {'codec cold':>10} | {'codec warm':>10} | {'json dec':>10} | {'codec dec':>10}  (us/call)")
+    for size in args.sizes:
+        messages = build_history(size)
+        number = max(1, 2000 // size)
+
+        codec = MessageCodec(memo_size=size * 2)
+        json_payload = baseline_encode(codec, messages)
+        codec_payload = codec.encode_messages(messages)
+        assert json.loads(json_payload) == json.loads(codec_payload)
+
+        json_enc = bench(lambda: baseline_encode(codec, messages), number)
+        cold_enc = bench(lambda: MessageCodec(memo_size=size * 2).encode_messages(messages), number)
+        warm_enc = bench(lambda: codec.encode_messages(messages), number)
+        json_dec = bench(lambda: baseline_decode(codec, json_payload), number)
+        codec_dec = bench(lambda: codec.decode_messages(codec_payload), number)
+
+        print(f"{size:>8} | {json_enc:>10.1f} | {cold_enc:>10.1f} | {warm_enc:>10.1f} | {json_dec:>10.1f} | {codec_dec:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Memory, recall and latency of quantized first-pass search with rescoring.
+
+One synthetic corpus is written to a LocalVectorIndex. The same files are
+then reopened with float32, int8 and binary first passes at several rescore
+factors. For each setting the script reports the bytes scanned per query
+(what has to stay resident), recall@k against exact search, and p50/p99
+latency.
+
+Milvus quantized indexes with rescoring (IVF_SQ8 / IVF_PQ plus
+rescore_factor in config.json vector_indexes) can be compared with
+bench_ann_index.py.
+
+Run from the backend directory:
+    uv run python benchmarks/bench_quantization.py --vectors 100000
+"""
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from bench_ann_index import exact_neighbours, synthetic_corpus
+from bench_local_vector_store import timed_queries
+from local_vector_store import LocalVectorIndex
+
+SETTINGS = [("none", 1), ("int8", 1), ("int8", 2), ("int8", 4), ("binary", 4), ("binary", 10), ("binary", 20)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vectors", type=int, default=100000)
+    parser.add_argument("--dimensions", type=int, default=2560)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=8)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.vectors + args.queries, args.dimensions, 200, seed=7)
+    corpus, queries = corpus[:args.vectors], corpus[args.vectors:]
+    truth = exact_neighbours(corpus, queries, args.k, "L2")
+
+    directory = tempfile.mkdtemp(prefix="quantization_bench_")
+    try:
+        index = LocalVectorIndex(directory)
+        for start in range(0, args.vectors, 5000):
+            batch = corpus[start:start + 5000]
+            index.add(["chunk"] * len(batch), batch, [{"source": "bench", "task_id": "bench"}] * len(batch))
+        index.close()
+
+        print(f"{args.vectors} x {args.dimensions}d vectors, k={args.k}")
+        print(f"{'first pass':>10} | {'rescore x':>9} | {'scanned MB':>10} | {'vs f32':>6} | "
+              f"{'recall@' + str(args.k):>9} | {'p50 ms':>7} | {'p99 ms':>7}")
+        baseline = None
+        for quantization, factor in SETTINGS:
+            index = LocalVectorIndex(directory, quantization=quantization, rescore_factor=factor)
+            stats = index.stats()
+            scanned = stats["quantized_bytes"] if quantization != "none" else stats["vector_bytes"]
+            baseline = baseline or scanned
+            result = timed_queries(lambda q: [row for row, _ in index.search(q, args.k)], queries, truth, args.k)
+            print(f"{quantization:>10} | {factor:>9} | {scanned / 2**20:>10.1f} | {baseline / scanned:>5.0f}x | "
+                  f"{result['recall']:>9.3f} | {result['p50_ms']:>7.2f} | {result['p99_ms']:>7.2f}")
+            index.close()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
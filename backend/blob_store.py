@@ -0,0 +1,117 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Content-addressed filesystem store for uploaded image bytes."""
+
+import hashlib
+import os
+import tempfile
+import time
+from typing import List, Tuple
+
+from logger import logger
+
+
+class BlobStore:
+    """Stores each distinct payload once, in a file named by its SHA-256 digest.
+
+    Only the bytes live here; reference counts and other metadata are kept by
+    PostgreSQLConversationStorage so identical uploads share a single file.
+    """
+
+    def __init__(self, root_dir: str):
+        """Initialize the blob store.
+
+        Args:
+            root_dir: Directory where blobs are written
+        """
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        """Return the hex SHA-256 digest used as the blob key."""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def file_name_for(sha256: str, extension: str = "") -> str:
+        """Return the file name for a blob with the given digest and extension."""
+        return f"{sha256}{extension.lower()}"
+
+    def path_for(self, file_name: str) -> str:
+        """Return the absolute path of a stored blob."""
+        return os.path.abspath(os.path.join(self.root_dir, os.path.basename(file_name)))
+
+    def write(self, file_name: str, data: bytes) -> bool:
+        """Write a blob unless it is already present.
+
+        Data goes to a temporary file first and is renamed into place so readers
+        never observe a partially written blob.
+
+        Returns:
+            True if the file was written, False if it already existed
+        """
+        path = self.path_for(file_name)
+        if os.path.exists(path):
+            return False
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        logger.debug({
+            "message": "Stored new blob",
+            "file_name": file_name,
+            "size_bytes": len(data)
+        })
+        return True
+
+    def exists(self, file_name: str) -> bool:
+        """Check whether a blob file is present on disk."""
+        return os.path.exists(self.path_for(file_name))
+
+    def remove(self, file_name: str) -> int:
+        """Delete a blob file and return the bytes freed (0 if it was already gone)."""
+        path = self.path_for(file_name)
+        try:
+            size_bytes = os.path.getsize(path)
+            os.remove(path)
+            return size_bytes
+        except FileNotFoundError:
+            return 0
+
+    def list_files(self, older_than: float = 0) -> List[Tuple[str, int]]:
+        """List stored files last modified more than ``older_than`` seconds ago.
+
+        Returns:
+            (file_name, size_bytes) pairs, including leftover temporary files
+        """
+        cutoff = time.time() - older_than
+        files = []
+        with os.scandir(self.root_dir) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                if stat.st_mtime < cutoff:
+                    files.append((entry.name, stat.st_size))
+        return files
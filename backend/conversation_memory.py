@@ -0,0 +1,248 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Per-chat semantic memory of past exchanges, stored in Milvus."""
+
+import asyncio
+import json
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_milvus import Milvus
+from pymilvus import connections
+
+from logger import logger
+from models import VectorIndexConfig
+
+
+class ConversationMemory:
+    """Embeds completed user/assistant exchanges and recalls the relevant ones.
+
+    The model only sees the most recent part of a chat. Every finished exchange
+    is embedded in the background after the turn is saved, and on the next turn
+    the exchanges most similar to the new question, from before the visible
+    window, are offered back to the model within a token budget.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        uri: str = "http://milvus:19530",
+        collection_name: str = "conversation_memory",
+        top_k: int = 4,
+        token_budget: int = 1500,
+        max_exchange_chars: int = 2000,
+        index_config: Optional[VectorIndexConfig] = None,
+        connection_alias: Optional[str] = None,
+        max_cached_chats: int = 1024
+    ):
+        """Initialize the memory store.
+
+        Args:
+            embeddings: Embedding model, normally the VectorStore's CustomEmbeddings
+            uri: Milvus connection URI
+            collection_name: Milvus collection holding the exchanges
+            top_k: Maximum number of exchanges recalled per turn
+            token_budget: Approximate token budget for recalled text (4 chars per token)
+            max_exchange_chars: Exchanges are cut to this length before embedding
+            index_config: ANN index and search settings for the collection
+            connection_alias: Open Milvus connection to reuse, normally the
+                VectorStore's; ``uri`` is only used when it is not given
+            max_cached_chats: Chats whose stored positions are kept in process;
+                older ones are reloaded from Milvus when needed again
+        """
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.max_exchange_chars = max_exchange_chars
+        self.max_cached_chats = max_cached_chats
+        self._indexed: "OrderedDict[str, Set[int]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        index_kwargs = {}
+        if index_config is not None:
+            index_kwargs = {
+                "index_params": index_config.index_params(),
+                "search_params": index_config.milvus_search_params()
+            }
+        connection_args = {"uri": uri}
+        if connection_alias is not None:
+            # langchain-milvus reuses an open connection whose address matches.
+            address = connections.get_connection_addr(connection_alias).get("address")
+            if address:
+                connection_args = {"address": address}
+        self._store = Milvus(
+            embedding_function=embeddings,
+            collection_name=collection_name,
+            connection_args=connection_args,
+            auto_id=True,
+            **index_kwargs
+        )
+        if connection_alias is not None and self._store.alias != connection_alias:
+            logger.warning({
+                "message": "Conversation memory opened its own Milvus connection",
+                "expected_alias": connection_alias,
+                "alias": self._store.alias
+            })
+
+    @staticmethod
+    def _text(message: BaseMessage) -> str:
+        content = message.content
+        if isinstance(content, str):
+            return content.strip()
+        return json.dumps(content, ensure_ascii=False)
+
+    def _exchanges(self, messages: List[BaseMessage]) -> List[Tuple[int, str]]:
+        """Pair each user message with the final assistant answer that follows it.
+
+        Returns:
+            (position of the user message, exchange text) pairs
+        """
+        exchanges = []
+        user_position, user_text, answer = None, None, None
+
+        def close():
+            if user_position is not None and answer:
+                text = f"User: {user_text}\nAssistant: {answer}"
+                exchanges.append((user_position, text[:self.max_exchange_chars]))
+
+        for position, message in enumerate(messages):
+            if isinstance(message, HumanMessage):
+                close()
+                user_position, user_text, answer = position, self._text(message), None
+            elif isinstance(message, AIMessage) and not message.tool_calls and self._text(message):
+                answer = self._text(message)
+        close()
+        return exchanges
+
+    @staticmethod
+    def _filter(chat_id: str, before: Optional[int] = None) -> str:
+        expr = f'chat_id == {json.dumps(chat_id)}'
+        if before is not None:
+            expr += f" && position < {int(before)}"
+        return expr
+
+    def _indexed_positions(self, chat_id: str) -> Set[int]:
+        """Positions already stored for a chat; loaded from Milvus on first use and
+        kept for the ``max_cached_chats`` most recently used chats."""
+        if chat_id in self._indexed:
+            self._indexed.move_to_end(chat_id)
+            return self._indexed[chat_id]
+
+        positions: Set[int] = set()
+        if self._store.col is not None:
+            rows = self._store.col.query(expr=self._filter(chat_id), output_fields=["position"])
+            positions = {row["position"] for row in rows}
+        self._indexed[chat_id] = positions
+        while len(self._indexed) > self.max_cached_chats:
+            self._indexed.popitem(last=False)
+        return positions
+
+    def _remember_sync(self, chat_id: str, messages: List[BaseMessage]) -> int:
+        indexed = self._indexed_positions(chat_id)
+        pending = [(pos, text) for pos, text in self._exchanges(messages) if pos not in indexed]
+        if not pending:
+            return 0
+
+        self._store.add_texts(
+            texts=[text for _, text in pending],
+            metadatas=[{"chat_id": chat_id, "position": pos} for pos, _ in pending]
+        )
+        indexed.update(pos for pos, _ in pending)
+        return len(pending)
+
+    async def remember(self, chat_id: str, messages: List[BaseMessage]) -> int:
+        """Embed and store exchanges of a chat that are not in memory yet.
+
+        Returns:
+            Number of exchanges added
+        """
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._lock_users[chat_id] = self._lock_users.get(chat_id, 0) + 1
+        try:
+            async with lock:
+                return await asyncio.to_thread(self._remember_sync, chat_id, list(messages))
+        finally:
+            self._lock_users[chat_id] -= 1
+            if not self._lock_users[chat_id]:
+                del self._lock_users[chat_id]
+                self._locks.pop(chat_id, None)
+
+    def remember_in_background(self, chat_id: str, messages: List[BaseMessage]) -> None:
+        """Schedule remember() without waiting for the embedding round trips."""
+        task = asyncio.create_task(self._remember_logged(chat_id, messages))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _remember_logged(self, chat_id: str, messages: List[BaseMessage]) -> None:
+        try:
+            added = await self.remember(chat_id, messages)
+            if added:
+                logger.debug({"message": "Stored conversation memory", "chat_id": chat_id, "exchanges": added})
+        except Exception as e:
+            logger.warning({"message": "Failed to store conversation memory", "chat_id": chat_id, "error": str(e)})
+
+    def _recall_sync(self, chat_id: str, query: str, before: int) -> List[Tuple[int, str]]:
+        results = self._store.similarity_search_with_score(
+            query,
+            k=self.top_k,
+            expr=self._filter(chat_id, before)
+        )
+
+        budget = self.token_budget * 4
+        selected = []
+        for doc, _score in results:
+            if len(doc.page_content) > budget:
+                continue
+            selected.append((doc.metadata["position"], doc.page_content))
+            budget -= len(doc.page_content)
+        return sorted(selected)
+
+    async def recall(self, chat_id: str, query: str, before: int) -> Optional[str]:
+        """Return the earlier exchanges most relevant to ``query``, oldest first.
+
+        Args:
+            chat_id: Chat identifier
+            query: The new user message
+            before: Only exchanges starting before this history position are
+                considered, i.e. the ones the model can no longer see
+
+        Returns:
+            Formatted memory text, or None if nothing relevant was found
+        """
+        if before <= 1:
+            return None
+        try:
+            selected = await asyncio.to_thread(self._recall_sync, chat_id, query, before)
+        except Exception as e:
+            logger.warning({"message": "Conversation memory recall failed", "chat_id": chat_id, "error": str(e)})
+            return None
+
+        if not selected:
+            return None
+        logger.debug({"message": "Recalled conversation memory", "chat_id": chat_id, "positions": [pos for pos, _ in selected]})
+        return "\n\n".join(text for _, text in selected)
+
+    async def forget(self, chat_ids: List[str]) -> None:
+        """Remove the memory of deleted chats."""
+        for chat_id in chat_ids:
+            self._indexed.pop(chat_id, None)
+            self._locks.pop(chat_id, None)
+        if self._store.col is None or not chat_ids:
+            return
+        expr = f"chat_id in {json.dumps(list(chat_ids))}"
+        await asyncio.to_thread(self._store.col.delete, expr)
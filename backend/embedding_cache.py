@@ -0,0 +1,209 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Persistent SQLite cache of chunk embeddings keyed by model and content hash."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Callable, Dict, List, Optional
+
+from logger import logger
+
+
+class EmbeddingCache:
+    """Stores chunk vectors on local disk so unchanged chunks are never re-embedded.
+
+    Entries are keyed by (embedding model, SHA-256 of the chunk text) and stored
+    as float32 blobs. The database runs in WAL mode so the backend and the RAG
+    MCP server can share one file.
+
+    The cache is bounded: entries older than ``max_age_days`` are pruned when it
+    opens, and once it holds more than ``max_entries`` the oldest are dropped
+    down to 90% of the limit. Pruned chunks are simply re-embedded when next
+    ingested. Deleting the file clears the cache.
+    """
+
+    def __init__(self, path: str, lookup_batch_size: int = 500, max_entries: int = 100000, max_age_days: float = 0):
+        """Open or create the cache database.
+
+        Args:
+            path: SQLite file path; parent directories are created
+            lookup_batch_size: Maximum hashes per SELECT ... IN query
+            max_entries: Maximum number of cached vectors; 0 disables the limit
+            max_age_days: Age after which entries are pruned; 0 keeps them
+        """
+        self.path = path
+        self.lookup_batch_size = lookup_batch_size
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                model TEXT NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at INTEGER DEFAULT (strftime('%s', 'now')),
+                PRIMARY KEY (model, chunk_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunk_embeddings_created_at ON chunk_embeddings (created_at)")
+        self._conn.commit()
+        self._entries = self._conn.execute("SELECT COUNT(*) FROM chunk_embeddings").fetchone()[0]
+        self.prune()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Return the content hash used as the cache key."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        """Look up cached vectors for the given chunk hashes."""
+        found: Dict[str, List[float]] = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            for start in range(0, len(unique), self.lookup_batch_size):
+                batch = unique[start:start + self.lookup_batch_size]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT chunk_hash, vector FROM chunk_embeddings WHERE model = ? AND chunk_hash IN ({placeholders})",
+                    [model, *batch]
+                ).fetchall()
+                for chunk_hash, blob in rows:
+                    found[chunk_hash] = array("f", blob).tolist()
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        """Store vectors by chunk hash; existing entries are kept."""
+        if not vectors:
+            return
+        rows = [
+            (model, chunk_hash, len(vector), array("f", vector).tobytes())
+            for chunk_hash, vector in vectors.items()
+        ]
+        with self._lock:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO chunk_embeddings (model, chunk_hash, dimensions, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+            self._entries += max(cursor.rowcount, 0)
+        if self.max_entries and self._entries > self.max_entries:
+            self.prune()
+
+    def prune(self) -> int:
+        """Drop entries past ``max_age_days`` and the oldest beyond ``max_entries``.
+
+        Returns:
+            Number of entries removed
+        """
+        removed = 0
+        with self._lock:
+            if self.max_age_days:
+                removed += self._conn.execute(
+                    "DELETE FROM chunk_embeddings WHERE created_at < strftime('%s', 'now') - ?",
+                    (int(self.max_age_days * 86400),)
+                ).rowcount
+            # Other processes may share the file, so recount before trimming.
+            self._entries = self._conn.execute("SELECT COUNT(*) FROM chunk_embeddings").fetchone()[0]
+            if self.max_entries and self._entries > self.max_entries:
+                removed += self._conn.execute("""
+                    DELETE FROM chunk_embeddings
+                    WHERE (model, chunk_hash) IN (
+                        SELECT model, chunk_hash FROM chunk_embeddings
+                        ORDER BY created_at
+                        LIMIT ?
+                    )
+                """, (self._entries - int(self.max_entries * 0.9),)).rowcount
+                self._entries = self._conn.execute("SELECT COUNT(*) FROM chunk_embeddings").fetchone()[0]
+            self._conn.commit()
+
+        if removed:
+            logger.info({
+                "message": "Pruned chunk embedding cache",
+                "removed": removed,
+                "entries": self._entries
+            })
+        return removed
+
+    def embed(self, model: str, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """Return vectors for ``texts``, calling ``embed_fn`` only for unseen chunks."""
+        hashes = [self.hash_text(text) for text in texts]
+        cached = self.get_many(model, hashes)
+
+        missing: Dict[str, str] = {}
+        for chunk_hash, text in zip(hashes, texts):
+            if chunk_hash not in cached:
+                missing.setdefault(chunk_hash, text)
+
+        self.record(hits=len(texts) - sum(1 for h in hashes if h in missing), misses=len(missing))
+
+        if missing:
+            fresh = dict(zip(missing.keys(), embed_fn(list(missing.values()))))
+            self.put_many(model, fresh)
+            cached.update(fresh)
+
+        logger.debug({
+            "message": "Chunk embedding cache lookup",
+            "chunks": len(texts),
+            "embedded": len(missing)
+        })
+        return [cached[chunk_hash] for chunk_hash in hashes]
+
+    def record(self, hits: int, misses: int) -> None:
+        """Add to the hit and miss counters."""
+        self._hits += hits
+        self._misses += misses
+
+    def get_stats(self) -> Dict[str, int]:
+        """Hit and miss counters since startup, and the current entry count."""
+        return {"hits": self._hits, "misses": self._misses, "entries": self._entries}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def default_embedding_cache() -> Optional[EmbeddingCache]:
+    """Open the cache at EMBEDDING_CACHE_PATH; an empty value disables it.
+
+    EMBEDDING_CACHE_MAX_ENTRIES and EMBEDDING_CACHE_MAX_AGE_DAYS bound its size.
+    """
+    path = os.getenv(
+        "EMBEDDING_CACHE_PATH",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache", "chunks.sqlite3")
+    )
+    if not path:
+        return None
+    try:
+        return EmbeddingCache(
+            path,
+            max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 100000)),
+            max_age_days=float(os.getenv("EMBEDDING_CACHE_MAX_AGE_DAYS", 0))
+        )
+    except Exception as e:
+        logger.warning(f"Chunk embedding cache disabled: {e}")
+        return None
@@ -0,0 +1,154 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""BM25 lexical index of document chunks on SQLite FTS5."""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from logger import logger
+
+TOKEN_PATTERN = re.compile(r"[\w\-./]+", re.UNICODE)
+
+
+class LexicalIndex:
+    """Full-text index of chunk texts ranked with BM25.
+
+    Rows are keyed by the chunk's Milvus primary key, so lexical hits can be
+    fused with dense hits. Tokens keep ``-``, ``_``, ``.`` and ``/`` so part
+    numbers and identifiers stay whole, and query terms are prefix matches so
+    Korean nouns match with particles attached (``삼성전자`` matches ``삼성전자의``).
+    """
+
+    def __init__(self, path: str):
+        """Open or create the index database.
+
+        Args:
+            path: SQLite file path; parent directories are created
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5(
+                text,
+                chunk_id UNINDEXED,
+                source UNINDEXED,
+                task_id UNINDEXED,
+                metadata UNINDEXED,
+                tokenize = "unicode61 remove_diacritics 2 tokenchars '-_./'"
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def build_query(text: str) -> Optional[str]:
+        """Turn free text into an FTS5 OR-query of quoted prefix terms."""
+        terms = dict.fromkeys(token.lower() for token in TOKEN_PATTERN.findall(text))
+        if not terms:
+            return None
+        return " OR ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def add(self, chunk_ids: List[Any], texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Index chunks under their Milvus primary keys."""
+        rows = [
+            (text, str(chunk_id), metadata.get("source"), metadata.get("task_id"), json.dumps(metadata, ensure_ascii=False))
+            for chunk_id, text, metadata in zip(chunk_ids, texts, metadatas)
+        ]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO chunks (text, chunk_id, source, task_id, metadata) VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def search(self, query: str, k: int, sources: Optional[List[str]] = None) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """Return up to ``k`` (chunk_id, text, metadata) tuples, best BM25 score first."""
+        match = self.build_query(query)
+        if match is None:
+            return []
+
+        sql = "SELECT chunk_id, text, metadata FROM chunks WHERE chunks MATCH ?"
+        params: List[Any] = [match]
+        if sources:
+            sql += f" AND source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        sql += " ORDER BY bm25(chunks) LIMIT ?"
+        params.append(k)
+
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                logger.warning({"message": "Lexical search failed", "query": query, "error": str(e)})
+                return []
+        return [(chunk_id, text, json.loads(metadata)) for chunk_id, text, metadata in rows]
+
+    def delete_by_task(self, task_id: str) -> int:
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM chunks WHERE task_id = ?", (task_id,)).rowcount
+            self._conn.commit()
+        return deleted
+
+    def delete_all(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM chunks").fetchone()[0]
+
+    def backfill(self, rows: Iterable[Tuple[Any, str, Dict[str, Any]]], batch_size: int = 1000) -> int:
+        """Index (chunk_id, text, metadata) rows from an existing collection."""
+        total, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                self.add(*map(list, zip(*batch)))
+                total, batch = total + len(batch), []
+        if batch:
+            self.add(*map(list, zip(*batch)))
+            total += len(batch)
+        return total
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def default_lexical_index(path: Optional[str] = None) -> Optional[LexicalIndex]:
+    """Open the index at ``path`` (default LEXICAL_INDEX_PATH); an empty value disables hybrid search."""
+    if path is None:
+        path = os.getenv(
+            "LEXICAL_INDEX_PATH",
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache", "lexical.sqlite3")
+        )
+    if not path:
+        return None
+    try:
+        return LexicalIndex(path)
+    except Exception as e:
+        logger.warning(f"Lexical index disabled: {e}")
+        return None
@@ -0,0 +1,488 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""In-process vector store backend on memory-mapped NumPy arrays.
+
+Used instead of Milvus on single-node boxes and in tests: set
+VECTOR_STORE_BACKEND=local.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from lexical_index import default_lexical_index
+from logger import logger
+from vector_store import VectorStore
+
+
+QUANTIZATIONS = ("none", "int8", "binary")
+DEFAULT_RESCORE_FACTORS = {"none": 1, "int8": 4, "binary": 10}
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+
+
+class LocalVectorIndex:
+    """L2 search over float32 vectors in a memory-mapped file.
+
+    Vectors are appended to ``vectors.f32``; row i starts at byte i * dim * 4.
+    Text, source, task, norm and metadata live in a SQLite sidecar keyed by the
+    same row number. Deletes are tombstones in the sidecar. A generation counter
+    in the sidecar lets other processes sharing the directory (the RAG MCP
+    server) notice writes and remap; an epoch counter, bumped by clear(), tells
+    them row numbers were reused and everything they hold must be rebuilt.
+
+    With ``quantization`` set to ``int8`` (per-row scale) or ``binary`` (sign
+    bits), the first pass scans a quantized copy of the vectors that is 4x or
+    32x smaller. The ``k * rescore_factor`` best candidates are then rescored
+    exactly against the float32 file, whose pages are only read for those rows.
+    """
+
+    SEARCH_BLOCK_ROWS = 65536
+
+    def __init__(self, directory: str, quantization: str = "none", rescore_factor: Optional[int] = None):
+        """Open or create the index.
+
+        Args:
+            directory: Directory holding the vector files and chunks.sqlite3
+            quantization: ``none``, ``int8`` or ``binary`` first-pass vectors
+            rescore_factor: Candidates per result rescored at full precision
+                (defaults to 4 for int8 and 10 for binary)
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unsupported quantization {quantization}; expected one of {QUANTIZATIONS}")
+        self.directory = directory
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor or DEFAULT_RESCORE_FACTORS[quantization]
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.codes_path = os.path.join(directory, f"vectors.{quantization}") if quantization != "none" else None
+        self._lock = threading.RLock()
+
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(directory, "chunks.sqlite3"), check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                row_id INTEGER PRIMARY KEY,
+                source TEXT,
+                task_id TEXT,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                norm REAL,
+                scale REAL
+            )
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        for column in ("norm", "scale"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE chunks ADD COLUMN {column} REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS chunks_task_id ON chunks (task_id) WHERE deleted = 0")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+
+        self.dimensions: Optional[int] = None
+        self._generation: Optional[str] = None
+        self._epoch: Optional[str] = None
+        self._count = 0
+        self._vectors: Optional[np.memmap] = None
+        self._codes: Optional[np.memmap] = None
+        self._reset_arrays()
+        self.refresh()
+
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _bump_generation(self, key: str = "generation") -> None:
+        self._conn.execute("""
+            INSERT INTO meta (key, value) VALUES (?, '1')
+            ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1
+        """, (key,))
+
+    @property
+    def _code_width(self) -> int:
+        """Bytes per row in the quantized file."""
+        if self.quantization == "binary":
+            return (self.dimensions + 7) // 8
+        return self.dimensions
+
+    def _quantize(self, matrix: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        if self.quantization == "binary":
+            return np.packbits(matrix > 0, axis=1)
+        safe = np.where(scales > 0, scales, 1.0)[:, None]
+        return np.clip(np.rint(matrix / safe * 127), -127, 127).astype(np.int8)
+
+    @staticmethod
+    def _write_rows(path: str, data: np.ndarray, offset: int) -> None:
+        """Write rows at a byte offset; bytes past the last committed row are
+        left over from a failed write and are truncated."""
+        with open(path, "r+b" if os.path.exists(path) else "w+b") as f:
+            f.seek(offset)
+            f.write(data.tobytes())
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+
+    def refresh(self) -> None:
+        """Pick up rows written since the last refresh, by this or another process."""
+        with self._lock:
+            generation = self._meta("generation")
+            if generation == self._generation:
+                return
+
+            epoch = self._meta("epoch")
+            dimensions = self._meta("dimensions")
+            self.dimensions = int(dimensions) if dimensions else None
+            count = self._conn.execute("SELECT coalesce(max(row_id) + 1, 0) FROM chunks").fetchone()[0]
+            if epoch != self._epoch or count < self._count or self.dimensions is None:
+                self._reset_arrays()
+                self._epoch = epoch
+
+            if count > self._count:
+                rows = self._conn.execute(
+                    "SELECT source, norm, scale FROM chunks WHERE row_id >= ? ORDER BY row_id", (self._count,)
+                ).fetchall()
+                self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dimensions))
+                norms = np.array([norm if norm is not None else np.nan for _, norm, _ in rows], dtype=np.float32)
+                scales = np.array([scale if scale is not None else np.nan for _, _, scale in rows], dtype=np.float32)
+                missing = np.flatnonzero(np.isnan(norms) | np.isnan(scales))
+                if len(missing):
+                    # Rows written before norms and scales were stored.
+                    block = np.asarray(self._vectors[self._count + missing])
+                    norms[missing] = np.einsum("ij,ij->i", block, block)
+                    scales[missing] = np.abs(block).max(axis=1)
+
+                new_ids = [self._source_codes.setdefault(source, len(self._source_codes)) for source, _, _ in rows]
+                self._norms = np.concatenate([self._norms, norms])
+                self._scales = np.concatenate([self._scales, scales])
+                self._source_ids = np.concatenate([self._source_ids, np.asarray(new_ids, dtype=np.int32)])
+                self._count = count
+                if self.codes_path:
+                    self._map_codes()
+
+            self._alive = np.ones(self._count, dtype=bool)
+            deleted = self._conn.execute("SELECT row_id FROM chunks WHERE deleted = 1").fetchall()
+            if deleted:
+                self._alive[[row_id for (row_id,) in deleted]] = False
+            self._generation = generation
+
+    def _map_codes(self) -> None:
+        """Map the quantized file, first quantizing rows it does not cover yet."""
+        width = self._code_width
+        existing = os.path.getsize(self.codes_path) // width if os.path.exists(self.codes_path) else 0
+        if existing < self._count:
+            for offset in range(existing, self._count, self.SEARCH_BLOCK_ROWS):
+                stop = min(self._count, offset + self.SEARCH_BLOCK_ROWS)
+                block = np.asarray(self._vectors[offset:stop])
+                self._write_rows(self.codes_path, self._quantize(block, self._scales[offset:stop]), offset * width)
+        dtype = np.uint8 if self.quantization == "binary" else np.int8
+        self._codes = np.memmap(self.codes_path, dtype=dtype, mode="r", shape=(self._count, width))
+
+    def _reset_arrays(self) -> None:
+        self._count = 0
+        self._vectors = None
+        self._codes = None
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._scales = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._source_ids = np.zeros(0, dtype=np.int32)
+        self._source_codes: Dict[str, int] = {}
+
+    def add(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict]) -> List[int]:
+        """Append chunks and return their row numbers."""
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.einsum("ij,ij->i", matrix, matrix)
+        scales = np.abs(matrix).max(axis=1)
+        with self._lock:
+            self.refresh()
+            if self.dimensions is None:
+                self.dimensions = matrix.shape[1]
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('dimensions', ?)", (str(self.dimensions),))
+            elif matrix.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dimensional vectors, got {matrix.shape[1]}")
+
+            start = self._count
+            self._write_rows(self.vectors_path, matrix, start * self.dimensions * 4)
+            if self.codes_path:
+                self._write_rows(self.codes_path, self._quantize(matrix, scales), start * self._code_width)
+
+            row_ids = list(range(start, start + len(texts)))
+            self._conn.executemany(
+                "INSERT INTO chunks (row_id, source, task_id, text, metadata, norm, scale) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        row_id, metadata.get("source"), metadata.get("task_id"), text,
+                        json.dumps(metadata, ensure_ascii=False), float(norm), float(scale)
+                    )
+                    for row_id, text, metadata, norm, scale in zip(row_ids, texts, metadatas, norms, scales)
+                ]
+            )
+            self._bump_generation()
+            self._conn.commit()
+            self.refresh()
+        return row_ids
+
+    def _first_pass_distances(self, offset: int, stop: int, query: np.ndarray, query_bits: Optional[np.ndarray]) -> np.ndarray:
+        """Distances of rows [offset, stop) to the query, ranked the same way as L2."""
+        if self.quantization == "none":
+            block = np.asarray(self._vectors[offset:stop])
+            return self._norms[offset:stop] - 2 * (block @ query)
+        codes = np.asarray(self._codes[offset:stop])
+        if self.quantization == "binary":
+            return POPCOUNT[np.bitwise_xor(codes, query_bits)].sum(axis=1).astype(np.float32)
+        dots = (codes.astype(np.float32) @ query) * (self._scales[offset:stop] / 127)
+        return self._norms[offset:stop] - 2 * dots
+
+    def search(self, vector: List[float], k: int, sources: Optional[List[str]] = None) -> List[Tuple[int, float]]:
+        """Return up to ``k`` (row number, squared L2 distance) pairs, nearest first."""
+        self.refresh()
+        with self._lock:
+            if not self._count or k <= 0:
+                return []
+            query = np.asarray(vector, dtype=np.float32)
+            query_bits = np.packbits(query > 0) if self.quantization == "binary" else None
+            mask = self._alive
+            if sources:
+                codes = [self._source_codes[source] for source in sources if source in self._source_codes]
+                mask = mask & np.isin(self._source_ids, codes)
+
+            candidates = k * self.rescore_factor
+            best_rows = np.zeros(0, dtype=np.int64)
+            best_distances = np.zeros(0, dtype=np.float32)
+            for offset in range(0, self._count, self.SEARCH_BLOCK_ROWS):
+                stop = min(self._count, offset + self.SEARCH_BLOCK_ROWS)
+                block_mask = mask[offset:stop]
+                if not block_mask.any():
+                    continue
+                distances = self._first_pass_distances(offset, stop, query, query_bits)
+                distances[~block_mask] = np.inf
+                top = np.argpartition(distances, min(candidates, len(distances) - 1))[:candidates]
+                best_rows = np.concatenate([best_rows, top + offset])
+                best_distances = np.concatenate([best_distances, distances[top]])
+
+            keep = np.isfinite(best_distances)
+            best_rows, best_distances = best_rows[keep], best_distances[keep]
+            order = np.argsort(best_distances)[:candidates]
+            best_rows, best_distances = best_rows[order], best_distances[order]
+            if self.quantization != "none":
+                best_rows = np.sort(best_rows)
+                exact = np.asarray(self._vectors[best_rows])
+                best_distances = self._norms[best_rows] - 2 * (exact @ query)
+
+            order = np.argsort(best_distances)[:k]
+            offset = float(query @ query)
+            return [(int(best_rows[i]), float(best_distances[i] + offset)) for i in order]
+
+    def get(self, row_ids: List[int]) -> Dict[int, Tuple[str, dict]]:
+        """Text and metadata of the given rows."""
+        if not row_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT row_id, text, metadata FROM chunks WHERE row_id IN ({','.join('?' * len(row_ids))})",
+                row_ids
+            ).fetchall()
+        return {row_id: (text, json.loads(metadata)) for row_id, text, metadata in rows}
+
+    def live_rows(self, batch_size: int = 1000) -> Iterator[Tuple[int, str, dict]]:
+        """Yield (row_id, text, metadata) of every chunk not deleted."""
+        last = -1
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT row_id, text, metadata FROM chunks WHERE deleted = 0 AND row_id > ? ORDER BY row_id LIMIT ?",
+                    (last, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row_id, text, metadata in rows:
+                yield row_id, text, json.loads(metadata)
+            last = rows[-1][0]
+
+    def delete(self, task_id: str, sources: Optional[List[str]] = None) -> int:
+        """Tombstone the chunks of a task; returns the number deleted."""
+        sql = "UPDATE chunks SET deleted = 1 WHERE task_id = ? AND deleted = 0"
+        params: list = [task_id]
+        if sources:
+            sql += f" AND source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+        with self._lock:
+            deleted = self._conn.execute(sql, params).rowcount
+            if deleted:
+                self._bump_generation()
+            self._conn.commit()
+            self.refresh()
+        return deleted
+
+    def clear(self) -> None:
+        """Drop every chunk and the vector files, including other quantizations'."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.execute("DELETE FROM meta WHERE key = 'dimensions'")
+            self._bump_generation()
+            self._bump_generation("epoch")
+            self._conn.commit()
+            self._reset_arrays()
+            paths = [self.vectors_path] + [
+                os.path.join(self.directory, f"vectors.{quantization}")
+                for quantization in QUANTIZATIONS if quantization != "none"
+            ]
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+            self.refresh()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "rows": self._count,
+                "live_rows": int(self._alive.sum()),
+                "dimensions": self.dimensions or 0,
+                "vector_bytes": self._count * (self.dimensions or 0) * 4,
+                "quantized_bytes": self._count * self._code_width if self.codes_path and self.dimensions else 0
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._codes = None
+            self._conn.close()
+
+
+class LocalVectorStore(VectorStore):
+    """VectorStore backed by a LocalVectorIndex instead of Milvus.
+
+    Loading, splitting, the embedding cache and hybrid search are inherited;
+    only storage and dense search differ.
+    """
+
+    def __init__(
+        self,
+        embeddings=None,
+        path: str = "local_vector_store",
+        on_source_deleted: Optional[Callable[[str], None]] = None,
+        quantization: str = "none",
+        rescore_factor: Optional[int] = None,
+        **kwargs
+    ):
+        """Initialize the local vector store.
+
+        Args:
+            embeddings: Embedding model to use (defaults to CustomEmbeddings)
+            path: Directory holding the vector file and metadata sidecar
+            on_source_deleted: Optional callback when a source is deleted
+            quantization: First-pass vectors: ``none``, ``int8`` or ``binary``
+            rescore_factor: Candidates per result rescored at full precision
+            **kwargs: Passed through to VectorStore (embedding_cache, lexical_index).
+                The default lexical index lives in ``path`` (or at
+                LOCAL_LEXICAL_INDEX_PATH): it is keyed by this store's row numbers,
+                which differ from the Milvus backend's primary keys.
+        """
+        self.path = path
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        if kwargs.get("lexical_index") is None and os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true":
+            kwargs["lexical_index"] = default_lexical_index(
+                os.getenv("LOCAL_LEXICAL_INDEX_PATH", os.path.join(path, "lexical.sqlite3"))
+            )
+        super().__init__(embeddings=embeddings, uri=None, on_source_deleted=on_source_deleted, **kwargs)
+
+    def _initialize_store(self):
+        self._index = LocalVectorIndex(self.path, self.quantization, self.rescore_factor)
+        logger.debug({
+            "message": "Local vector store initialized",
+            "path": self.path,
+            **self._index.stats()
+        })
+
+    def _add_chunks(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict]) -> List:
+        return self._index.add(texts, vectors, metadatas)
+
+    def _dense_search(self, vector: List[float], k: int, sources: Optional[List[str]] = None) -> List[Document]:
+        hits = self._index.search(vector, k, sources)
+        rows = self._index.get([row_id for row_id, _ in hits])
+        return [
+            Document(page_content=rows[row_id][0], metadata={**rows[row_id][1], "pk": row_id})
+            for row_id, _ in hits if row_id in rows
+        ]
+
+    def _dense_search_batch(
+        self,
+        vectors: List[List[float]],
+        k: int,
+        sources: Optional[List[str]] = None
+    ) -> List[List[Document]]:
+        """Queries are scanned in-process, so there is no round trip to save."""
+        return [self._dense_search(vector, k, sources) for vector in vectors]
+
+    def _prepare_collection(self) -> None:
+        configured = getattr(self.embeddings, "dimensions", None)
+        if configured:
+            self._check_dimensions([[0.0] * configured])
+        if self.lexical_index is not None and not self.lexical_index.count() and self._index.stats()["live_rows"]:
+            indexed = self.lexical_index.backfill(self._index.live_rows())
+            logger.info({
+                "message": "Backfilled lexical index from local vector store",
+                "path": self.path,
+                "chunks": indexed
+            })
+        self._collection_prepared = True
+
+    def _collection_dimensions(self) -> Optional[int]:
+        self._index.refresh()
+        return self._index.dimensions
+
+    def flush_store(self, collection_name: str = "context", immediate: bool = False):
+        """Writes are fsynced as they happen; nothing is deferred."""
+
+    def warm_up(self, collection_name: str = "context") -> None:
+        """Map the vector file and compute norms before the first query."""
+        self._index.refresh()
+        self._warmed_up = True
+
+    def delete_collection(self, collection_name: str) -> bool:
+        if collection_name != "context":
+            logger.warning({
+                "message": "Collection not found",
+                "collection_name": collection_name
+            })
+            return False
+        self._index.clear()
+        if self.lexical_index is not None:
+            self.lexical_index.delete_all()
+        if self.on_source_deleted:
+            self.on_source_deleted(collection_name)
+        return True
+
+    def delete_documents_by_task(self, task_id: str, sources: Optional[List[str]] = None) -> int:
+        deleted = self._index.delete(task_id, sources)
+        if self.lexical_index is not None:
+            self.lexical_index.delete_by_task(task_id)
+        logger.debug({
+            "message": "Deleted documents for task",
+            "task_id": task_id,
+            "deleted_count": deleted
+        })
+        return deleted
+
+    def close(self) -> None:
+        self._index.close()
+        self._executor.shutdown(wait=False)
@@ -24,7 +24,7 @@ This module provides the main HTTP API endpoints and WebSocket connections for:
 - Vector store operations
 """
 
-import base64
+import asyncio
 import json
 import mimetypes
 import os
@@ -35,14 +35,17 @@ from pathlib import Path
 
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException, BackgroundTasks, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
 from agent import ChatAgent
+from blob_store import BlobStore
 from config import ConfigManager
+from conversation_memory import ConversationMemory
 from logger import logger, log_request, log_response, log_error
 from models import ChatIdRequest, ChatRenameRequest, SelectedModelRequest
 from postgres_storage import PostgreSQLConversationStorage
-from utils import process_and_ingest_files_background, delete_ingested_files
+from utils import process_and_ingest_files_background, delete_ingested_files, purge_chat_images, purge_chats_background
 from vector_store import create_vector_store_with_config
 
 POSTGRES_HOST = os.getenv("POSTGRES_HOST", "postgres")
@@ -50,6 +53,21 @@ POSTGRES_PORT = int(os.getenv("POSTGRES_PORT", 5432))
 POSTGRES_DB = os.getenv("POSTGRES_DB", "chatbot")
 POSTGRES_USER = os.getenv("POSTGRES_USER", "chatbot_user")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "chatbot_password")
+POSTGRES_REPLICA_DSNS = [dsn.strip() for dsn in os.getenv("POSTGRES_REPLICA_DSNS", "").split(",") if dsn.strip()]
+POSTGRES_REPLICA_LAG_TOLERANCE = float(os.getenv("POSTGRES_REPLICA_LAG_TOLERANCE", 5.0))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 50))
+HISTORY_PAGE_MAX = int(os.getenv("HISTORY_PAGE_MAX", 200))
+RETENTION_SWEEP_INTERVAL_SECONDS = float(os.getenv("RETENTION_SWEEP_INTERVAL_SECONDS", 600))
+RETENTION_SWEEP_BATCH_SIZE = int(os.getenv("RETENTION_SWEEP_BATCH_SIZE", 500))
+RETENTION_ORPHAN_GRACE_SECONDS = float(os.getenv("RETENTION_ORPHAN_GRACE_SECONDS", 3600))
+CONVERSATION_ARCHIVE_AFTER_DAYS = float(os.getenv("CONVERSATION_ARCHIVE_AFTER_DAYS", 0)) or None
+POSTGRES_CONVERSATION_PARTITIONS = int(os.getenv("POSTGRES_CONVERSATION_PARTITIONS", 0))
+CONVERSATION_MEMORY_ENABLED = os.getenv("CONVERSATION_MEMORY_ENABLED", "true").lower() == "true"
+CONVERSATION_MEMORY_TOP_K = int(os.getenv("CONVERSATION_MEMORY_TOP_K", 4))
+CONVERSATION_MEMORY_TOKEN_BUDGET = int(os.getenv("CONVERSATION_MEMORY_TOKEN_BUDGET", 1500))
+
+IMAGE_UPLOAD_DIR = os.path.join("uploads", "chat_images")
+os.makedirs(IMAGE_UPLOAD_DIR, exist_ok=True)
 
 config_manager = ConfigManager("./config.json")
 
@@ -58,34 +76,56 @@ postgres_storage = PostgreSQLConversationStorage(
     port=POSTGRES_PORT,
     database=POSTGRES_DB,
     user=POSTGRES_USER,
-    password=POSTGRES_PASSWORD
+    password=POSTGRES_PASSWORD,
+    blob_store=BlobStore(IMAGE_UPLOAD_DIR),
+    replica_dsns=POSTGRES_REPLICA_DSNS,
+    replica_lag_tolerance=POSTGRES_REPLICA_LAG_TOLERANCE,
+    archive_after_days=CONVERSATION_ARCHIVE_AFTER_DAYS,
+    conversation_partitions=POSTGRES_CONVERSATION_PARTITIONS
 )
 
 vector_store = create_vector_store_with_config(config_manager)
 
-vector_store._initialize_store()
-
+conversation_memory: ConversationMemory | None = None
 agent: ChatAgent | None = None
 indexing_tasks: Dict[str, str] = {}
-
-IMAGE_UPLOAD_DIR = os.path.join("uploads", "chat_images")
-os.makedirs(IMAGE_UPLOAD_DIR, exist_ok=True)
+purge_jobs: Dict[str, str] = {}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager for startup and shutdown tasks."""
-    global agent
+    global agent, conversation_memory
     logger.debug("Initializing PostgreSQL storage and agent...")
     
     try:
         await postgres_storage.init_pool()
         logger.info("PostgreSQL storage initialized successfully")
+        postgres_storage.start_retention_sweeper(
+            interval_seconds=RETENTION_SWEEP_INTERVAL_SECONDS,
+            batch_size=RETENTION_SWEEP_BATCH_SIZE,
+            orphan_grace_seconds=RETENTION_ORPHAN_GRACE_SECONDS
+        )
+        await asyncio.to_thread(vector_store.warm_up)
+        if CONVERSATION_MEMORY_ENABLED and vector_store.uri:
+            try:
+                conversation_memory = await asyncio.to_thread(
+                    ConversationMemory,
+                    vector_store.embeddings,
+                    uri=vector_store.uri,
+                    top_k=CONVERSATION_MEMORY_TOP_K,
+                    token_budget=CONVERSATION_MEMORY_TOKEN_BUDGET,
+                    index_config=config_manager.read_config().vector_indexes.get("conversation_memory"),
+                    connection_alias=vector_store.connection_alias
+                )
+            except Exception as e:
+                logger.warning(f"Conversation memory disabled: {e}")
         logger.debug("Initializing ChatAgent...")
         agent = await ChatAgent.create(
             vector_store=vector_store,
             config_manager=config_manager,
-            postgres_storage=postgres_storage
+            postgres_storage=postgres_storage,
+            memory=conversation_memory
         )
         logger.info("ChatAgent initialized successfully.")
     except Exception as e:
@@ -100,6 +140,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error closing PostgreSQL storage: {e}")
 
+    try:
+        await asyncio.to_thread(vector_store.close)
+        logger.debug("Vector store closed successfully")
+    except Exception as e:
+        logger.error(f"Error closing vector store: {e}")
+
 
 app = FastAPI(
     title="Chatbot API",
@@ -123,6 +169,31 @@ app.mount(
 )
 
 
+def _history_event(event_type: str, window: Dict) -> Dict:
+    """Build a history WebSocket event from a storage message window.
+    
+    The first stored message is the system prompt and is never sent to the client.
+    
+    Args:
+        event_type: Event type sent to the client ("history" or "history_older")
+        window: Window returned by PostgreSQLConversationStorage.get_message_window
+        
+    Returns:
+        Event payload with serialized messages and the cursor for older pages
+    """
+    messages = [
+        postgres_storage._message_to_dict(msg)
+        for i, msg in enumerate(window["messages"], start=window["start"])
+        if i != 0
+    ]
+    return {
+        "type": event_type,
+        "messages": messages,
+        "cursor": window["cursor"],
+        "has_more": window["cursor"] is not None
+    }
+
+
 @app.websocket("/ws/chat/{chat_id}")
 async def websocket_endpoint(websocket: WebSocket, chat_id: str):
     """WebSocket endpoint for real-time chat communication.
@@ -136,13 +207,32 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
         await websocket.accept()
         logger.debug(f"WebSocket connection accepted for chat_id: {chat_id}")
         
-        history_messages = await postgres_storage.get_messages(chat_id)
-        history = [postgres_storage._message_to_dict(msg) for i, msg in enumerate(history_messages) if i != 0]
-        await websocket.send_json({"type": "history", "messages": history})
+        window = await postgres_storage.get_message_window(chat_id, limit=HISTORY_PAGE_SIZE)
+        oldest_loaded = window["start"]
+        await websocket.send_json(_history_event("history", window))
         
         while True:
             data = await websocket.receive_text()
             client_message = json.loads(data)
+            
+            if client_message.get("type") == "load_older":
+                try:
+                    before = int(client_message.get("before", oldest_loaded))
+                    limit = int(client_message.get("limit") or HISTORY_PAGE_SIZE)
+                except (TypeError, ValueError):
+                    before, limit = 0, 0
+                if before <= 0 or limit <= 0:
+                    await websocket.send_json({"type": "history_older", "messages": [], "cursor": None, "has_more": False})
+                    continue
+                older = await postgres_storage.get_message_window(
+                    chat_id,
+                    limit=min(limit, HISTORY_PAGE_MAX),
+                    before=before
+                )
+                oldest_loaded = min(oldest_loaded, older["start"])
+                await websocket.send_json(_history_event("history_older", older))
+                continue
+            
             new_message = client_message.get("message")
             image_id = client_message.get("image_id")
             
@@ -163,9 +253,8 @@ async def websocket_endpoint(websocket: WebSocket, chat_id: str):
                 logger.error(f"Error in agent.query: {str(query_error)}", exc_info=True)
                 await websocket.send_json({"type": "error", "data": f"Error processing request: {str(query_error)}"})
         
-            final_messages = await postgres_storage.get_messages(chat_id)
-            final_history = [postgres_storage._message_to_dict(msg) for i, msg in enumerate(final_messages) if i != 0]
-            await websocket.send_json({"type": "history", "messages": final_history})
+            final_window = await postgres_storage.get_message_window(chat_id, since=oldest_loaded)
+            await websocket.send_json(_history_event("history", final_window))
             
     except WebSocketDisconnect:
         logger.debug(f"Client disconnected from chat {chat_id}")
@@ -194,21 +283,19 @@ async def upload_image(request: Request, image: UploadFile = File(...), chat_id:
     extension = original_extension or guessed_extension or ".png"
 
     image_id = str(uuid.uuid4())
-    file_name = f"{image_id}{extension}"
-    file_path = Path(IMAGE_UPLOAD_DIR) / file_name
 
     try:
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(file_path, "wb") as f:
-            f.write(image_data)
-    except Exception as write_error:
+        file_name = await postgres_storage.store_image_bytes(
+            image_id,
+            image_data,
+            content_type=content_type,
+            extension=extension,
+            chat_id=chat_id
+        )
+    except OSError as write_error:
         logger.error(f"Failed to write uploaded image to disk: {write_error}")
         raise HTTPException(status_code=500, detail="Failed to persist uploaded image")
 
-    image_base64 = base64.b64encode(image_data).decode('utf-8')
-    data_uri = f"data:{content_type};base64,{image_base64}"
-    await postgres_storage.store_image(image_id, data_uri)
-
     storage_origin = (os.getenv("PUBLIC_BACKEND_ORIGIN") or "").strip().rstrip("/")
     if not storage_origin:
         storage_origin = (os.getenv("STORAGE_BASE_URL") or "").strip().rstrip("/")
@@ -418,6 +505,78 @@ async def list_chats():
         raise HTTPException(status_code=500, detail=f"Error listing chats: {str(e)}")
 
 
+@app.get("/chats/search")
+async def search_chats(q: str, limit: int = 20, offset: int = 0):
+    """Search message content across all chats.
+    
+    Args:
+        q: Free-text query
+        limit: Maximum number of matching messages per page
+        offset: Number of matching messages to skip
+        
+    Returns:
+        Matching chats with the positions and snippets of their matching messages
+    """
+    try:
+        limit = max(1, min(limit, 100))
+        offset = max(0, offset)
+        matches = await postgres_storage.search_messages(q, limit=limit, offset=offset)
+        
+        results: Dict[str, Dict] = {}
+        for match in matches:
+            chat = results.setdefault(match["chat_id"], {
+                "chat_id": match["chat_id"],
+                "name": match["chat_name"],
+                "matches": []
+            })
+            chat["matches"].append({
+                "position": match["position"],
+                "role": match["role"],
+                "snippet": match["snippet"],
+                "rank": match["rank"]
+            })
+        
+        return {
+            "query": q,
+            "results": list(results.values()),
+            "offset": offset,
+            "next_offset": offset + limit if len(matches) == limit else None
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching chats: {str(e)}")
+
+
+@app.get("/chats/export")
+async def export_chats(after: Optional[str] = None):
+    """Stream every chat as NDJSON, one conversation per line.
+    
+    Args:
+        after: Resume cursor; pass the chat_id of the last line already received
+    """
+    return StreamingResponse(
+        postgres_storage.export_conversations(after=after),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=chats.ndjson"}
+    )
+
+
+@app.post("/chats/import")
+async def import_chats(request: Request, after: Optional[str] = None):
+    """Bulk-load chats from an NDJSON body in the /chats/export format.
+    
+    Existing chats are skipped, so an interrupted import can be retried as is or
+    resumed with ``after`` set to the returned ``last_chat_id``.
+    
+    Args:
+        after: Resume cursor; lines with a chat_id not greater than it are skipped
+    """
+    try:
+        report = await postgres_storage.import_conversations(request.stream(), after=after)
+        return {"status": "partial" if "aborted" in report else "success", **report}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error importing chats: {str(e)}")
+
+
 @app.get("/chat_id")
 async def get_chat_id():
     """Get the current active chat ID, creating a conversation if it doesn't exist."""
@@ -433,10 +592,8 @@ async def get_chat_id():
         
         new_chat_id = str(uuid.uuid4())
         
-        await postgres_storage.save_messages_immediate(new_chat_id, [])
-        await postgres_storage.set_chat_metadata(new_chat_id, f"Chat {new_chat_id[:8]}")
-        
-        config_manager.updated_current_chat_id(new_chat_id)
+        await postgres_storage.create_chat(new_chat_id)
+        await asyncio.to_thread(config_manager.updated_current_chat_id, new_chat_id)
         
         return {
             "status": "success",
@@ -498,16 +655,22 @@ async def rename_chat(request: ChatRenameRequest):
         request: Chat rename request with chat_id and new_name
     """
     try:
-        await postgres_storage.set_chat_metadata(request.chat_id, request.new_name)
-        return {
-            "status": "success",
-            "message": f"Chat {request.chat_id} renamed to {request.new_name}"
-        }
+        renamed = await postgres_storage.rename_chat(request.chat_id, request.new_name)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error renaming chat: {str(e)}"
         )
+    
+    if not renamed:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Chat {request.chat_id} not found"
+        )
+    return {
+        "status": "success",
+        "message": f"Chat {request.chat_id} renamed to {request.new_name}"
+    }
 
 
 @app.post("/chat/new")
@@ -515,10 +678,8 @@ async def create_new_chat():
     """Create a new chat conversation and set it as current."""
     try:
         new_chat_id = str(uuid.uuid4())
-        await postgres_storage.save_messages_immediate(new_chat_id, [])
-        await postgres_storage.set_chat_metadata(new_chat_id, f"Chat {new_chat_id[:8]}")
-        
-        config_manager.updated_current_chat_id(new_chat_id)
+        await postgres_storage.create_chat(new_chat_id)
+        await asyncio.to_thread(config_manager.updated_current_chat_id, new_chat_id)
         
         return {
             "status": "success",
@@ -534,7 +695,7 @@ async def create_new_chat():
 
 @app.delete("/chat/{chat_id}")
 async def delete_chat(chat_id: str):
-    """Delete a specific chat and its messages.
+    """Delete a specific chat, its messages and its images.
     
     Args:
         chat_id: Unique chat identifier to delete
@@ -543,6 +704,9 @@ async def delete_chat(chat_id: str):
         success = await postgres_storage.delete_conversation(chat_id)
         
         if success:
+            await purge_chat_images([chat_id], postgres_storage, IMAGE_UPLOAD_DIR)
+            if conversation_memory:
+                await conversation_memory.forget([chat_id])
             return {
                 "status": "success",
                 "message": f"Chat {chat_id} deleted successfully"
@@ -560,27 +724,38 @@ async def delete_chat(chat_id: str):
 
 
 @app.delete("/chats/clear")
-async def clear_all_chats():
-    """Clear all chat conversations and create a new default chat."""
+async def clear_all_chats(background_tasks: BackgroundTasks):
+    """Clear all chat conversations and create a new default chat.
+    
+    The chats are hidden immediately and deleted in bulk by a background job;
+    poll /chats/clear/status/{job_id} to follow its progress.
+    """
     try:
         chat_ids = await postgres_storage.list_conversations()
-        cleared_count = 0
+        postgres_storage.hide_conversations(chat_ids)
         
-        for chat_id in chat_ids:
-            if await postgres_storage.delete_conversation(chat_id):
-                cleared_count += 1
+        job_id = str(uuid.uuid4())
+        purge_jobs[job_id] = "queued"
+        background_tasks.add_task(
+            purge_chats_background,
+            chat_ids,
+            postgres_storage,
+            IMAGE_UPLOAD_DIR,
+            job_id,
+            purge_jobs,
+            conversation_memory
+        )
         
         new_chat_id = str(uuid.uuid4())
-        await postgres_storage.save_messages_immediate(new_chat_id, [])
-        await postgres_storage.set_chat_metadata(new_chat_id, f"Chat {new_chat_id[:8]}")
-        
-        config_manager.updated_current_chat_id(new_chat_id)
+        await postgres_storage.create_chat(new_chat_id)
+        await asyncio.to_thread(config_manager.updated_current_chat_id, new_chat_id)
         
         return {
             "status": "success",
-            "message": f"Cleared {cleared_count} chats and created new chat",
+            "message": f"Clearing {len(chat_ids)} chats and created new chat",
             "new_chat_id": new_chat_id,
-            "cleared_count": cleared_count
+            "cleared_count": len(chat_ids),
+            "job_id": job_id
         }
     except Exception as e:
         raise HTTPException(
@@ -589,6 +764,22 @@ async def clear_all_chats():
         )
 
 
+@app.get("/chats/clear/status/{job_id}")
+async def get_clear_status(job_id: str):
+    """Get the status of a chat purge job.
+    
+    Args:
+        job_id: Job identifier returned by /chats/clear
+        
+    Returns:
+        Current job status
+    """
+    if job_id in purge_jobs:
+        return {"status": purge_jobs[job_id]}
+    else:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+
 @app.delete("/collections/{collection_name}")
 async def delete_collection(collection_name: str):
     """Delete a document collection from the vector store.
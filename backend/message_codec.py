@@ -0,0 +1,154 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""orjson-based codec for persisting LangChain messages as JSONB."""
+
+from collections import OrderedDict
+from typing import Any, Dict, List, Union
+
+import asyncpg
+import orjson
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, BaseMessage, ToolMessage
+
+JSONB_BINARY_VERSION = b"\x01"
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class MessageCodec:
+    """Serializes LangChain messages with orjson and memoizes the encoded bytes.
+
+    Chat histories are re-saved as a whole after every turn, but only the last
+    few messages are new. The encoded form of each message object is kept in a
+    bounded LRU so unchanged history is encoded only once.
+    """
+
+    def __init__(self, memo_size: int = 10000):
+        """Initialize the codec.
+
+        Args:
+            memo_size: Maximum number of message encodings kept in memory
+        """
+        self.memo_size = memo_size
+        self._memo: "OrderedDict[int, tuple]" = OrderedDict()
+        self._memo_hits = 0
+        self._memo_misses = 0
+
+    @staticmethod
+    def to_dict(message: BaseMessage) -> Dict:
+        """Convert a message object to a dictionary for storage."""
+        result = {
+            "type": message.__class__.__name__,
+            "content": message.content,
+        }
+
+        if hasattr(message, "tool_calls") and message.tool_calls:
+            result["tool_calls"] = message.tool_calls
+
+        if isinstance(message, ToolMessage):
+            result["tool_call_id"] = getattr(message, "tool_call_id", None)
+            result["name"] = getattr(message, "name", None)
+
+        return result
+
+    @staticmethod
+    def from_dict(data: Dict) -> BaseMessage:
+        """Convert a dictionary back to a message object."""
+        msg_type = data["type"]
+        content = data["content"]
+
+        if msg_type == "AIMessage":
+            msg = AIMessage(content=content)
+            if "tool_calls" in data:
+                msg.tool_calls = data["tool_calls"]
+            return msg
+        elif msg_type == "HumanMessage":
+            return HumanMessage(content=content)
+        elif msg_type == "SystemMessage":
+            return SystemMessage(content=content)
+        elif msg_type == "ToolMessage":
+            return ToolMessage(
+                content=content,
+                tool_call_id=data.get("tool_call_id", ""),
+                name=data.get("name", "")
+            )
+        else:
+            return HumanMessage(content=content)
+
+    def encode_message(self, message: BaseMessage) -> bytes:
+        """Encode one message, reusing the cached bytes if the message is unchanged.
+
+        A memo entry is only reused while it refers to the very same message
+        object and that object still holds the same content and tool calls.
+        """
+        key = id(message)
+        content = message.content
+        tool_calls = getattr(message, "tool_calls", None)
+
+        entry = self._memo.get(key)
+        if entry is not None and entry[0] is message and entry[1] is content and entry[2] is tool_calls:
+            self._memo.move_to_end(key)
+            self._memo_hits += 1
+            return entry[3]
+
+        encoded = orjson.dumps(self.to_dict(message), option=ORJSON_OPTIONS)
+        self._memo[key] = (message, content, tool_calls, encoded)
+        self._memo.move_to_end(key)
+        if len(self._memo) > self.memo_size:
+            self._memo.popitem(last=False)
+        self._memo_misses += 1
+        return encoded
+
+    def encode_messages(self, messages: List[BaseMessage]) -> bytes:
+        """Encode a message list as a JSON array from per-message encodings."""
+        return b"[" + b",".join(self.encode_message(msg) for msg in messages) + b"]"
+
+    def decode_messages(self, payload: Union[bytes, str, List[Dict]]) -> List[BaseMessage]:
+        """Decode a stored history, accepting raw JSON or an already-decoded list."""
+        if isinstance(payload, (bytes, bytearray, memoryview, str)):
+            payload = orjson.loads(payload)
+        return [self.from_dict(msg_data) for msg_data in payload]
+
+    @staticmethod
+    def jsonb_encoder(value: Any) -> bytes:
+        """asyncpg binary JSONB encoder; bytes are treated as pre-encoded JSON."""
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return JSONB_BINARY_VERSION + bytes(value)
+        return JSONB_BINARY_VERSION + orjson.dumps(value, option=ORJSON_OPTIONS)
+
+    @staticmethod
+    def jsonb_decoder(data: bytes) -> Any:
+        """asyncpg binary JSONB decoder."""
+        return orjson.loads(data[1:])
+
+    async def register(self, conn: asyncpg.Connection) -> None:
+        """Register the JSONB codec on a connection; use as the pool ``init`` hook."""
+        await conn.set_type_codec(
+            "jsonb",
+            encoder=self.jsonb_encoder,
+            decoder=self.jsonb_decoder,
+            schema="pg_catalog",
+            format="binary"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memoization statistics."""
+        total = self._memo_hits + self._memo_misses
+        return {
+            "memo_entries": len(self._memo),
+            "memo_hits": self._memo_hits,
+            "memo_misses": self._memo_misses,
+            "memo_hit_rate_percent": round(self._memo_hits / total * 100, 2) if total > 0 else 0
+        }
@@ -14,8 +14,60 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, field_validator
+from typing import Any, Dict, Optional, List
+
+ANN_INDEX_DEFAULTS: Dict[str, tuple] = {
+    "FLAT": ({}, {}),
+    "HNSW": ({"M": 16, "efConstruction": 200}, {"ef": 64}),
+    "IVF_FLAT": ({"nlist": 1024}, {"nprobe": 16}),
+    "IVF_SQ8": ({"nlist": 1024}, {"nprobe": 16}),
+    "IVF_PQ": ({"nlist": 1024, "m": 16, "nbits": 8}, {"nprobe": 16}),
+    "SCANN": ({"nlist": 1024}, {"nprobe": 16, "reorder_k": 64}),
+    "DISKANN": ({}, {"search_list": 100}),
+    "AUTOINDEX": ({}, {}),
+}
+
+class VectorIndexConfig(BaseModel):
+    """ANN index and search settings for one Milvus collection.
+
+    Empty build_params / search_params fall back to ANN_INDEX_DEFAULTS for the
+    index type. With rescore_factor > 1, searches over-fetch that many times k
+    candidates from a quantized index (IVF_SQ8, IVF_PQ, SCANN) and re-rank
+    them by exact distance on the stored full-precision vectors; mmap keeps
+    those raw vectors on disk instead of in memory.
+    """
+    index_type: str = "HNSW"
+    metric_type: str = "L2"
+    build_params: Dict[str, Any] = {}
+    search_params: Dict[str, Any] = {}
+    rescore_factor: int = 1
+    mmap: bool = False
+
+    @field_validator("index_type")
+    @classmethod
+    def _known_index_type(cls, value: str) -> str:
+        value = value.upper()
+        if value not in ANN_INDEX_DEFAULTS:
+            raise ValueError(f"Unsupported index type {value}; expected one of {sorted(ANN_INDEX_DEFAULTS)}")
+        return value
+
+    def index_params(self) -> Dict[str, Any]:
+        """Index parameters in the form Milvus create_index expects."""
+        build_defaults, _ = ANN_INDEX_DEFAULTS[self.index_type]
+        return {
+            "index_type": self.index_type,
+            "metric_type": self.metric_type,
+            "params": {**build_defaults, **self.build_params}
+        }
+
+    def milvus_search_params(self) -> Dict[str, Any]:
+        """Search parameters in the form Milvus search expects."""
+        _, search_defaults = ANN_INDEX_DEFAULTS[self.index_type]
+        return {
+            "metric_type": self.metric_type,
+            "params": {**search_defaults, **self.search_params}
+        }
 
 class ChatConfig(BaseModel):
     sources: List[str]
@@ -23,6 +75,7 @@ class ChatConfig(BaseModel):
     selected_model: Optional[str] = None
     selected_sources: Optional[List[str]] = None
     current_chat_id: Optional[str] = None
+    vector_indexes: Dict[str, VectorIndexConfig] = {}
 
 class ChatIdRequest(BaseModel):
     chat_id: str
@@ -16,16 +16,26 @@
 #
 """PostgreSQL-based conversation storage with caching and I/O optimization."""
 
-import json
+import os
 import time
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import asyncio
+import itertools
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
 import asyncpg
-from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, BaseMessage, ToolMessage
+import orjson
+import zstandard
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 
+from blob_store import BlobStore
 from logger import logger
+from message_codec import MessageCodec
+
+MAX_CHAT_ID_LENGTH = 255
+MAX_CHAT_NAME_LENGTH = 500
 
 
 @dataclass
@@ -50,7 +60,13 @@ class PostgreSQLConversationStorage:
         user: str = 'chatbot_user', 
         password: str = 'chatbot_password',
         pool_size: int = 10,
-        cache_ttl: int = 300
+        cache_ttl: int = 300,
+        blob_store: Optional[BlobStore] = None,
+        replica_dsns: Optional[List[str]] = None,
+        replica_lag_tolerance: float = 5.0,
+        archive_after_days: Optional[float] = None,
+        archive_compression_level: int = 3,
+        conversation_partitions: int = 0
     ):
         """Initialize PostgreSQL connection pool and caching.
         
@@ -62,6 +78,15 @@ class PostgreSQLConversationStorage:
             password: Database password
             pool_size: Connection pool size
             cache_ttl: Cache TTL in seconds
+            blob_store: Filesystem store holding image bytes referenced by the images table
+            replica_dsns: Optional read-replica DSNs for lag-tolerant reads
+            replica_lag_tolerance: Seconds after a write during which reads stay on the primary
+            archive_after_days: Idle days after which the retention sweeper moves a chat
+                to the compressed archive; None disables archiving
+            archive_compression_level: zstd level used for archived histories
+            conversation_partitions: Number of hash partitions by chat_id for the
+                conversation tables; 0 keeps them as plain tables. Takes effect when
+                the tables are created or migrated.
         """
         self.host = host
         self.port = port
@@ -70,17 +95,41 @@ class PostgreSQLConversationStorage:
         self.password = password
         self.pool_size = pool_size
         self.cache_ttl = cache_ttl
+        self.blob_store = blob_store
+        self.codec = MessageCodec()
+        self.archive_after_days = archive_after_days
+        self.archive_compression_level = archive_compression_level
+        self.conversation_partitions = conversation_partitions
+        self._archive_partitions: Set[str] = set()
         
         self.pool: Optional[asyncpg.Pool] = None
+        self.replica_dsns = replica_dsns or []
+        self.replica_lag_tolerance = replica_lag_tolerance
+        self.replica_pools: List[asyncpg.Pool] = []
+        self._replica_cycle = None
+        self._recent_writes: Dict[str, float] = {}
+        self._last_write_at = 0.0
+        self._pool_acquisitions: Dict[str, int] = {"primary": 0, "replica": 0}
+        self._replica_fallbacks = 0
         
         self._message_cache: Dict[str, CacheEntry] = {}
         self._metadata_cache: Dict[str, CacheEntry] = {}
         self._image_cache: Dict[str, CacheEntry] = {}
         self._chat_list_cache: Optional[CacheEntry] = None
         
-        self._pending_saves: Dict[str, List[BaseMessage]] = {}
+        self._pending_deletes: Set[str] = set()
+        self._deleted_chats: "OrderedDict[str, None]" = OrderedDict()
+        self._deleted_chats_limit = 10000
+        self._pending_saves: Dict[str, Tuple[List[BaseMessage], Optional[int]]] = {}
+        self._db_state: Dict[str, Tuple[int, int]] = {}
+        self._write_conflicts = 0
+        self._save_attempts: Dict[str, int] = {}
+        self._max_save_attempts = 3
+        self._archive_restores = 0
         self._save_lock = asyncio.Lock()
         self._batch_save_task: Optional[asyncio.Task] = None
+        self._retention_task: Optional[asyncio.Task] = None
+        self._last_sweep: Optional[Dict[str, Any]] = None
         
         self._cache_hits = 0
         self._cache_misses = 0
@@ -99,10 +148,12 @@ class PostgreSQLConversationStorage:
                 password=self.password,
                 min_size=2,
                 max_size=self.pool_size,
-                command_timeout=30
+                command_timeout=30,
+                init=self.codec.register
             )
             
             await self._create_tables()
+            await self._init_replica_pools()
             logger.debug("PostgreSQL connection pool initialized successfully")
             
             self._batch_save_task = asyncio.create_task(self._batch_save_worker())
@@ -111,6 +162,101 @@ class PostgreSQLConversationStorage:
             logger.error(f"Failed to initialize PostgreSQL pool: {e}")
             raise
 
+    async def _init_replica_pools(self) -> None:
+        """Create a pool per configured read replica, skipping unreachable ones."""
+        for dsn in self.replica_dsns:
+            try:
+                replica_pool = await asyncpg.create_pool(
+                    dsn=dsn,
+                    min_size=1,
+                    max_size=self.pool_size,
+                    command_timeout=30,
+                    init=self.codec.register
+                )
+                self.replica_pools.append(replica_pool)
+            except Exception as e:
+                logger.warning(f"Failed to connect to read replica, reads will use the primary: {e}")
+        
+        if self.replica_pools:
+            self._replica_cycle = itertools.cycle(self.replica_pools)
+            logger.info(f"Routing lag-tolerant reads to {len(self.replica_pools)} read replica(s)")
+
+    def _mark_written(self, chat_ids: List[str]) -> None:
+        """Record writes so follow-up reads of the same chats stay on the primary."""
+        now = time.time()
+        self._last_write_at = now
+        if not self.replica_pools:
+            return
+        
+        for chat_id in chat_ids:
+            self._recent_writes[chat_id] = now
+        
+        if len(self._recent_writes) > 10000:
+            cutoff = now - self.replica_lag_tolerance
+            self._recent_writes = {
+                key: written_at for key, written_at in self._recent_writes.items()
+                if written_at >= cutoff
+            }
+
+    def _read_pool(self, chat_id: Optional[str] = None) -> Tuple[asyncpg.Pool, str]:
+        """Pick the pool for a lag-tolerant read.
+        
+        Reads go to a replica unless the chat (or, for reads spanning all chats,
+        any chat) was written within ``replica_lag_tolerance`` seconds.
+        """
+        if not self.replica_pools:
+            return self.pool, "primary"
+        
+        last_write = self._recent_writes.get(chat_id, 0.0) if chat_id else self._last_write_at
+        if time.time() - last_write < self.replica_lag_tolerance:
+            return self.pool, "primary"
+        
+        return next(self._replica_cycle), "replica"
+
+    @asynccontextmanager
+    async def _read_connection(self, chat_id: Optional[str] = None) -> AsyncIterator[asyncpg.Connection]:
+        """Acquire a connection for a lag-tolerant read, falling back to the primary."""
+        pool, role = self._read_pool(chat_id)
+        try:
+            conn = await pool.acquire()
+        except Exception as e:
+            if role == "primary":
+                raise
+            logger.warning(f"Read replica unavailable, falling back to primary: {e}")
+            self._replica_fallbacks += 1
+            pool, role = self.pool, "primary"
+            conn = await pool.acquire()
+        
+        self._pool_acquisitions[role] += 1
+        try:
+            yield conn
+        finally:
+            await pool.release(conn)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool statistics per role."""
+        def describe(pool: Optional[asyncpg.Pool]) -> Dict[str, Any]:
+            if pool is None:
+                return {}
+            return {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size()
+            }
+        
+        return {
+            "primary": {
+                **describe(self.pool),
+                "read_acquisitions": self._pool_acquisitions["primary"]
+            },
+            "replica": {
+                "pools": [describe(replica_pool) for replica_pool in self.replica_pools],
+                "read_acquisitions": self._pool_acquisitions["replica"],
+                "fallbacks_to_primary": self._replica_fallbacks
+            }
+        }
+
     async def _ensure_database_exists(self) -> None:
         """Ensure the target database exists, create if it doesn't."""
         try:
@@ -143,12 +289,16 @@ class PostgreSQLConversationStorage:
 
     async def close(self) -> None:
         """Close the connection pool and cleanup."""
-        if self._batch_save_task:
-            self._batch_save_task.cancel()
-            try:
-                await self._batch_save_task
-            except asyncio.CancelledError:
-                pass
+        for task in (self._retention_task, self._batch_save_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        
+        for replica_pool in self.replica_pools:
+            await replica_pool.close()
         
         if self.pool:
             await self.pool.close()
@@ -157,6 +307,9 @@ class PostgreSQLConversationStorage:
     async def _create_tables(self) -> None:
         """Create necessary tables if they don't exist."""
         async with self.pool.acquire() as conn:
+            if self.conversation_partitions:
+                await self._ensure_partitioned_tables(conn)
+            
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS conversations (
                     chat_id VARCHAR(255) PRIMARY KEY,
@@ -186,14 +339,61 @@ class PostgreSQLConversationStorage:
                 )
             """)
             
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS image_blobs (
+                    sha256 VARCHAR(64) PRIMARY KEY,
+                    file_name VARCHAR(255) NOT NULL,
+                    content_type VARCHAR(255),
+                    size_bytes BIGINT NOT NULL,
+                    ref_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            await conn.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0")
+            await conn.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP")
+            await conn.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS chat_id VARCHAR(255)")
+            await conn.execute("ALTER TABLE images ADD COLUMN IF NOT EXISTS blob_sha256 VARCHAR(64)")
+            await conn.execute("ALTER TABLE images ALTER COLUMN image_data DROP NOT NULL")
+            
+            search_index_exists = await conn.fetchval(
+                "SELECT to_regclass('conversation_search') IS NOT NULL"
+            )
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_search (
+                    chat_id VARCHAR(255) NOT NULL REFERENCES conversations(chat_id) ON DELETE CASCADE,
+                    position INTEGER NOT NULL,
+                    role VARCHAR(32) NOT NULL,
+                    content TEXT NOT NULL,
+                    tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED,
+                    PRIMARY KEY (chat_id, position)
+                )
+            """)
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_conversation_search_tsv ON conversation_search USING GIN (tsv)")
+            if not search_index_exists:
+                await self._backfill_search_index(conn)
+            
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_archive (
+                    chat_id VARCHAR(255) PRIMARY KEY REFERENCES conversations(chat_id) ON DELETE CASCADE,
+                    payload BYTEA NOT NULL,
+                    message_count INTEGER NOT NULL,
+                    raw_bytes INTEGER NOT NULL,
+                    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_conversations_updated_at ON conversations(updated_at)")
             await conn.execute("CREATE INDEX IF NOT EXISTS idx_images_expires_at ON images(expires_at)")
+            await conn.execute("CREATE INDEX IF NOT EXISTS idx_images_chat_id ON images(chat_id)")
             
             await conn.execute("""
                 CREATE OR REPLACE FUNCTION update_updated_at_column()
                 RETURNS TRIGGER AS $$
                 BEGIN
-                    NEW.updated_at = CURRENT_TIMESTAMP;
+                    IF NEW.archived_at IS NOT DISTINCT FROM OLD.archived_at THEN
+                        NEW.updated_at = CURRENT_TIMESTAMP;
+                    END IF;
                     RETURN NEW;
                 END;
                 $$ language 'plpgsql'
@@ -209,44 +409,147 @@ class PostgreSQLConversationStorage:
                     EXECUTE FUNCTION update_updated_at_column()
             """)
 
-    def _message_to_dict(self, message: BaseMessage) -> Dict:
-        """Convert a message object to a dictionary for storage."""
-        result = {
-            "type": message.__class__.__name__,
-            "content": message.content,
-        }
+    async def _ensure_partitioned_tables(self, conn: asyncpg.Connection) -> None:
+        """Create the conversation tables as partitioned tables, migrating plain ones.
         
-        if hasattr(message, "tool_calls") and message.tool_calls:
-            result["tool_calls"] = message.tool_calls
+        conversations and conversation_search are hash-partitioned by chat_id so
+        every per-chat query touches a single partition. conversation_archive is
+        range-partitioned by month of archived_at so old archives can be detached
+        or dropped as a whole. Existing plain tables are copied into the new layout
+        in one transaction.
+        """
+        partitions = self.conversation_partitions
         
-        if isinstance(message, ToolMessage):
-            result["tool_call_id"] = getattr(message, "tool_call_id", None)
-            result["name"] = getattr(message, "name", None)
+        async with conn.transaction():
+            relkinds = {
+                row['name']: row['relkind']
+                for row in await conn.fetch("""
+                    SELECT name, (SELECT relkind::text FROM pg_class WHERE oid = to_regclass(name)) AS relkind
+                    FROM unnest($1::text[]) AS name
+                """, ["conversations", "conversation_search", "conversation_archive"])
+            }
+            if all(kind == 'p' for kind in relkinds.values()):
+                return
             
-        return result
+            if relkinds["conversations"] == 'r':
+                await conn.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS version BIGINT NOT NULL DEFAULT 0")
+                await conn.execute("ALTER TABLE conversations ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP")
+            for name, kind in relkinds.items():
+                if kind == 'r':
+                    await conn.execute(f"ALTER TABLE {name} RENAME TO {name}_unpartitioned")
+                    await conn.execute(f"ALTER INDEX IF EXISTS {name}_pkey RENAME TO {name}_unpartitioned_pkey")
+            
+            if relkinds["conversations"] != 'p':
+                await conn.execute("""
+                    CREATE TABLE conversations (
+                        chat_id VARCHAR(255) PRIMARY KEY,
+                        messages JSONB NOT NULL,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        message_count INTEGER DEFAULT 0,
+                        version BIGINT NOT NULL DEFAULT 0,
+                        archived_at TIMESTAMP
+                    ) PARTITION BY HASH (chat_id)
+                """)
+                for i in range(partitions):
+                    await conn.execute(f"""
+                        CREATE TABLE conversations_p{i} PARTITION OF conversations
+                        FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})
+                    """)
+            
+            if relkinds["conversation_search"] != 'p':
+                await conn.execute("""
+                    CREATE TABLE conversation_search (
+                        chat_id VARCHAR(255) NOT NULL,
+                        position INTEGER NOT NULL,
+                        role VARCHAR(32) NOT NULL,
+                        content TEXT NOT NULL,
+                        tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', content)) STORED,
+                        PRIMARY KEY (chat_id, position)
+                    ) PARTITION BY HASH (chat_id)
+                """)
+                for i in range(partitions):
+                    await conn.execute(f"""
+                        CREATE TABLE conversation_search_p{i} PARTITION OF conversation_search
+                        FOR VALUES WITH (MODULUS {partitions}, REMAINDER {i})
+                    """)
+            
+            if relkinds["conversation_archive"] != 'p':
+                await conn.execute("""
+                    CREATE TABLE conversation_archive (
+                        chat_id VARCHAR(255) NOT NULL,
+                        payload BYTEA NOT NULL,
+                        message_count INTEGER NOT NULL,
+                        raw_bytes INTEGER NOT NULL,
+                        archived_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (chat_id, archived_at)
+                    ) PARTITION BY RANGE (archived_at)
+                """)
+                await conn.execute("CREATE TABLE conversation_archive_default PARTITION OF conversation_archive DEFAULT")
+            
+            if relkinds["conversations"] == 'r':
+                copied = await conn.execute("""
+                    INSERT INTO conversations
+                        (chat_id, messages, created_at, updated_at, message_count, version, archived_at)
+                    SELECT chat_id, messages, created_at, updated_at, message_count, version, archived_at
+                    FROM conversations_unpartitioned
+                """)
+                logger.info(f"Migrated conversations into {partitions} hash partitions: {copied}")
+            if relkinds["conversation_search"] == 'r':
+                await conn.execute("""
+                    INSERT INTO conversation_search (chat_id, position, role, content)
+                    SELECT chat_id, position, role, content FROM conversation_search_unpartitioned
+                """)
+            if relkinds["conversation_archive"] == 'r':
+                months = await conn.fetch(
+                    "SELECT DISTINCT date_trunc('month', archived_at) AS month FROM conversations WHERE archived_at IS NOT NULL"
+                )
+                for row in months:
+                    await self._ensure_archive_partition(conn, row['month'])
+                await conn.execute("""
+                    INSERT INTO conversation_archive (chat_id, payload, message_count, raw_bytes, archived_at)
+                    SELECT a.chat_id, a.payload, a.message_count, a.raw_bytes, c.archived_at
+                    FROM conversation_archive_unpartitioned a
+                    JOIN conversations c ON c.chat_id = a.chat_id
+                    WHERE c.archived_at IS NOT NULL
+                """)
+            
+            for name, kind in relkinds.items():
+                if kind == 'r':
+                    await conn.execute(f"DROP TABLE {name}_unpartitioned CASCADE")
+            
+            for table in ("chat_metadata", "conversation_search", "conversation_archive"):
+                if await conn.fetchval("SELECT to_regclass($1) IS NOT NULL", table):
+                    await conn.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_chat_id_fkey")
+                    await conn.execute(f"""
+                        ALTER TABLE {table} ADD CONSTRAINT {table}_chat_id_fkey
+                        FOREIGN KEY (chat_id) REFERENCES conversations(chat_id) ON DELETE CASCADE
+                    """)
+            
+            if relkinds["conversation_search"] is None and relkinds["conversations"] == 'r':
+                await self._backfill_search_index(conn)
+
+    async def _ensure_archive_partition(self, conn: asyncpg.Connection, archived_at: datetime) -> None:
+        """Create the monthly conversation_archive partition covering ``archived_at``."""
+        month = archived_at.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        name = f"conversation_archive_{month:%Y_%m}"
+        if name in self._archive_partitions:
+            return
+        
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        await conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {name} PARTITION OF conversation_archive
+            FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')
+        """)
+        self._archive_partitions.add(name)
+
+    def _message_to_dict(self, message: BaseMessage) -> Dict:
+        """Convert a message object to a dictionary for storage."""
+        return self.codec.to_dict(message)
 
     def _dict_to_message(self, data: Dict) -> BaseMessage:
         """Convert a dictionary back to a message object."""
-        msg_type = data["type"]
-        content = data["content"]
-        
-        if msg_type == "AIMessage":
-            msg = AIMessage(content=content)
-            if "tool_calls" in data:
-                msg.tool_calls = data["tool_calls"]
-            return msg
-        elif msg_type == "HumanMessage":
-            return HumanMessage(content=content)
-        elif msg_type == "SystemMessage":
-            return SystemMessage(content=content)
-        elif msg_type == "ToolMessage":
-            return ToolMessage(
-                content=content,
-                tool_call_id=data.get("tool_call_id", ""),
-                name=data.get("name", "")
-            )
-        else:
-            return HumanMessage(content=content)
+        return self.codec.from_dict(data)
 
     def _get_cached_messages(self, chat_id: str) -> Optional[List[BaseMessage]]:
         """Get messages from cache if available and not expired."""
@@ -272,8 +575,27 @@ class PostgreSQLConversationStorage:
         self._metadata_cache.pop(chat_id, None)
         self._chat_list_cache = None
 
+    def is_deleted(self, chat_id: str) -> bool:
+        """Whether the chat is being or was recently deleted by this process.
+        
+        Saves for such chats are dropped, so a turn that finishes after the
+        user deleted its chat cannot bring the chat back.
+        """
+        return chat_id in self._pending_deletes or chat_id in self._deleted_chats
+
+    def _remember_deleted(self, chat_ids: List[str]) -> None:
+        """Tombstone deleted chats, keeping the most recent ``_deleted_chats_limit``."""
+        for chat_id in chat_ids:
+            self._deleted_chats[chat_id] = None
+            self._deleted_chats.move_to_end(chat_id)
+        while len(self._deleted_chats) > self._deleted_chats_limit:
+            self._deleted_chats.popitem(last=False)
+
     async def exists(self, chat_id: str) -> bool:
         """Check if a conversation exists (with caching)."""
+        if chat_id in self._pending_deletes:
+            return False
+        
         cached_messages = self._get_cached_messages(chat_id)
         if cached_messages is not None:
             return len(cached_messages) > 0
@@ -292,9 +614,13 @@ class PostgreSQLConversationStorage:
         if cached_messages is not None:
             return cached_messages[-limit:] if limit else cached_messages
         
+        if limit:
+            window = await self.get_message_window(chat_id, limit=limit)
+            return window["messages"]
+        
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow(
-                "SELECT messages FROM conversations WHERE chat_id = $1",
+                "SELECT messages, version, archived_at FROM conversations WHERE chat_id = $1",
                 chat_id
             )
             self._db_operations += 1
@@ -302,43 +628,410 @@ class PostgreSQLConversationStorage:
             if not row:
                 return []
             
-            messages_data = row['messages']
-            if isinstance(messages_data, str):
-                messages_data = json.loads(messages_data)
-            messages = [self._dict_to_message(msg_data) for msg_data in messages_data]
+            if row['archived_at'] is not None:
+                messages = await self._restore_archived(conn, chat_id)
+                return messages[-limit:] if limit else messages
+            
+            messages = self.codec.decode_messages(row['messages'])
             
+            self._db_state[chat_id] = (row['version'], len(messages))
             self._cache_messages(chat_id, messages)
             
             return messages[-limit:] if limit else messages
 
-    async def save_messages(self, chat_id: str, messages: List[BaseMessage]) -> None:
-        """Save messages with batching for performance."""
+    async def get_message_window(
+        self,
+        chat_id: str,
+        limit: int = 50,
+        before: Optional[int] = None,
+        since: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Retrieve a contiguous window of messages without loading the full history.
+        
+        The window ends right before ``before`` (or at the newest message) and
+        starts ``limit`` messages earlier, or at ``since`` when given. Slicing
+        happens inside PostgreSQL so only the requested messages are sent over
+        the wire and decoded.
+        
+        Args:
+            chat_id: Chat identifier
+            limit: Maximum number of messages to return
+            before: Exclusive end position; pass a previous cursor to page backwards
+            since: Inclusive start position; overrides ``limit`` when set
+            
+        Returns:
+            Dictionary with ``messages``, ``start`` (position of the first returned
+            message), ``cursor`` (value for the next ``before``, or None when the
+            start of the history was reached) and ``total`` message count
+        """
+        cached_messages = self._get_cached_messages(chat_id)
+        if cached_messages is not None:
+            total = len(cached_messages)
+            end = total if before is None else max(min(before, total), 0)
+            start = since if since is not None else end - limit
+            start = max(min(start, end), 0)
+            return {
+                "messages": cached_messages[start:end],
+                "start": start,
+                "cursor": start if start > 0 else None,
+                "total": total
+            }
+        
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                SELECT
+                    c.message_count,
+                    c.archived_at IS NOT NULL AS archived,
+                    w.lo,
+                    (
+                        SELECT COALESCE(jsonb_agg(c.messages -> i ORDER BY i), '[]'::jsonb)
+                        FROM generate_series(w.lo, w.hi - 1) AS i
+                    ) AS messages
+                FROM conversations c
+                CROSS JOIN LATERAL (
+                    SELECT LEAST(GREATEST(COALESCE($2::int, c.message_count), 0), c.message_count) AS hi
+                ) h
+                CROSS JOIN LATERAL (
+                    SELECT h.hi,
+                           LEAST(GREATEST(COALESCE($4::int, h.hi - $3::int), 0), h.hi) AS lo
+                ) w
+                WHERE c.chat_id = $1
+            """, chat_id, before, limit, since)
+            self._db_operations += 1
+        
+        if not row:
+            return {"messages": [], "start": 0, "cursor": None, "total": 0}
+        
+        if row['archived']:
+            await self.get_messages(chat_id)
+            return await self.get_message_window(chat_id, limit=limit, before=before, since=since)
+        
+        start = row['lo']
+        
+        return {
+            "messages": self.codec.decode_messages(row['messages']),
+            "start": start,
+            "cursor": start if start > 0 else None,
+            "total": row['message_count']
+        }
+
+    async def save_messages(self, chat_id: str, messages: List[BaseMessage], base_count: Optional[int] = None) -> None:
+        """Save messages with batching for performance.
+        
+        Args:
+            chat_id: Chat identifier
+            messages: Full history snapshot to save
+            base_count: Length of the history the snapshot was built from. When
+                given, messages saved by others since then are kept and the new
+                messages are appended after them instead of being overwritten.
+        """
+        if self.is_deleted(chat_id):
+            return
         async with self._save_lock:
-            self._pending_saves[chat_id] = messages.copy()
+            pending = self._pending_saves.get(chat_id)
+            if pending is not None:
+                current = pending[0]
+            else:
+                cache_entry = self._message_cache.get(chat_id)
+                current = cache_entry.data if cache_entry else None
+            
+            merged = self._merge_histories(current, messages, base_count)
+            db_base = self._db_state[chat_id][1] if chat_id in self._db_state else None
+            self._pending_saves[chat_id] = (merged, db_base)
         
-        self._cache_messages(chat_id, messages)
+        self._cache_messages(chat_id, merged)
     
     async def save_messages_immediate(self, chat_id: str, messages: List[BaseMessage]) -> None:
         """Save messages immediately without batching - for critical operations."""
-        serialized_messages = [self._message_to_dict(msg) for msg in messages]
-        
+        if self.is_deleted(chat_id):
+            return
+        db_base = self._db_state[chat_id][1] if chat_id in self._db_state else None
         async with self.pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO conversations (chat_id, messages, message_count)
-                VALUES ($1, $2, $3)
-                ON CONFLICT (chat_id)
-                DO UPDATE SET 
-                    messages = EXCLUDED.messages,
-                    message_count = EXCLUDED.message_count,
-                    updated_at = CURRENT_TIMESTAMP
-            """, chat_id, json.dumps(serialized_messages), len(messages))
+            async with conn.transaction():
+                written = await self._write_conversation(conn, chat_id, messages, db_base)
             self._db_operations += 1
         
-        self._cache_messages(chat_id, messages)
         self._chat_list_cache = None
+        if written is None:
+            self._db_state.pop(chat_id, None)
+            self._message_cache.pop(chat_id, None)
+            return
+        saved, state = written
+        self._db_state[chat_id] = state
+        self._cache_messages(chat_id, saved)
+
+    @staticmethod
+    def _merge_histories(
+        current: Optional[List[BaseMessage]],
+        incoming: List[BaseMessage],
+        base_count: Optional[int]
+    ) -> List[BaseMessage]:
+        """Merge a snapshot into the latest history by sequence.
+        
+        ``incoming`` was built from the first ``base_count`` messages. Anything
+        ``current`` gained beyond that point is kept, and the messages the snapshot
+        added are appended after it. The system prompt only lives at the head of
+        the history, so system messages in the appended tail are dropped.
+        """
+        if base_count is None or not current or len(current) <= base_count:
+            return incoming.copy()
+        
+        tail = [msg for msg in incoming[base_count:] if not isinstance(msg, SystemMessage)]
+        return current + tail
+
+    async def _write_conversation(
+        self,
+        conn: asyncpg.Connection,
+        chat_id: str,
+        messages: List[BaseMessage],
+        db_base: Optional[int]
+    ) -> Optional[Tuple[List[BaseMessage], Tuple[int, int]]]:
+        """Write a history with compare-and-swap on the conversation version.
+        
+        Must run inside a transaction. The write only succeeds if the row is still
+        at the version this process last saw. On a conflict the row is locked,
+        re-read and merged with the snapshot, so no concurrent append is lost and
+        writers never wait on each other in the common case. Messages appended
+        since the previous version are added to the search index. If the row was
+        known to exist but has been deleted since, the write is dropped rather
+        than recreating the chat.
+        
+        Args:
+            conn: Connection with an open transaction
+            chat_id: Chat identifier
+            messages: History to write
+            db_base: Number of stored messages the snapshot builds on, or None if unknown
+            
+        Returns:
+            Tuple of (history actually written, (new version, message count)), or
+            None if the chat was deleted concurrently
+        """
+        if chat_id in self._deleted_chats:
+            return None
+        state = self._db_state.get(chat_id)
+        if state is None:
+            version = await conn.fetchval("""
+                INSERT INTO conversations (chat_id, messages, message_count, version)
+                VALUES ($1, $2, $3, 1)
+                ON CONFLICT (chat_id) DO NOTHING
+                RETURNING version
+            """, chat_id, self.codec.encode_messages(messages), len(messages))
+            previous_count = 0
+        else:
+            version = await conn.fetchval("""
+                UPDATE conversations
+                SET messages = $2,
+                    message_count = $3,
+                    version = version + 1,
+                    archived_at = NULL,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE chat_id = $1 AND version = $4
+                RETURNING version
+            """, chat_id, self.codec.encode_messages(messages), len(messages), state[0])
+            previous_count = state[1]
+        
+        if version is None:
+            self._write_conflicts += 1
+            row = await conn.fetchrow(
+                "SELECT messages, version, archived_at FROM conversations WHERE chat_id = $1 FOR UPDATE",
+                chat_id
+            )
+            if row is None and (state is not None or db_base is not None):
+                logger.debug({"message": "Dropped write to deleted conversation", "chat_id": chat_id})
+                return None
+            if row is None:
+                version = await conn.fetchval("""
+                    INSERT INTO conversations (chat_id, messages, message_count, version)
+                    VALUES ($1, $2, $3, 1)
+                    RETURNING version
+                """, chat_id, self.codec.encode_messages(messages), len(messages))
+                previous_count = 0
+            else:
+                if row['archived_at'] is not None:
+                    stored = self.codec.decode_messages(await self._take_archived_payload(conn, chat_id, row['archived_at']))
+                else:
+                    stored = self.codec.decode_messages(row['messages'])
+                if db_base is None:
+                    logger.warning(f"Overwriting concurrently modified chat {chat_id} without a merge base")
+                messages = self._merge_histories(stored, messages, db_base)
+                version = await conn.fetchval("""
+                    UPDATE conversations
+                    SET messages = $2,
+                        message_count = $3,
+                        version = version + 1,
+                        archived_at = NULL,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE chat_id = $1
+                    RETURNING version
+                """, chat_id, self.codec.encode_messages(messages), len(messages))
+                previous_count = len(stored)
+                logger.debug({
+                    "message": "Merged concurrent conversation update",
+                    "chat_id": chat_id,
+                    "stored_count": len(stored),
+                    "merged_count": len(messages)
+                })
+        
+        await self._index_messages(conn, chat_id, messages, previous_count)
+        self._mark_written([chat_id])
+        return messages, (version, len(messages))
+
+    @staticmethod
+    def _searchable_text(message: BaseMessage) -> Optional[Tuple[str, str]]:
+        """Return (role, text) for messages worth indexing, or None to skip the message."""
+        if isinstance(message, HumanMessage):
+            role = "user"
+        elif isinstance(message, AIMessage):
+            role = "assistant"
+        else:
+            return None
+        
+        content = message.content
+        if isinstance(content, list):
+            content = " ".join(
+                part.get("text", "") if isinstance(part, dict) else str(part)
+                for part in content
+            )
+        content = (content or "").strip()
+        return (role, content) if content else None
+
+    async def _index_messages(
+        self,
+        conn: asyncpg.Connection,
+        chat_id: str,
+        messages: List[BaseMessage],
+        start: int
+    ) -> None:
+        """Add messages from ``start`` onwards to the full-text search index."""
+        if start > len(messages):
+            await conn.execute(
+                "DELETE FROM conversation_search WHERE chat_id = $1 AND position >= $2",
+                chat_id, len(messages)
+            )
+            return
+        
+        positions, roles, contents = [], [], []
+        for position in range(start, len(messages)):
+            searchable = self._searchable_text(messages[position])
+            if searchable:
+                positions.append(position)
+                roles.append(searchable[0])
+                contents.append(searchable[1])
+        
+        if not positions:
+            return
+        
+        await conn.execute("""
+            INSERT INTO conversation_search (chat_id, position, role, content)
+            SELECT $1, t.position, t.role, t.content
+            FROM unnest($2::int[], $3::varchar[], $4::text[]) AS t(position, role, content)
+            ON CONFLICT (chat_id, position)
+            DO UPDATE SET role = EXCLUDED.role, content = EXCLUDED.content
+        """, chat_id, positions, roles, contents)
+
+    async def _backfill_search_index(self, conn: asyncpg.Connection, chat_ids: Optional[List[str]] = None) -> None:
+        """Index stored conversations in bulk.
+        
+        Runs over every conversation when the search table is first created, or
+        over ``chat_ids`` only after a bulk import.
+        """
+        result = await conn.execute("""
+            INSERT INTO conversation_search (chat_id, position, role, content)
+            SELECT
+                c.chat_id,
+                (m.ordinality - 1)::int,
+                CASE m.message ->> 'type' WHEN 'HumanMessage' THEN 'user' ELSE 'assistant' END,
+                CASE jsonb_typeof(m.message -> 'content')
+                    WHEN 'string' THEN m.message ->> 'content'
+                    ELSE (m.message -> 'content')::text
+                END
+            FROM conversations c
+            CROSS JOIN LATERAL jsonb_array_elements(c.messages) WITH ORDINALITY AS m(message, ordinality)
+            WHERE m.message ->> 'type' IN ('HumanMessage', 'AIMessage')
+              AND COALESCE(m.message ->> 'content', '') <> ''
+              AND ($1::varchar[] IS NULL OR c.chat_id = ANY($1::varchar[]))
+            ON CONFLICT (chat_id, position) DO NOTHING
+        """, chat_ids)
+        if chat_ids is None:
+            logger.info(f"Backfilled conversation search index: {result}")
+
+    @staticmethod
+    def _build_search_query(text: str) -> Optional[str]:
+        """Turn free text into a prefix-matching tsquery.
+        
+        Prefix matching lets Korean words match regardless of attached particles,
+        which the 'simple' text search configuration does not strip.
+        """
+        terms = []
+        for token in text.split():
+            cleaned = "".join(ch for ch in token if ch.isalnum() or ch in "_-")
+            cleaned = cleaned.strip("-")
+            if cleaned:
+                terms.append(f"{cleaned}:*")
+        return " & ".join(terms) if terms else None
+
+    async def search_messages(self, text: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
+        """Search conversation history with the full-text index.
+        
+        Args:
+            text: Free-text query
+            limit: Maximum number of matching messages to return
+            offset: Number of matching messages to skip, for pagination
+            
+        Returns:
+            Matching messages ordered by relevance and recency, each with chat_id,
+            chat name, position in the history, role and a highlighted snippet
+        """
+        tsquery = self._build_search_query(text)
+        if not tsquery:
+            return []
+        
+        async with self._read_connection() as conn:
+            rows = await conn.fetch("""
+                WITH query AS (
+                    SELECT to_tsquery('simple', $1) AS q
+                ),
+                hits AS (
+                    SELECT s.chat_id, s.position, s.role, s.content,
+                           ts_rank(s.tsv, query.q) AS rank, c.updated_at
+                    FROM conversation_search s
+                    CROSS JOIN query
+                    JOIN conversations c ON c.chat_id = s.chat_id
+                    WHERE s.tsv @@ query.q
+                    ORDER BY rank DESC, c.updated_at DESC, s.position DESC
+                    LIMIT $2 OFFSET $3
+                )
+                SELECT h.chat_id, h.position, h.role, h.rank, m.name,
+                       ts_headline('simple', h.content, query.q,
+                                   'MaxFragments=2, MaxWords=24, MinWords=8, StartSel=<<, StopSel=>>') AS snippet
+                FROM hits h
+                CROSS JOIN query
+                LEFT JOIN chat_metadata m ON m.chat_id = h.chat_id
+                ORDER BY h.rank DESC, h.updated_at DESC, h.position DESC
+            """, tsquery, limit, offset)
+            self._db_operations += 1
+        
+        return [
+            {
+                "chat_id": row['chat_id'],
+                "chat_name": row['name'] or f"Chat {row['chat_id'][:8]}",
+                "position": row['position'],
+                "role": row['role'],
+                "snippet": row['snippet'],
+                "rank": round(float(row['rank']), 4)
+            }
+            for row in rows
+            if row['chat_id'] not in self._pending_deletes
+        ]
 
     async def _batch_save_worker(self) -> None:
-        """Background worker to batch save operations."""
+        """Background worker to batch save operations.
+        
+        Each chat is written under its own savepoint, in chat_id order so two
+        workers never lock the same rows in opposite orders. A chat whose write
+        fails is rolled back alone and re-queued, up to ``_max_save_attempts``
+        times, unless a newer snapshot of it is already queued.
+        """
         while True:
             try:
                 await asyncio.sleep(1.0)
@@ -350,24 +1043,45 @@ class PostgreSQLConversationStorage:
                     saves_to_process = self._pending_saves.copy()
                     self._pending_saves.clear()
                 
-                async with self.pool.acquire() as conn:
-                    async with conn.transaction():
-                        for chat_id, messages in saves_to_process.items():
-                            serialized_messages = [self._message_to_dict(msg) for msg in messages]
-                            
-                            await conn.execute("""
-                                INSERT INTO conversations (chat_id, messages, message_count)
-                                VALUES ($1, $2, $3)
-                                ON CONFLICT (chat_id)
-                                DO UPDATE SET 
-                                    messages = EXCLUDED.messages,
-                                    message_count = EXCLUDED.message_count,
-                                    updated_at = CURRENT_TIMESTAMP
-                            """, chat_id, json.dumps(serialized_messages), len(messages))
+                written: Dict[str, Optional[Tuple[List[BaseMessage], Tuple[int, int]]]] = {}
+                failed: Dict[str, Tuple[List[BaseMessage], Optional[int]]] = {}
+                try:
+                    async with self.pool.acquire() as conn:
+                        async with conn.transaction():
+                            for chat_id in sorted(saves_to_process):
+                                messages, db_base = saves_to_process[chat_id]
+                                if chat_id in self._pending_deletes:
+                                    continue
+                                try:
+                                    async with conn.transaction():
+                                        written[chat_id] = await self._write_conversation(conn, chat_id, messages, db_base)
+                                except (asyncpg.PostgresError, ValueError) as e:
+                                    logger.warning({"message": "Failed to save conversation", "chat_id": chat_id, "error": str(e)})
+                                    failed[chat_id] = saves_to_process[chat_id]
+                        
+                        # No await between the commit and this loop, so a delete that
+                        # raced the batch is still listed in _pending_deletes here.
+                        for chat_id, result in written.items():
+                            self._save_attempts.pop(chat_id, None)
+                            if result is None or chat_id in self._pending_deletes:
+                                self._db_state.pop(chat_id, None)
+                                self._message_cache.pop(chat_id, None)
+                                continue
+                            saved, state = result
+                            self._db_state[chat_id] = state
+                            if saved is not saves_to_process[chat_id][0] and chat_id not in self._pending_saves:
+                                self._cache_messages(chat_id, saved)
+                except Exception:
+                    # The whole transaction rolled back, savepoints included.
+                    failed = dict(saves_to_process)
+                    written.clear()
+                    raise
+                finally:
+                    await self._requeue_saves(failed)
                 
-                self._db_operations += len(saves_to_process)
-                if saves_to_process:
-                    logger.debug(f"Batch saved {len(saves_to_process)} conversations")
+                self._db_operations += len(written)
+                if written:
+                    logger.debug(f"Batch saved {len(written)} conversations")
                     self._chat_list_cache = None
                     
             except asyncio.CancelledError:
@@ -375,29 +1089,203 @@ class PostgreSQLConversationStorage:
             except Exception as e:
                 logger.error(f"Error in batch save worker: {e}")
 
+    async def _requeue_saves(self, saves: Dict[str, Tuple[List[BaseMessage], Optional[int]]]) -> None:
+        """Queue failed snapshots again unless a newer one is queued or the chat was deleted."""
+        if not saves:
+            return
+        async with self._save_lock:
+            for chat_id, save in saves.items():
+                attempts = self._save_attempts.get(chat_id, 0) + 1
+                if attempts >= self._max_save_attempts:
+                    self._save_attempts.pop(chat_id, None)
+                    logger.error({"message": "Giving up on conversation save", "chat_id": chat_id, "attempts": attempts})
+                    continue
+                self._save_attempts[chat_id] = attempts
+                if chat_id not in self._pending_saves and not self.is_deleted(chat_id):
+                    self._pending_saves[chat_id] = save
+
     async def add_message(self, chat_id: str, message: BaseMessage) -> None:
         """Add a single message to conversation (optimized)."""
-        current_messages = await self.get_messages(chat_id)
+        current_messages = list(await self.get_messages(chat_id))
+        base_count = len(current_messages)
         current_messages.append(message)
         
-        await self.save_messages(chat_id, current_messages)
+        await self.save_messages(chat_id, current_messages, base_count=base_count)
+
+    async def create_chat(self, chat_id: str, name: Optional[str] = None) -> Dict[str, Any]:
+        """Create an empty conversation and its metadata in a single statement.
+        
+        Both rows are inserted by one CTE, so a chat is never left without its
+        metadata, and the caches are filled from the returned row without further
+        round trips.
+        
+        Args:
+            chat_id: New chat identifier
+            name: Display name; defaults to ``Chat <first 8 chars of chat_id>``
+            
+        Returns:
+            The chat metadata
+        """
+        name = name or f"Chat {chat_id[:8]}"
+        async with self.pool.acquire() as conn:
+            row = await conn.fetchrow("""
+                WITH conversation AS (
+                    INSERT INTO conversations (chat_id, messages, message_count, version)
+                    VALUES ($1, '[]'::jsonb, 0, 1)
+                    RETURNING chat_id, version
+                )
+                INSERT INTO chat_metadata (chat_id, name)
+                SELECT chat_id, $2 FROM conversation
+                RETURNING created_at, (SELECT version FROM conversation) AS version
+            """, chat_id, name)
+            self._db_operations += 1
+        
+        metadata = {"name": name, "created_at": row['created_at'].isoformat()}
+        self._deleted_chats.pop(chat_id, None)
+        self._db_state[chat_id] = (row['version'], 0)
+        self._cache_messages(chat_id, [])
+        self._metadata_cache[chat_id] = CacheEntry(data=metadata, timestamp=time.time(), ttl=self.cache_ttl)
+        if self._chat_list_cache and not self._chat_list_cache.is_expired():
+            self._chat_list_cache.data = [chat_id] + self._chat_list_cache.data
+        self._mark_written([chat_id])
+        return metadata
+
+    async def rename_chat(self, chat_id: str, name: str) -> bool:
+        """Rename an existing chat in a single statement.
+        
+        Returns:
+            False if the chat does not exist
+        """
+        async with self.pool.acquire() as conn:
+            created_at = await conn.fetchval("""
+                INSERT INTO chat_metadata (chat_id, name)
+                SELECT chat_id, $2 FROM conversations WHERE chat_id = $1
+                ON CONFLICT (chat_id)
+                DO UPDATE SET
+                    name = EXCLUDED.name,
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING created_at
+            """, chat_id, name)
+            self._db_operations += 1
+        
+        if created_at is None:
+            return False
+        
+        self._metadata_cache[chat_id] = CacheEntry(
+            data={"name": name, "created_at": created_at.isoformat()},
+            timestamp=time.time(),
+            ttl=self.cache_ttl
+        )
+        self._mark_written([chat_id])
+        return True
 
     async def delete_conversation(self, chat_id: str) -> bool:
-        """Delete a conversation by chat_id."""
+        """Delete a conversation by chat_id.
+        
+        Metadata, search rows and any archived history go with it through
+        ON DELETE CASCADE, so this is a single statement. The chat is listed in
+        ``_pending_deletes`` until the delete finishes and its pending batched save
+        is dropped, so neither a queued nor an in-flight save can recreate it.
+        """
+        self._pending_deletes.add(chat_id)
         try:
+            self._pending_saves.pop(chat_id, None)
             async with self.pool.acquire() as conn:
-                result = await conn.execute(
-                    "DELETE FROM conversations WHERE chat_id = $1",
+                deleted = await conn.fetchval(
+                    "DELETE FROM conversations WHERE chat_id = $1 RETURNING chat_id",
                     chat_id
                 )
                 self._db_operations += 1
-                
-                self._invalidate_cache(chat_id)
-                
-                return "DELETE 1" in result
+            
+            self._mark_written([chat_id])
+            self._remember_deleted([chat_id])
+            self._message_cache.pop(chat_id, None)
+            self._metadata_cache.pop(chat_id, None)
+            self._db_state.pop(chat_id, None)
+            if self._chat_list_cache and chat_id in self._chat_list_cache.data:
+                self._chat_list_cache.data = [cid for cid in self._chat_list_cache.data if cid != chat_id]
+            
+            return deleted is not None
         except Exception as e:
             logger.error(f"Error deleting conversation {chat_id}: {e}")
             return False
+        finally:
+            self._pending_deletes.discard(chat_id)
+
+    def hide_conversations(self, chat_ids: List[str]) -> None:
+        """Hide chats from reads until a bulk delete removes them from the database.
+        
+        Drops pending batched saves and purges every cache in one pass so the
+        chats disappear immediately, while the actual delete can run later.
+        """
+        chat_id_set = set(chat_ids)
+        if not chat_id_set:
+            return
+        
+        self._pending_deletes.update(chat_id_set)
+        for chat_id in chat_id_set:
+            self._pending_saves.pop(chat_id, None)
+            self._db_state.pop(chat_id, None)
+            self._message_cache.pop(chat_id, None)
+            self._metadata_cache.pop(chat_id, None)
+        self._chat_list_cache = None
+
+    async def delete_conversations(self, chat_ids: List[str], batch_size: int = 1000) -> int:
+        """Delete many conversations with one statement per batch.
+        
+        Args:
+            chat_ids: Chat identifiers to delete
+            batch_size: Maximum number of chats deleted per statement
+            
+        Returns:
+            Number of deleted conversations
+        """
+        self.hide_conversations(chat_ids)
+        
+        deleted_count = 0
+        try:
+            for offset in range(0, len(chat_ids), batch_size):
+                batch = chat_ids[offset:offset + batch_size]
+                async with self.pool.acquire() as conn:
+                    result = await conn.execute(
+                        "DELETE FROM conversations WHERE chat_id = ANY($1::varchar[])",
+                        batch
+                    )
+                    self._db_operations += 1
+                self._mark_written(batch)
+                self._remember_deleted(batch)
+                deleted_count += int(result.split()[-1]) if result else 0
+        finally:
+            self._pending_deletes.difference_update(chat_ids)
+            self._chat_list_cache = None
+        
+        logger.debug(f"Bulk deleted {deleted_count} conversations")
+        return deleted_count
+
+    async def delete_images_for_chats(self, chat_ids: List[str], batch_size: int = 1000) -> List[str]:
+        """Delete stored images attached to the given chats.
+        
+        Returns:
+            Identifiers of the deleted images
+        """
+        deleted_ids: List[str] = []
+        for offset in range(0, len(chat_ids), batch_size):
+            batch = chat_ids[offset:offset + batch_size]
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    rows = await conn.fetch(
+                        "DELETE FROM images WHERE chat_id = ANY($1::varchar[]) RETURNING image_id, blob_sha256",
+                        batch
+                    )
+                    released = await self._release_blobs(conn, [row['blob_sha256'] for row in rows])
+                self._db_operations += 1
+            await asyncio.to_thread(self._remove_blob_files, released)
+            deleted_ids.extend(row['image_id'] for row in rows)
+        
+        for image_id in deleted_ids:
+            self._image_cache.pop(image_id, None)
+        
+        return deleted_ids
 
     async def list_conversations(self) -> List[str]:
         """List all conversation IDs with caching."""
@@ -405,13 +1293,13 @@ class PostgreSQLConversationStorage:
             self._cache_hits += 1
             return self._chat_list_cache.data
         
-        async with self.pool.acquire() as conn:
+        async with self._read_connection() as conn:
             rows = await conn.fetch(
                 "SELECT chat_id FROM conversations ORDER BY updated_at DESC"
             )
             self._db_operations += 1
             
-            chat_ids = [row['chat_id'] for row in rows]
+            chat_ids = [row['chat_id'] for row in rows if row['chat_id'] not in self._pending_deletes]
             
             self._chat_list_cache = CacheEntry(
                 data=chat_ids,
@@ -422,28 +1310,380 @@ class PostgreSQLConversationStorage:
             
             return chat_ids
 
-    async def store_image(self, image_id: str, image_base64: str) -> None:
-        """Store base64 image data with TTL."""
+    async def export_conversations(self, after: Optional[str] = None, batch_size: int = 500) -> AsyncIterator[bytes]:
+        """Stream conversations as NDJSON lines in chat_id order.
+        
+        Rows come from a server-side cursor inside one read-only snapshot, so memory
+        stays constant regardless of the number of chats. Histories are spliced in
+        as the JSON text PostgreSQL returns instead of being decoded, and archived
+        histories are decompressed on the fly.
+        
+        Args:
+            after: Resume cursor; only chats with a larger chat_id are exported
+            batch_size: Rows prefetched per cursor round trip
+            
+        Yields:
+            One ``{"chat_id", "name", "created_at", "updated_at", "messages"}`` JSON
+            object per line
+        """
+        decompressor = zstandard.ZstdDecompressor()
+        
+        async with self._read_connection() as conn:
+            async with conn.transaction(isolation='repeatable_read', readonly=True):
+                cursor = conn.cursor("""
+                    SELECT
+                        c.chat_id,
+                        m.name,
+                        c.created_at,
+                        c.updated_at,
+                        CASE WHEN c.archived_at IS NULL THEN c.messages::text END AS messages,
+                        a.payload AS archived_payload
+                    FROM conversations c
+                    LEFT JOIN chat_metadata m ON m.chat_id = c.chat_id
+                    LEFT JOIN conversation_archive a
+                        ON a.chat_id = c.chat_id AND a.archived_at = c.archived_at
+                    WHERE c.chat_id > COALESCE($1::varchar, '')
+                    ORDER BY c.chat_id
+                """, after, prefetch=batch_size)
+                
+                async for row in cursor:
+                    if row['chat_id'] in self._pending_deletes:
+                        continue
+                    
+                    if row['archived_payload'] is not None:
+                        messages = decompressor.decompress(row['archived_payload'])
+                    else:
+                        messages = (row['messages'] or "[]").encode("utf-8")
+                    
+                    header = orjson.dumps({
+                        "chat_id": row['chat_id'],
+                        "name": row['name'],
+                        "created_at": row['created_at'],
+                        "updated_at": row['updated_at']
+                    })
+                    yield header[:-1] + b',"messages":' + messages + b'}\n'
+                self._db_operations += 1
+
+    async def import_conversations(
+        self,
+        chunks: AsyncIterator[bytes],
+        after: Optional[str] = None,
+        batch_size: int = 500,
+        max_record_bytes: int = 64 * 1024 * 1024
+    ) -> Dict[str, Any]:
+        """Bulk-load NDJSON produced by export_conversations.
+        
+        Lines are parsed incrementally and loaded batch by batch with COPY into a
+        staging table, so memory is bounded by ``batch_size`` and
+        ``max_record_bytes``. Each chunk is only scanned for newlines once. Chats
+        that already exist are left untouched, which makes an interrupted import
+        safe to repeat.
+        
+        Args:
+            chunks: Raw NDJSON byte chunks, e.g. a request body stream
+            after: Resume cursor; lines with a chat_id not greater than it are skipped
+            batch_size: Chats per COPY and transaction
+            max_record_bytes: Longer lines are skipped and reported as errors
+            
+        Returns:
+            Counts of imported and skipped chats, up to 20 sample errors and
+            ``last_chat_id``, the cursor to resume from. If a batch fails to load,
+            the import stops and ``aborted`` holds the error; batches before it
+            stay committed and ``last_chat_id`` points past them.
+        """
+        report: Dict[str, Any] = {"imported": 0, "skipped": 0, "errors": [], "error_count": 0, "last_chat_id": after}
+        batch: List[tuple] = []
+        buffer = bytearray()
+        scanned = 0
+        oversized = False
+        line_number = 0
+        
+        async def flush() -> bool:
+            try:
+                imported = await self._copy_import_batch(batch)
+            except (asyncpg.PostgresError, asyncpg.InterfaceError, ValueError, OSError) as e:
+                logger.error({"message": "Chat import batch failed", "first_chat_id": batch[0][0], "error": str(e)})
+                report["aborted"] = str(e)
+                return False
+            report["imported"] += len(imported)
+            report["skipped"] += len(batch) - len(imported)
+            report["last_chat_id"] = batch[-1][0]
+            batch.clear()
+            return True
+        
+        def record_error(line: int, error: str) -> None:
+            report["error_count"] += 1
+            if len(report["errors"]) < 20:
+                report["errors"].append({"line": line, "error": error})
+        
+        def parse(line: bytes) -> None:
+            nonlocal line_number
+            line_number += 1
+            if not line.strip():
+                return
+            try:
+                record = orjson.loads(line)
+                chat_id, encoded, message_count, name = self._validate_import_record(record)
+            except (orjson.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                record_error(line_number, str(e))
+                return
+            
+            if after is not None and chat_id <= after:
+                report["skipped"] += 1
+                return
+            
+            batch.append((
+                chat_id,
+                name,
+                self._parse_timestamp(record.get("created_at")),
+                self._parse_timestamp(record.get("updated_at")),
+                encoded,
+                message_count
+            ))
+        
+        async for chunk in chunks:
+            buffer += chunk
+            start = 0
+            while True:
+                newline = buffer.find(b"\n", max(start, scanned))
+                if newline < 0:
+                    break
+                if oversized:
+                    line_number += 1
+                    oversized = False
+                elif newline - start > max_record_bytes:
+                    line_number += 1
+                    record_error(line_number, f"Record exceeds {max_record_bytes} bytes")
+                else:
+                    parse(bytes(buffer[start:newline]))
+                start = newline + 1
+                if len(batch) >= batch_size and not await flush():
+                    self._chat_list_cache = None
+                    return report
+            del buffer[:start]
+            scanned = len(buffer)
+            
+            if len(buffer) > max_record_bytes:
+                if not oversized:
+                    record_error(line_number + 1, f"Record exceeds {max_record_bytes} bytes")
+                    oversized = True
+                buffer.clear()
+                scanned = 0
+        if not oversized:
+            parse(bytes(buffer))
+        if batch:
+            await flush()
+        
+        self._chat_list_cache = None
+        return report
+
+    def _validate_import_record(self, record: Any) -> Tuple[str, bytes, int, Optional[str]]:
+        """Check an imported record against the column sizes and the message codec.
+        
+        Returns:
+            Tuple of (chat_id, encoded messages, message count, name)
+            
+        Raises:
+            ValueError: If the record would fail to load or to decode later
+        """
+        if not isinstance(record, dict):
+            raise ValueError("record must be a JSON object")
+        chat_id = record["chat_id"]
+        messages = record["messages"]
+        name = record.get("name")
+        if not isinstance(chat_id, str) or not chat_id or len(chat_id) > MAX_CHAT_ID_LENGTH or "\x00" in chat_id:
+            raise ValueError(f"chat_id must be a non-empty string of at most {MAX_CHAT_ID_LENGTH} characters")
+        if name is not None and (not isinstance(name, str) or len(name) > MAX_CHAT_NAME_LENGTH or "\x00" in name):
+            raise ValueError(f"name must be a string of at most {MAX_CHAT_NAME_LENGTH} characters")
+        if not isinstance(messages, list):
+            raise ValueError("messages must be a list")
+        for index, message in enumerate(messages):
+            if not isinstance(message, dict) or not isinstance(message.get("type"), str) or "content" not in message:
+                raise ValueError(f"message {index} must be an object with type and content")
+            try:
+                self.codec.from_dict(message)
+            except Exception as e:
+                raise ValueError(f"message {index} is invalid: {e}") from e
+        encoded = orjson.dumps(messages)
+        if b"\\u0000" in encoded:
+            raise ValueError("messages must not contain NUL characters")
+        return chat_id, encoded, len(messages), name
+
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+        """Parse an exported ISO timestamp, ignoring missing or malformed values.
+        
+        Aware timestamps are converted to naive UTC to fit the TIMESTAMP columns.
+        """
+        if not value:
+            return None
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            return None
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+
+    async def _copy_import_batch(self, records: List[tuple]) -> List[str]:
+        """COPY one batch of imported chats and insert the ones that do not exist yet.
+        
+        Returns:
+            chat_ids that were inserted
+        """
         async with self.pool.acquire() as conn:
-            await conn.execute("""
-                INSERT INTO images (image_id, image_data)
-                VALUES ($1, $2)
-                ON CONFLICT (image_id)
-                DO UPDATE SET 
-                    image_data = EXCLUDED.image_data,
-                    created_at = CURRENT_TIMESTAMP,
-                    expires_at = CURRENT_TIMESTAMP + INTERVAL '1 hour'
-            """, image_id, image_base64)
+            async with conn.transaction():
+                await conn.execute("""
+                    CREATE TEMP TABLE chat_import_staging (
+                        chat_id VARCHAR(255),
+                        name VARCHAR(500),
+                        created_at TIMESTAMP,
+                        updated_at TIMESTAMP,
+                        messages JSONB,
+                        message_count INTEGER
+                    ) ON COMMIT DROP
+                """)
+                await conn.copy_records_to_table("chat_import_staging", records=records)
+                
+                rows = await conn.fetch("""
+                    INSERT INTO conversations (chat_id, messages, message_count, created_at, updated_at)
+                    SELECT DISTINCT ON (chat_id)
+                        chat_id,
+                        messages,
+                        message_count,
+                        COALESCE(created_at, CURRENT_TIMESTAMP),
+                        COALESCE(updated_at, created_at, CURRENT_TIMESTAMP)
+                    FROM chat_import_staging
+                    ORDER BY chat_id
+                    ON CONFLICT (chat_id) DO NOTHING
+                    RETURNING chat_id
+                """)
+                imported = [row['chat_id'] for row in rows]
+                
+                if imported:
+                    await conn.execute("""
+                        INSERT INTO chat_metadata (chat_id, name)
+                        SELECT DISTINCT ON (chat_id) chat_id, name
+                        FROM chat_import_staging
+                        WHERE chat_id = ANY($1::varchar[]) AND name IS NOT NULL
+                        ORDER BY chat_id
+                        ON CONFLICT (chat_id) DO NOTHING
+                    """, imported)
+                    await self._backfill_search_index(conn, imported)
+            self._db_operations += 1
+        
+        self._mark_written(imported)
+        for chat_id in imported:
+            self._deleted_chats.pop(chat_id, None)
+        return imported
+
+    async def store_image_bytes(
+        self,
+        image_id: str,
+        data: bytes,
+        content_type: str,
+        extension: str,
+        chat_id: Optional[str] = None
+    ) -> str:
+        """Store image bytes once per distinct content and reference them from an image row.
+        
+        Identical uploads share one blob file; only metadata and a reference
+        count are kept in PostgreSQL.
+        
+        Args:
+            image_id: Identifier of the new image
+            data: Raw image bytes
+            content_type: MIME type reported by the client
+            extension: File extension used for the blob file
+            chat_id: Chat the image was uploaded to
+            
+        Returns:
+            File name of the blob inside the blob store
+        """
+        if self.blob_store is None:
+            raise RuntimeError("A blob store is required to store image bytes")
+        
+        sha256 = self.blob_store.digest(data)
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute("SELECT pg_advisory_xact_lock(hashtext($1))", sha256)
+                file_name = await conn.fetchval("""
+                    INSERT INTO image_blobs (sha256, file_name, content_type, size_bytes, ref_count)
+                    VALUES ($1, $2, $3, $4, 1)
+                    ON CONFLICT (sha256)
+                    DO UPDATE SET ref_count = image_blobs.ref_count + 1
+                    RETURNING file_name
+                """, sha256, self.blob_store.file_name_for(sha256, extension), content_type, len(data))
+                # Written before the reference commits, while holding the blob row lock
+                # that releases take before unlinking, so a committed image row always
+                # has its file. If the commit fails, the orphan sweeper reclaims it.
+                await asyncio.to_thread(self.blob_store.write, file_name, data)
+                await conn.execute("""
+                    INSERT INTO images (image_id, blob_sha256, chat_id)
+                    VALUES ($1, $2, $3)
+                """, image_id, sha256, chat_id)
             self._db_operations += 1
         
+        image_path = self.blob_store.path_for(file_name)
         self._image_cache[image_id] = CacheEntry(
-            data=image_base64,
+            data=image_path,
             timestamp=time.time(),
             ttl=3600
         )
+        return file_name
+
+    async def _release_blobs(self, conn: asyncpg.Connection, blob_shas: List[Optional[str]]) -> List[str]:
+        """Drop one reference per entry and delete blob rows that are no longer referenced.
+        
+        Must run inside the transaction that deleted the referencing image rows, and
+        the returned files must be removed before that transaction commits.
+        
+        Returns:
+            File names of blobs whose last reference was released
+        """
+        counts = Counter(sha for sha in blob_shas if sha)
+        if not counts:
+            return []
+        
+        await conn.execute("""
+            UPDATE image_blobs b
+            SET ref_count = b.ref_count - d.n
+            FROM unnest($1::varchar[], $2::int[]) AS d(sha256, n)
+            WHERE b.sha256 = d.sha256
+        """, list(counts.keys()), list(counts.values()))
+        rows = await conn.fetch("""
+            DELETE FROM image_blobs
+            WHERE sha256 = ANY($1::varchar[]) AND ref_count <= 0
+            RETURNING file_name
+        """, list(counts.keys()))
+        return [row['file_name'] for row in rows]
+
+    def _remove_blob_files(self, file_names: List[str]) -> Tuple[int, int]:
+        """Remove released blob files from disk.
+        
+        Returns:
+            Tuple of (files removed, bytes freed)
+        """
+        if self.blob_store is None:
+            return 0, 0
+        
+        removed, freed_bytes = 0, 0
+        for file_name in file_names:
+            try:
+                size_bytes = self.blob_store.remove(file_name)
+                if size_bytes:
+                    removed += 1
+                    freed_bytes += size_bytes
+            except OSError as e:
+                logger.warning(f"Failed to remove blob file {file_name}: {e}")
+        return removed, freed_bytes
 
     async def get_image(self, image_id: str) -> Optional[str]:
-        """Retrieve base64 image data with caching."""
+        """Retrieve an image reference with caching.
+        
+        Returns the blob file path for content-addressed images, or the base64
+        data URI for images stored before the blob store existed.
+        """
         cache_entry = self._image_cache.get(image_id)
         if cache_entry and not cache_entry.is_expired():
             self._cache_hits += 1
@@ -451,13 +1691,18 @@ class PostgreSQLConversationStorage:
         
         async with self.pool.acquire() as conn:
             row = await conn.fetchrow("""
-                SELECT image_data FROM images 
-                WHERE image_id = $1 AND expires_at > CURRENT_TIMESTAMP
+                SELECT i.image_data, b.file_name
+                FROM images i
+                LEFT JOIN image_blobs b ON b.sha256 = i.blob_sha256
+                WHERE i.image_id = $1 AND i.expires_at > CURRENT_TIMESTAMP
             """, image_id)
             self._db_operations += 1
             
-            if row:
-                image_data = row['image_data']
+            if row and (row['file_name'] or row['image_data']):
+                if row['file_name'] and self.blob_store is not None:
+                    image_data = self.blob_store.path_for(row['file_name'])
+                else:
+                    image_data = row['image_data']
                 self._image_cache[image_id] = CacheEntry(
                     data=image_data,
                     timestamp=time.time(),
@@ -475,7 +1720,7 @@ class PostgreSQLConversationStorage:
             self._cache_hits += 1
             return cache_entry.data
         
-        async with self.pool.acquire() as conn:
+        async with self._read_connection(chat_id) as conn:
             row = await conn.fetchrow(
                 "SELECT name, created_at FROM chat_metadata WHERE chat_id = $1",
                 chat_id
@@ -511,6 +1756,7 @@ class PostgreSQLConversationStorage:
                     updated_at = CURRENT_TIMESTAMP
             """, chat_id, name)
             self._db_operations += 1
+        self._mark_written([chat_id])
         
         self._metadata_cache[chat_id] = CacheEntry(
             data={"name": name},
@@ -518,26 +1764,321 @@ class PostgreSQLConversationStorage:
             ttl=self.cache_ttl
         )
 
-    async def cleanup_expired_images(self) -> int:
-        """Clean up expired images and return count of deleted images."""
+    async def cleanup_expired_images(self, batch_size: int = 500) -> int:
+        """Clean up expired images and return count of deleted images.
+        
+        Rows are deleted in batches of ``batch_size`` so a large backlog never
+        holds locks or a pooled connection for long.
+        """
+        deleted_count, _, _ = await self._delete_expired_images(batch_size)
+        self._prune_expired_cache_entries()
+        
+        if deleted_count > 0:
+            logger.debug(f"Cleaned up {deleted_count} expired images")
+        
+        return deleted_count
+
+    async def _delete_expired_images(self, batch_size: int) -> Tuple[int, int, int]:
+        """Delete expired images batch by batch until none are left.
+        
+        Returns:
+            Tuple of (image rows deleted, blob files removed, bytes freed)
+        """
+        deleted_count, removed_files, freed_bytes = 0, 0, 0
+        while True:
+            deleted, batch_removed, batch_freed = await self._delete_expired_image_batch(batch_size)
+            deleted_count += deleted
+            removed_files += batch_removed
+            freed_bytes += batch_freed
+            if deleted < batch_size:
+                break
+            await asyncio.sleep(0)
+        return deleted_count, removed_files, freed_bytes
+
+    async def _delete_expired_image_batch(self, batch_size: int) -> Tuple[int, int, int]:
+        """Delete one batch of expired images and release their blobs.
+        
+        Returns:
+            Tuple of (image rows deleted, blob files removed, bytes freed)
+        """
         async with self.pool.acquire() as conn:
-            result = await conn.execute(
-                "DELETE FROM images WHERE expires_at < CURRENT_TIMESTAMP"
-            )
+            async with conn.transaction():
+                rows = await conn.fetch("""
+                    DELETE FROM images
+                    WHERE image_id IN (
+                        SELECT image_id FROM images
+                        WHERE expires_at < CURRENT_TIMESTAMP
+                        LIMIT $1
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING image_id, blob_sha256
+                """, batch_size)
+                released_files = await self._release_blobs(conn, [row['blob_sha256'] for row in rows])
             self._db_operations += 1
-            
-            expired_keys = [
-                key for key, entry in self._image_cache.items()
-                if entry.is_expired()
-            ]
+        
+        # Files are unlinked only once the release has committed.
+        removed_files, freed_bytes = await asyncio.to_thread(self._remove_blob_files, released_files)
+        for row in rows:
+            self._image_cache.pop(row['image_id'], None)
+        
+        return len(rows), removed_files, freed_bytes
+
+    def _prune_expired_cache_entries(self) -> int:
+        """Drop expired entries from every in-memory cache and return how many were removed."""
+        pruned = 0
+        for cache in (self._message_cache, self._metadata_cache, self._image_cache):
+            expired_keys = [key for key, entry in cache.items() if entry.is_expired()]
             for key in expired_keys:
-                del self._image_cache[key]
+                del cache[key]
+                if cache is self._message_cache and key not in self._pending_saves:
+                    self._db_state.pop(key, None)
+            pruned += len(expired_keys)
+        
+        if self._chat_list_cache and self._chat_list_cache.is_expired():
+            self._chat_list_cache = None
+            pruned += 1
+        
+        return pruned
+
+    async def _remove_orphaned_blob_files(self, batch_size: int, grace_seconds: float) -> Tuple[int, int]:
+        """Remove upload files that no image or blob row references anymore.
+        
+        Files younger than ``grace_seconds`` are skipped so uploads that are still
+        being committed are never touched. Besides blob files this also reclaims
+        legacy ``<image_id>.<ext>`` uploads and stale temporary files. The
+        reference check and the unlink run under the per-digest advisory lock that
+        store_image_bytes takes, so a concurrent re-upload of the same content
+        either commits its reference first or writes the file again afterwards.
+        
+        Returns:
+            Tuple of (files removed, bytes freed)
+        """
+        if self.blob_store is None:
+            return 0, 0
+        
+        candidates = await asyncio.to_thread(self.blob_store.list_files, grace_seconds)
+        
+        removed, freed_bytes = 0, 0
+        for offset in range(0, len(candidates), batch_size):
+            batch = candidates[offset:offset + batch_size]
+            keys = [os.path.splitext(name)[0] for name, _ in batch]
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        SELECT pg_advisory_xact_lock(lock_key)
+                        FROM (
+                            SELECT DISTINCT hashtext(key) AS lock_key
+                            FROM unnest($1::varchar[]) AS key
+                            ORDER BY lock_key
+                        ) locks
+                    """, keys)
+                    rows = await conn.fetch("""
+                        SELECT sha256 AS key FROM image_blobs WHERE sha256 = ANY($1::varchar[])
+                        UNION
+                        SELECT image_id AS key FROM images WHERE image_id = ANY($1::varchar[])
+                    """, keys)
+                    referenced = {row['key'] for row in rows}
+                    
+                    orphans = [name for (name, _), key in zip(batch, keys) if key not in referenced]
+                    batch_removed, batch_freed = await asyncio.to_thread(self._remove_blob_files, orphans)
+                self._db_operations += 1
+            removed += batch_removed
+            freed_bytes += batch_freed
+            await asyncio.sleep(0)
+        
+        return removed, freed_bytes
+
+    def _compress_histories(self, payloads: List[str]) -> List[bytes]:
+        """Compress serialized histories with zstd; runs in a worker thread."""
+        compressor = zstandard.ZstdCompressor(level=self.archive_compression_level)
+        return [compressor.compress(payload.encode("utf-8")) for payload in payloads]
+
+    async def archive_inactive_conversations(self, idle_days: float, batch_size: int = 500) -> Dict[str, int]:
+        """Move chats idle for ``idle_days`` into the compressed archive table.
+        
+        The conversations row is kept with an empty history so listings, metadata
+        and search keep working; only the JSONB payload leaves the hot table.
+        Archived chats are restored transparently by get_messages.
+        
+        Args:
+            idle_days: Minimum days since the last update
+            batch_size: Maximum chats archived per transaction
+            
+        Returns:
+            Number of archived chats and their raw and compressed sizes in bytes
+        """
+        archived, raw_bytes, compressed_bytes = 0, 0, 0
+        
+        while True:
+            busy = list(self._pending_deletes | self._pending_saves.keys())
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    rows = await conn.fetch("""
+                        SELECT chat_id, messages::text AS payload, message_count
+                        FROM conversations
+                        WHERE archived_at IS NULL
+                          AND updated_at < CURRENT_TIMESTAMP - make_interval(secs => $1)
+                          AND NOT (chat_id = ANY($3::varchar[]))
+                        ORDER BY updated_at
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    """, idle_days * 86400, batch_size, busy)
+                    
+                    if rows:
+                        chat_ids = [row['chat_id'] for row in rows]
+                        raw = [row['payload'] for row in rows]
+                        compressed = await asyncio.to_thread(self._compress_histories, raw)
+                        raw_sizes = [len(payload.encode("utf-8")) for payload in raw]
+                        
+                        archived_at = await conn.fetchval("SELECT LOCALTIMESTAMP")
+                        if self.conversation_partitions:
+                            await self._ensure_archive_partition(conn, archived_at)
+                        
+                        await conn.execute(
+                            "DELETE FROM conversation_archive WHERE chat_id = ANY($1::varchar[])",
+                            chat_ids
+                        )
+                        await conn.execute("""
+                            INSERT INTO conversation_archive (chat_id, payload, message_count, raw_bytes, archived_at)
+                            SELECT *, $5::timestamp FROM unnest($1::varchar[], $2::bytea[], $3::int[], $4::int[])
+                        """, chat_ids, compressed, [row['message_count'] or 0 for row in rows], raw_sizes, archived_at)
+                        await conn.execute("""
+                            UPDATE conversations
+                            SET messages = '[]'::jsonb,
+                                archived_at = $2,
+                                version = version + 1
+                            WHERE chat_id = ANY($1::varchar[])
+                        """, chat_ids, archived_at)
+                self._db_operations += 1
+            
+            if rows:
+                for chat_id in chat_ids:
+                    self._message_cache.pop(chat_id, None)
+                    self._db_state.pop(chat_id, None)
+                self._mark_written(chat_ids)
+                archived += len(rows)
+                raw_bytes += sum(raw_sizes)
+                compressed_bytes += sum(len(payload) for payload in compressed)
+            
+            if len(rows) < batch_size:
+                break
+            await asyncio.sleep(0)
+        
+        return {"archived": archived, "raw_bytes": raw_bytes, "compressed_bytes": compressed_bytes}
+
+    async def _take_archived_payload(self, conn: asyncpg.Connection, chat_id: str, archived_at: datetime) -> bytes:
+        """Remove a chat's archive row and return its decompressed JSON history.
+        
+        Filtering on archived_at as well lets PostgreSQL prune to a single monthly
+        partition when the archive is partitioned.
+        """
+        payload = await conn.fetchval(
+            "DELETE FROM conversation_archive WHERE chat_id = $1 AND archived_at = $2 RETURNING payload",
+            chat_id, archived_at
+        )
+        if payload is None:
+            return b"[]"
+        return zstandard.ZstdDecompressor().decompress(payload)
+
+    async def _restore_archived(self, conn: asyncpg.Connection, chat_id: str) -> List[BaseMessage]:
+        """Move an archived chat back into the hot table and warm the cache."""
+        async with conn.transaction():
+            row = await conn.fetchrow(
+                "SELECT messages, version, archived_at FROM conversations WHERE chat_id = $1 FOR UPDATE",
+                chat_id
+            )
+            if row is None:
+                return []
             
-            deleted_count = int(result.split()[-1]) if result else 0
-            if deleted_count > 0:
-                logger.debug(f"Cleaned up {deleted_count} expired images")
+            if row['archived_at'] is None:
+                messages = self.codec.decode_messages(row['messages'])
+                version = row['version']
+            else:
+                payload = await self._take_archived_payload(conn, chat_id, row['archived_at'])
+                version = await conn.fetchval("""
+                    UPDATE conversations
+                    SET messages = $2, archived_at = NULL, version = version + 1
+                    WHERE chat_id = $1
+                    RETURNING version
+                """, chat_id, payload)
+                messages = self.codec.decode_messages(payload)
+                self._archive_restores += 1
+        self._db_operations += 1
+        
+        self._db_state[chat_id] = (version, len(messages))
+        self._cache_messages(chat_id, messages)
+        self._mark_written([chat_id])
+        logger.debug({
+            "message": "Restored archived conversation",
+            "chat_id": chat_id,
+            "message_count": len(messages)
+        })
+        return messages
+
+    async def sweep_retention(self, batch_size: int = 500, orphan_grace_seconds: float = 3600) -> Dict[str, Any]:
+        """Run one retention pass over images, upload files, caches and idle chats.
+        
+        Args:
+            batch_size: Maximum rows or files handled per database round trip
+            orphan_grace_seconds: Minimum age of a file before it may be treated as orphaned
             
-            return deleted_count
+        Returns:
+            Summary of what was reclaimed
+        """
+        started = time.time()
+        expired_images, removed_files, freed_bytes = await self._delete_expired_images(batch_size)
+        
+        orphaned_files, orphaned_bytes = await self._remove_orphaned_blob_files(batch_size, orphan_grace_seconds)
+        pruned_cache_entries = self._prune_expired_cache_entries()
+        
+        archive = {"archived": 0, "raw_bytes": 0, "compressed_bytes": 0}
+        if self.archive_after_days:
+            archive = await self.archive_inactive_conversations(self.archive_after_days, batch_size)
+        
+        report = {
+            "expired_images": expired_images,
+            "removed_files": removed_files + orphaned_files,
+            "orphaned_files": orphaned_files,
+            "freed_bytes": freed_bytes + orphaned_bytes,
+            "pruned_cache_entries": pruned_cache_entries,
+            "archived_chats": archive["archived"],
+            "archived_raw_bytes": archive["raw_bytes"],
+            "archived_compressed_bytes": archive["compressed_bytes"],
+            "duration_ms": round((time.time() - started) * 1000, 2),
+            "finished_at": datetime.utcnow().isoformat() + "Z"
+        }
+        self._last_sweep = report
+        return report
+
+    def start_retention_sweeper(
+        self,
+        interval_seconds: float = 600,
+        batch_size: int = 500,
+        orphan_grace_seconds: float = 3600
+    ) -> None:
+        """Start the background retention sweeper; it is stopped by close()."""
+        if self._retention_task and not self._retention_task.done():
+            return
+        self._retention_task = asyncio.create_task(
+            self._retention_worker(interval_seconds, batch_size, orphan_grace_seconds)
+        )
+
+    async def _retention_worker(self, interval_seconds: float, batch_size: int, orphan_grace_seconds: float) -> None:
+        """Background worker that periodically reclaims expired images and files."""
+        while True:
+            try:
+                await asyncio.sleep(interval_seconds)
+                
+                report = await self.sweep_retention(batch_size, orphan_grace_seconds)
+                if report["expired_images"] or report["removed_files"] or report["archived_chats"]:
+                    logger.info({"message": "Retention sweep reclaimed storage", **report})
+                else:
+                    logger.debug({"message": "Retention sweep found nothing to reclaim", **report})
+                    
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in retention sweeper: {e}")
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
@@ -551,7 +2092,12 @@ class PostgreSQLConversationStorage:
             "db_operations": self._db_operations,
             "cached_conversations": len(self._message_cache),
             "cached_metadata": len(self._metadata_cache),
-            "cached_images": len(self._image_cache)
+            "cached_images": len(self._image_cache),
+            "codec": self.codec.get_stats(),
+            "write_conflicts_merged": self._write_conflicts,
+            "archive_restores": self._archive_restores,
+            "pools": self.get_pool_stats(),
+            "last_retention_sweep": self._last_sweep
         }
 
     def load_conversation_history(self, chat_id: str) -> List[Dict]:
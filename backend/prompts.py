@@ -29,6 +29,7 @@ CRITICAL RULES:
 - **ALWAYS** use a tool when the user's request matches a tool's capability. For example:
   - If the user asks to "generate code", "develop", "build", "create", "write a script", "make a website", "develop an app", etc. → **MUST** use the write_code tool with appropriate programming_language parameter
   - If the user asks to "search", "find", "summarize", "analyze documents/reports", "key points", etc. → **MUST** use the search_documents tool with the query, don't add any other text to the query. You can assume that the user has already uploaded the document and just call the tool.
+  - If the user asks several independent questions about their documents in one message → use the search_documents_batch tool once with all of the questions instead of several search_documents calls.
   - If the user asks to "search the web", "look up online", "인터넷 검색", "뉴스 찾아줘", or needs fresh/general knowledge not in uploaded docs → **MUST** use the web_search tool with the query.
   - If the user asks to analyze/describe/understand an image (e.g., "what's in this image", "describe the picture") → **MUST** use the explain_image tool
   - If the user asks to "generate an image", "create a picture", "draw", "make an illustration", "이미지 생성", "그림 그려줘", or describes a visual scene to create → **MUST** use the generate_image tool with the prompt parameter
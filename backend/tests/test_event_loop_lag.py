@@ -0,0 +1,111 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests that async embedding leaves the event loop free to serve other work.
+
+Run from the backend directory:
+    uv run python -m unittest discover tests
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from vector_store import CustomEmbeddings
+
+
+REQUEST_LATENCY = 0.05
+DIMENSIONS = 8
+
+
+class SlowEmbeddingHandler(BaseHTTPRequestHandler):
+    """OpenAI-style embedding endpoint that takes REQUEST_LATENCY per request."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(REQUEST_LATENCY)
+        data = [
+            {"object": "embedding", "index": index, "embedding": [1.0] * DIMENSIONS}
+            for index in range(len(body["input"]))
+        ]
+        payload = json.dumps({"object": "list", "data": data, "model": body.get("model")}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class EventLoopLagTest(unittest.IsolatedAsyncioTestCase):
+    TICK = 0.01
+    MAX_LAG = 0.1
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowEmbeddingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.embeddings = CustomEmbeddings(
+            model="fake",
+            host=f"http://127.0.0.1:{self.server.server_address[1]}",
+            batch_size=8,
+            max_concurrency=2
+        )
+
+    async def asyncTearDown(self):
+        await self.embeddings.aclose()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_aembed_documents_keeps_heartbeat_on_time(self):
+        lags = []
+        stop = asyncio.Event()
+
+        async def heartbeat():
+            while not stop.is_set():
+                expected = time.perf_counter() + self.TICK
+                await asyncio.sleep(self.TICK)
+                lags.append(time.perf_counter() - expected)
+
+        beat = asyncio.create_task(heartbeat())
+        texts = [f"chunk {i}" for i in range(64)]
+        started = time.perf_counter()
+        vectors = await self.embeddings.aembed_documents(texts)
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await beat
+
+        self.assertEqual(len(vectors), len(texts))
+        # Eight batches two at a time: the loop had to wait on the server.
+        self.assertGreaterEqual(elapsed, 4 * REQUEST_LATENCY)
+        self.assertGreater(len(lags), elapsed / self.TICK / 2)
+        self.assertLess(max(lags), self.MAX_LAG)
+
+
+if __name__ == "__main__":
+    unittest.main()
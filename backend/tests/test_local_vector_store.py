@@ -0,0 +1,68 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for LocalVectorIndex shared between processes.
+
+Run from the backend directory:
+    uv run python -m unittest discover tests
+"""
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from local_vector_store import LocalVectorIndex
+
+
+class SharedDirectoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="local_vector_store_test_")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_reader_rebuilds_after_clear_and_refill(self):
+        rng = np.random.default_rng(7)
+        writer = LocalVectorIndex(self.directory)
+        reader = LocalVectorIndex(self.directory)
+
+        old = rng.normal(size=(4, 8)).astype(np.float32)
+        writer.add(["old"] * 4, old, [{"source": "old.pdf", "task_id": "t1"}] * 4)
+        reader.refresh()
+        self.assertEqual(reader.stats()["live_rows"], 4)
+
+        writer.clear()
+        new = rng.normal(size=(6, 8)).astype(np.float32)
+        writer.add(["new"] * 6, new, [{"source": "new.pdf", "task_id": "t2"}] * 6)
+
+        hits = reader.search(new[2], 3, sources=["new.pdf"])
+        self.assertEqual(hits[0][0], 2)
+        self.assertAlmostEqual(hits[0][1], 0.0, places=4)
+        self.assertTrue(all(distance >= -1e-4 for _, distance in hits))
+        self.assertEqual(reader.search(new[2], 3, sources=["old.pdf"]), [])
+
+        writer.close()
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
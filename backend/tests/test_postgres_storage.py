@@ -0,0 +1,250 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for PostgreSQLConversationStorage that run without a database.
+
+Run from the backend directory:
+    uv run python -m unittest discover tests
+"""
+import asyncio
+import sys
+import unittest
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import asyncpg
+
+from postgres_storage import PostgreSQLConversationStorage
+
+
+class FakeConnection:
+    """Records statements and answers them from canned results."""
+
+    def __init__(self, fetchval_results=(), fetchrow_results=()):
+        self.fetchval_results = list(fetchval_results)
+        self.fetchrow_results = list(fetchrow_results)
+        self.statements = []
+
+    async def fetchval(self, sql, *args):
+        self.statements.append(sql)
+        return self.fetchval_results.pop(0) if self.fetchval_results else None
+
+    async def fetchrow(self, sql, *args):
+        self.statements.append(sql)
+        return self.fetchrow_results.pop(0) if self.fetchrow_results else None
+
+    async def execute(self, sql, *args):
+        self.statements.append(sql)
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+def contents(messages):
+    return [message.content for message in messages]
+
+
+class AddMessageTest(unittest.IsolatedAsyncioTestCase):
+    async def test_add_message_appends_each_message_once(self):
+        storage = PostgreSQLConversationStorage()
+        storage._cache_messages("chat", [SystemMessage(content="sys"), HumanMessage(content="hi")])
+
+        await storage.add_message("chat", AIMessage(content="yo"))
+        await storage.add_message("chat", HumanMessage(content="again"))
+
+        self.assertEqual(contents(await storage.get_messages("chat")), ["sys", "hi", "yo", "again"])
+        self.assertEqual(contents(storage._pending_saves["chat"][0]), ["sys", "hi", "yo", "again"])
+
+    async def test_expired_cache_entries_release_version_state(self):
+        storage = PostgreSQLConversationStorage(cache_ttl=-1)
+        storage._cache_messages("chat", [HumanMessage(content="hi")])
+        storage._db_state["chat"] = (3, 1)
+
+        storage._prune_expired_cache_entries()
+
+        self.assertNotIn("chat", storage._message_cache)
+        self.assertNotIn("chat", storage._db_state)
+
+
+class WriteConversationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_write_to_deleted_chat_is_dropped(self):
+        storage = PostgreSQLConversationStorage()
+        storage._db_state["chat"] = (2, 1)
+        conn = FakeConnection()
+
+        written = await storage._write_conversation(
+            conn, "chat", [HumanMessage(content="hi"), AIMessage(content="yo")], db_base=1
+        )
+
+        self.assertIsNone(written)
+        self.assertFalse(any("INSERT INTO conversations" in sql for sql in conn.statements))
+
+
+class DeleteConversationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_chat_is_pending_delete_while_the_delete_runs(self):
+        storage = PostgreSQLConversationStorage()
+        storage._db_state["chat"] = (1, 1)
+        storage._cache_messages("chat", [HumanMessage(content="hi")])
+        await storage.save_messages("chat", [HumanMessage(content="hi"), AIMessage(content="yo")], base_count=1)
+
+        class DeletingConnection(FakeConnection):
+            async def fetchval(conn, sql, *args):
+                self.assertIn("chat", storage._pending_deletes)
+                await storage.save_messages("chat", [HumanMessage(content="late")])
+                return "chat"
+
+        storage.pool = FakePool(DeletingConnection())
+        self.assertTrue(await storage.delete_conversation("chat"))
+
+        self.assertNotIn("chat", storage._pending_deletes)
+        self.assertNotIn("chat", storage._pending_saves)
+        self.assertNotIn("chat", storage._message_cache)
+        self.assertNotIn("chat", storage._db_state)
+
+
+    async def test_save_after_delete_finished_does_not_recreate_chat(self):
+        storage = PostgreSQLConversationStorage()
+        storage.pool = FakePool(FakeConnection(fetchval_results=["chat"]))
+        self.assertTrue(await storage.delete_conversation("chat"))
+        self.assertNotIn("chat", storage._pending_deletes)
+
+        await storage.save_messages("chat", [SystemMessage(content="sys"), AIMessage(content="late")])
+        self.assertNotIn("chat", storage._pending_saves)
+        self.assertNotIn("chat", storage._message_cache)
+
+        conn = FakeConnection(fetchval_results=[1])
+        self.assertIsNone(await storage._write_conversation(conn, "chat", [AIMessage(content="late")], None))
+        self.assertEqual(conn.statements, [])
+
+class BatchSaveWorkerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_chat_is_requeued_without_losing_the_batch(self):
+        storage = PostgreSQLConversationStorage()
+        storage.pool = FakePool(FakeConnection())
+        storage._pending_saves = {
+            "a": ([HumanMessage(content="a")], None),
+            "b": ([HumanMessage(content="b")], None),
+        }
+
+        async def write(conn, chat_id, messages, db_base):
+            if chat_id == "b":
+                raise asyncpg.exceptions.DeadlockDetectedError("deadlock detected")
+            return messages, (1, len(messages))
+
+        storage._write_conversation = write
+        worker = asyncio.create_task(storage._batch_save_worker())
+        await asyncio.sleep(1.3)
+        worker.cancel()
+        await asyncio.gather(worker, return_exceptions=True)
+
+        self.assertEqual(storage._db_state["a"], (1, 1))
+        self.assertIn("b", storage._pending_saves)
+        self.assertEqual(storage._save_attempts["b"], 1)
+
+    async def test_requeue_keeps_newer_snapshots_and_gives_up_eventually(self):
+        storage = PostgreSQLConversationStorage()
+        newer = ([HumanMessage(content="newer")], 1)
+        storage._pending_saves["a"] = newer
+
+        await storage._requeue_saves({"a": ([HumanMessage(content="older")], 0), "b": ([], None)})
+        self.assertIs(storage._pending_saves["a"], newer)
+        self.assertIn("b", storage._pending_saves)
+
+        for _ in range(storage._max_save_attempts - 1):
+            storage._pending_saves.pop("b", None)
+            await storage._requeue_saves({"b": ([], None)})
+        self.assertNotIn("b", storage._pending_saves)
+
+class ImportConversationsTest(unittest.IsolatedAsyncioTestCase):
+    async def import_chunks(self, data: bytes, chunk_size: int, max_record_bytes: int):
+        storage = PostgreSQLConversationStorage()
+        loaded = []
+
+        async def copy_batch(records):
+            loaded.extend(record[0] for record in records)
+            return [record[0] for record in records]
+
+        async def chunks():
+            for offset in range(0, len(data), chunk_size):
+                yield data[offset:offset + chunk_size]
+
+        storage._copy_import_batch = copy_batch
+        report = await storage.import_conversations(chunks(), batch_size=2, max_record_bytes=max_record_bytes)
+        return loaded, report
+
+    async def test_lines_split_across_chunks_and_oversized_records(self):
+        data = (
+            b'{"chat_id": "a", "messages": []}\n'
+            b'{"chat_id": "b", "messages": ["' + b"x" * 200 + b'"]}\n'
+            b'{"chat_id": "c", "messages": []}\n'
+            b'\n'
+            b'{"chat_id": "d", "messages": []}'
+        )
+        for chunk_size in (1, 7, 64, len(data)):
+            loaded, report = await self.import_chunks(data, chunk_size, max_record_bytes=100)
+            self.assertEqual(loaded, ["a", "c", "d"])
+            self.assertEqual(report["error_count"], 1)
+            self.assertEqual(report["errors"][0]["line"], 2)
+
+
+    async def test_invalid_records_are_reported_as_line_errors(self):
+        lines = [
+            b'{"chat_id": "a", "messages": [{"type": "HumanMessage", "content": "hi"}]}',
+            b'{"chat_id": "b", "messages": [42]}',
+            b'{"chat_id": "c", "messages": [{"content": "no type"}]}',
+            b'{"chat_id": "d", "name": 7, "messages": []}',
+            b'{"chat_id": "' + b"e" * 256 + b'", "messages": []}',
+            b'{"chat_id": "f", "name": "' + b"n" * 501 + b'", "messages": []}',
+            b'{"chat_id": "g", "messages": [{"type": "AIMessage", "content": "ok"}]}',
+        ]
+        loaded, report = await self.import_chunks(b"\n".join(lines), 64, max_record_bytes=4096)
+        self.assertEqual(loaded, ["a", "g"])
+        self.assertEqual([error["line"] for error in report["errors"]], [2, 3, 4, 5, 6])
+
+    async def test_failed_batch_returns_partial_report(self):
+        storage = PostgreSQLConversationStorage()
+
+        async def copy_batch(records):
+            if records[0][0] == "c":
+                raise asyncpg.exceptions.StringDataRightTruncationError("value too long")
+            return [record[0] for record in records]
+
+        async def chunks():
+            for chat_id in "abcdef":
+                yield b'{"chat_id": "%s", "messages": []}\n' % chat_id.encode()
+
+        storage._copy_import_batch = copy_batch
+        report = await storage.import_conversations(chunks(), batch_size=2)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual(report["last_chat_id"], "b")
+        self.assertIn("aborted", report)
+
+if __name__ == "__main__":
+    unittest.main()
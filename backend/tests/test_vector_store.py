@@ -0,0 +1,101 @@
+#
+# SPDX-FileCopyrightText: Copyright (c) 1993-2025 NVIDIA CORPORATION & AFFILIATES. All rights reserved.
+# SPDX-License-Identifier: Apache-2.0
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for VectorStore retrieval against an embedded Milvus Lite database.
+
+Run from the backend directory:
+    uv run python -m unittest discover tests
+"""
+import hashlib
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from vector_store import VectorStore
+
+
+class HashEmbeddings:
+    """Deterministic unit vectors derived from the text."""
+
+    model = "hash-embeddings"
+
+    def __init__(self, dimensions: int = 32):
+        self.dimensions = dimensions
+
+    def _vector(self, text: str) -> list:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        vector = np.random.default_rng(seed).normal(size=self.dimensions)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: list) -> list:
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list:
+        return self._vector(text)
+
+
+@unittest.skipUnless(importlib.util.find_spec("milvus_lite"), "Milvus Lite is not installed")
+class BatchRetrievalTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="vector_store_test_")
+        env = {"EMBEDDING_CACHE_PATH": "", "HYBRID_SEARCH_ENABLED": "false"}
+        with mock.patch.dict(os.environ, env):
+            self.store = VectorStore(
+                embeddings=HashEmbeddings(),
+                uri=os.path.join(self.directory, "milvus.db"),
+                num_partitions=4
+            )
+        texts = [f"chunk {i} about topic {i % 7}" for i in range(200)]
+        metadatas = [{"source": f"doc-{i % 5}.pdf", "task_id": "test"} for i in range(200)]
+        self.store._add_chunks(texts, self.store.embeddings.embed_documents(texts), metadatas)
+        self.store._store.col.flush()
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_batch_matches_single_query_results(self):
+        queries = ["topic 3", "chunk 42", "something unrelated"]
+        for sources in (None, ["doc-1.pdf", "doc-3.pdf"]):
+            batch = self.store.get_documents_batch(queries, k=5, sources=sources)
+            single = [self.store.get_documents(query, k=5, sources=sources) for query in queries]
+
+            self.assertEqual(len(batch), len(queries))
+            for batch_docs, single_docs in zip(batch, single):
+                self.assertTrue(single_docs)
+                self.assertEqual(
+                    [(doc.metadata["pk"], doc.page_content, doc.metadata["source"]) for doc in batch_docs],
+                    [(doc.metadata["pk"], doc.page_content, doc.metadata["source"]) for doc in single_docs]
+                )
+
+    def test_dedupe_keeps_each_chunk_once(self):
+        results = self.store.get_documents_batch(["topic 3", "topic 3 again"], k=5, dedupe=True)
+        pks = [doc.metadata["pk"] for docs in results for doc in docs]
+        self.assertEqual(len(pks), len(set(pks)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -114,21 +114,21 @@ class RAGAgent:
         {context}
         """
 
-    def retrieve(self, state: RAGState) -> Dict:
+    async def retrieve(self, state: RAGState) -> Dict:
         """Retrieve relevant documents from the vector store."""
         logger.info({"message": "Starting document retrieval"})
         sources = state.get("sources", [])
         
         if sources:
             logger.info({"message": "Attempting retrieval with source filters", "sources": sources})
-            retrieved_docs = self.vector_store.get_documents(state["question"], sources=sources)
+            retrieved_docs = await self.vector_store.aget_documents(state["question"], sources=sources)
         else:
             logger.info({"message": "No sources specified, searching all documents"})
-            retrieved_docs = self.vector_store.get_documents(state["question"])
+            retrieved_docs = await self.vector_store.aget_documents(state["question"])
         
         if not retrieved_docs and sources:
             logger.info({"message": "No documents found with source filtering, trying without filters"})
-            retrieved_docs = self.vector_store.get_documents(state["question"])
+            retrieved_docs = await self.vector_store.aget_documents(state["question"])
         
         if retrieved_docs:
             sources_found = set(doc.metadata.get("source", "unknown") for doc in retrieved_docs)
@@ -139,6 +139,19 @@ class RAGAgent:
         return {"context": retrieved_docs}
 
 
+    async def retrieve_batch(self, questions: List[str], sources: List[str]) -> List[List[Document]]:
+        """Retrieve documents for several questions with one embedding request and one search."""
+        logger.info({"message": "Starting batched document retrieval", "question_count": len(questions), "sources": sources})
+        contexts = await self.vector_store.aget_documents_batch(questions, sources=sources or None)
+        
+        missing = [i for i, docs in enumerate(contexts) if not docs]
+        if missing and sources:
+            logger.info({"message": "No documents found with source filtering, trying without filters", "question_count": len(missing)})
+            retried = await self.vector_store.aget_documents_batch([questions[i] for i in missing])
+            for i, docs in zip(missing, retried):
+                contexts[i] = docs
+        return contexts
+
     async def generate(self, state: RAGState) -> Dict:
         """Generate an answer using retrieved context."""
         logger.info({
@@ -206,7 +219,7 @@ class RAGAgent:
 
 mcp = FastMCP("RAG")
 rag_agent = RAGAgent()
-vector_store = create_vector_store_with_config(rag_agent.config_manager)
+vector_store = rag_agent.vector_store
 
 
 @mcp.tool()
@@ -249,6 +262,40 @@ async def search_documents(query: str) -> str:
     return final_content
 
 
+@mcp.tool()
+async def search_documents_batch(queries: List[str]) -> str:
+    """Answer several independent questions about the user's documents in one call.
+    
+    All questions are retrieved together (one embedding request and one vector
+    search) and the answers are generated concurrently.
+    
+    Args:
+        queries: The questions to search for.
+        
+    Returns:
+        Each question followed by its answer.
+    """
+    config_obj = rag_agent.config_manager.read_config()
+    sources = config_obj.selected_sources or []
+    
+    contexts = await rag_agent.retrieve_batch(queries, sources)
+    results = await asyncio.gather(*(
+        rag_agent.generate({"question": query, "context": context})
+        for query, context in zip(queries, contexts)
+    ))
+    
+    answers = []
+    for query, result in zip(queries, results):
+        content = getattr(result["messages"][-1], "content", "") or ""
+        if not content.strip():
+            content = f"I found relevant documents for your query '{query}' but was unable to generate a response. Please try rephrasing your question."
+        answers.append(f"### {query}\n{content}")
+    
+    logger.info({"message": "RAG batch result", "query_count": len(queries)})
+    return "\n\n".join(answers)
+
+
 if __name__ == "__main__":
     print(f"Starting {mcp.name} MCP server...")
+    vector_store.warm_up()
     mcp.run(transport="stdio")
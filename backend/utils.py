@@ -16,6 +16,7 @@
 #
 """Utility functions for file processing and message conversion."""
 
+import asyncio
 import json
 import os
 import shutil
@@ -90,7 +91,7 @@ async def process_and_ingest_files_background(
         logger.debug({"message": "Loading documents", "task_id": task_id})
         
         try:
-            documents = vector_store._load_documents(file_paths)
+            documents = await vector_store.aload_documents(file_paths)
             
             logger.debug({
                 "message": "Documents loaded, starting indexing",
@@ -105,7 +106,7 @@ async def process_and_ingest_files_background(
                     doc.metadata = {}
                 doc.metadata["task_id"] = task_id
 
-            vector_store.index_documents(documents)
+            await vector_store.aindex_documents(documents)
             
             if file_names:
                 config = config_manager.read_config()
@@ -207,7 +208,7 @@ async def delete_ingested_files(task_id: str, config_manager, indexing_tasks: Di
             deleted_files.append(filename)
     
     try:
-        shutil.rmtree(uploads_dir)
+        await asyncio.to_thread(shutil.rmtree, uploads_dir)
         logger.debug({
             "message": "Removed uploads directory for task",
             "task_id": task_id,
@@ -223,7 +224,7 @@ async def delete_ingested_files(task_id: str, config_manager, indexing_tasks: Di
         raise
     
     try:
-        deleted_vector_count = vector_store.delete_documents_by_task(task_id)
+        deleted_vector_count = await vector_store.adelete_documents_by_task(task_id, sources=deleted_files)
 
         config = config_manager.read_config()
         updated_sources = [s for s in config.sources if s not in deleted_files]
@@ -262,6 +263,88 @@ async def delete_ingested_files(task_id: str, config_manager, indexing_tasks: Di
     }
 
 
+def _remove_image_files(image_dir: str, image_ids: List[str]) -> int:
+    """Remove uploaded image files named after the given image identifiers."""
+    removed_files = 0
+    if not image_ids or not os.path.isdir(image_dir):
+        return removed_files
+    
+    image_id_set = set(image_ids)
+    for entry in os.scandir(image_dir):
+        if entry.is_file() and os.path.splitext(entry.name)[0] in image_id_set:
+            try:
+                os.remove(entry.path)
+                removed_files += 1
+            except OSError as remove_error:
+                logger.warning({
+                    "message": "Failed to remove chat image file",
+                    "path": entry.path,
+                    "error": str(remove_error)
+                })
+    return removed_files
+
+
+async def purge_chat_images(chat_ids: List[str], postgres_storage, image_dir: str) -> Dict[str, int]:
+    """Delete the stored images of deleted chats along with their files.
+    
+    Args:
+        chat_ids: Chat identifiers whose images should be removed
+        postgres_storage: PostgreSQLConversationStorage instance
+        image_dir: Directory holding uploaded chat images
+    
+    Returns:
+        Dictionary with the number of deleted images and removed files
+    """
+    image_ids = await postgres_storage.delete_images_for_chats(chat_ids)
+    removed_files = await asyncio.to_thread(_remove_image_files, image_dir, image_ids)
+    return {"deleted_images": len(image_ids), "removed_files": removed_files}
+
+
+async def purge_chats_background(
+    chat_ids: List[str],
+    postgres_storage,
+    image_dir: str,
+    job_id: str,
+    purge_jobs: Dict[str, str],
+    memory=None
+) -> None:
+    """Delete chats in bulk and clean up their images in the background.
+    
+    Args:
+        chat_ids: Chat identifiers to delete
+        postgres_storage: PostgreSQLConversationStorage instance
+        image_dir: Directory holding uploaded chat images
+        job_id: Unique identifier for this purge job
+        purge_jobs: Dictionary to track job status
+        memory: Optional ConversationMemory whose entries for the chats are removed
+    """
+    try:
+        purge_jobs[job_id] = "deleting_chats"
+        deleted_count = await postgres_storage.delete_conversations(chat_ids)
+        
+        purge_jobs[job_id] = "deleting_images"
+        purged = await purge_chat_images(chat_ids, postgres_storage, image_dir)
+        
+        if memory:
+            purge_jobs[job_id] = "deleting_memory"
+            await memory.forget(chat_ids)
+        
+        purge_jobs[job_id] = "completed"
+        logger.debug({
+            "message": "Chat purge completed",
+            "job_id": job_id,
+            "deleted_chats": deleted_count,
+            **purged
+        })
+    except Exception as e:
+        purge_jobs[job_id] = f"failed: {str(e)}"
+        logger.error({
+            "message": "Error purging chats",
+            "job_id": job_id,
+            "error": str(e)
+        }, exc_info=True)
+
+
 def convert_langgraph_messages_to_openai(messages: List) -> List[Dict[str, Any]]:
     """Convert LangGraph message objects to OpenAI API format.
     
@@ -15,6 +15,7 @@
 # limitations under the License.
 #
 import glob
+import json
 from typing import List, Tuple
 import os
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -25,28 +26,150 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_unstructured import UnstructuredLoader
 from dotenv import load_dotenv
 from logger import logger
-from typing import Optional, Callable
+from typing import Dict, Optional, Callable
+import asyncio
+import random
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+import numpy as np
 import requests
+from pymilvus import Collection, CollectionSchema, FieldSchema, connections, utility
+from requests.adapters import HTTPAdapter
+
+from embedding_cache import EmbeddingCache, default_embedding_cache
+from lexical_index import LexicalIndex, default_lexical_index
+from models import VectorIndexConfig
 
 
 class CustomEmbeddings:
-    """Wraps qwen3 embedding model to match OpenAI format"""
-    def __init__(self, model: str = "Qwen3-Embedding-4B-Q8_0.gguf", host: str = "http://qwen3-embedding:8000"):
+    """Wraps qwen3 embedding model to match OpenAI format.
+    
+    Texts are sent as ``input`` arrays of up to ``batch_size`` items over a pooled
+    keep-alive session. Batches run with bounded parallelism and failed requests
+    are retried with exponential backoff.
+    
+    With ``dimensions`` set, vectors are cut to their first ``dimensions``
+    components and re-normalized, which Qwen3 embeddings support
+    (Matryoshka representation learning). Documents and queries go through the
+    same path, so both sides of a search always agree.
+    
+    Query vectors are kept in an LRU keyed by (model, normalized text). Concurrent
+    async queries that miss the cache within ``batch_window_ms`` are sent together
+    as one batched request.
+    """
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        model: str = "Qwen3-Embedding-4B-Q8_0.gguf",
+        host: str = "http://qwen3-embedding:8000",
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_seconds: float = 0.5,
+        timeout: float = 120,
+        query_cache_size: int = 1024,
+        batch_window_ms: float = 3.0,
+        dimensions: Optional[int] = None
+    ):
         self.model = model
+        self.dimensions = dimensions
         self.url = f"{host}/v1/embeddings"
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.query_cache_size = query_cache_size
+        self.batch_window = batch_window_ms / 1000
+        self._query_cache: "OrderedDict[tuple, list[float]]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        self._pending_queries: "OrderedDict[tuple, tuple[str, asyncio.Future]]" = OrderedDict()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._stats = {"query_cache_hits": 0, "query_cache_misses": 0, "query_batches": 0, "batched_queries": 0}
+
+    @classmethod
+    def from_env(cls, model: str = "Qwen3-Embedding-4B-Q8_0.gguf", **kwargs) -> "CustomEmbeddings":
+        """Create an instance tuned by EMBEDDING_* environment variables."""
+        return cls(
+            model=model,
+            host=os.getenv("EMBEDDING_HOST", "http://qwen3-embedding:8000"),
+            batch_size=int(os.getenv("EMBEDDING_BATCH_SIZE", 32)),
+            max_concurrency=int(os.getenv("EMBEDDING_MAX_CONCURRENCY", 4)),
+            max_retries=int(os.getenv("EMBEDDING_MAX_RETRIES", 3)),
+            query_cache_size=int(os.getenv("EMBEDDING_QUERY_CACHE_SIZE", 1024)),
+            batch_window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", 3)),
+            dimensions=int(os.getenv("EMBEDDING_DIMENSIONS", 0)) or None,
+            **kwargs
+        )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix="embeddings"
+                )
+            return self._executor
+
+    def _embed_batch(self, batch: list[str]) -> list[list[float]]:
+        """POST one batch, retrying transient failures with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(
+                    self.url,
+                    json={"input": batch, "model": self.model},
+                    timeout=self.timeout
+                )
+                if response.status_code in self.RETRY_STATUS_CODES and attempt < self.max_retries:
+                    raise requests.HTTPError(f"{response.status_code} from embedding server", response=response)
+                response.raise_for_status()
+                data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+                if len(data) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} embeddings, got {len(data)}")
+                return self.truncate([item["embedding"] for item in data], self.dimensions)
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                retryable = not isinstance(e, requests.HTTPError) or (
+                    e.response is not None and e.response.status_code in self.RETRY_STATUS_CODES
+                )
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.1)
+                logger.warning({
+                    "message": "Embedding request failed, retrying",
+                    "attempt": attempt + 1,
+                    "batch_size": len(batch),
+                    "delay_seconds": round(delay, 2),
+                    "error": str(e)
+                })
+                time.sleep(delay)
 
     def __call__(self, texts: list[str]) -> list[list[float]]:
-        embeddings = []
-        for text in texts:
-            response = requests.post(
-                self.url,
-                json={"input": text, "model": self.model},
-                headers={"Content-Type": "application/json"}
-            )
-            response.raise_for_status()
-            data = response.json()
-            embeddings.append(data["data"][0]["embedding"])
-        return embeddings
+        if not texts:
+            return []
+        
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            results = list(self._get_executor().map(self._embed_batch, batches))
+        
+        return [embedding for batch in results for embedding in batch]
 
     
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
@@ -55,7 +178,212 @@ class CustomEmbeddings:
     
     def embed_query(self, text: str) -> list[float]:
         """Embed a single query text. Required by Milvus library."""
-        return self.__call__([text])[0]
+        key = self._query_key(text)
+        cached = self._cached_query(key)
+        if cached is not None:
+            return cached
+        
+        vector = self.__call__([text])[0]
+        self._store_query(key, vector)
+        return vector
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed several query texts, sending every cache miss in one request."""
+        keys = [self._query_key(text) for text in texts]
+        vectors = [self._cached_query(key) for key in keys]
+        misses = {key: text for key, text, vector in zip(keys, texts, vectors) if vector is None}
+        if misses:
+            embedded = dict(zip(misses, self._embed_batch(list(misses.values()))))
+            for key, vector in embedded.items():
+                self._store_query(key, vector)
+            vectors = [vector if vector is not None else embedded[key] for key, vector in zip(keys, vectors)]
+        return vectors
+
+    @staticmethod
+    def truncate(vectors: list[list[float]], dimensions: Optional[int]) -> list[list[float]]:
+        """Keep the first ``dimensions`` components of each vector and rescale to unit length."""
+        if not dimensions:
+            return vectors
+        truncated = []
+        for vector in vectors:
+            if len(vector) < dimensions:
+                raise ValueError(f"Cannot truncate a {len(vector)}-dimensional embedding to {dimensions}")
+            head = vector[:dimensions]
+            norm = sum(value * value for value in head) ** 0.5 or 1.0
+            truncated.append([value / norm for value in head])
+        return truncated
+
+    @property
+    def model_key(self) -> str:
+        """Identifies the vectors this instance produces: the model and output size."""
+        return f"{self.model}@{self.dimensions}" if self.dimensions else self.model
+
+    def _query_key(self, text: str) -> tuple:
+        """Cache key: the model plus the NFKC-normalized, whitespace-collapsed text."""
+        return (self.model_key, " ".join(unicodedata.normalize("NFKC", text).split()))
+
+    def _cached_query(self, key: tuple) -> Optional[list[float]]:
+        with self._query_cache_lock:
+            vector = self._query_cache.get(key)
+            if vector is None:
+                self._stats["query_cache_misses"] += 1
+                return None
+            self._query_cache.move_to_end(key)
+            self._stats["query_cache_hits"] += 1
+            return vector
+
+    def _store_query(self, key: tuple, vector: list[float]) -> None:
+        if self.query_cache_size <= 0:
+            return
+        with self._query_cache_lock:
+            self._query_cache[key] = vector
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+    def get_stats(self) -> dict:
+        """Query cache and micro-batching counters."""
+        with self._query_cache_lock:
+            return {**self._stats, "query_cache_entries": len(self._query_cache)}
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        """Return a pooled async client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                headers={"Content-Type": "application/json"},
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                ),
+                timeout=self.timeout
+            )
+            self._async_client_loop = loop
+        return self._async_client
+
+    async def _aembed_batch(self, batch: list[str]) -> list[list[float]]:
+        """Async counterpart of _embed_batch with the same retry policy."""
+        client = self._get_async_client()
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await client.post(self.url, json={"input": batch, "model": self.model})
+                if response.status_code in self.RETRY_STATUS_CODES and attempt < self.max_retries:
+                    raise httpx.HTTPStatusError(
+                        f"{response.status_code} from embedding server",
+                        request=response.request,
+                        response=response
+                    )
+                response.raise_for_status()
+                data = sorted(response.json()["data"], key=lambda item: item.get("index", 0))
+                if len(data) != len(batch):
+                    raise ValueError(f"Expected {len(batch)} embeddings, got {len(data)}")
+                return self.truncate([item["embedding"] for item in data], self.dimensions)
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in self.RETRY_STATUS_CODES
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.1)
+                logger.warning({
+                    "message": "Async embedding request failed, retrying",
+                    "attempt": attempt + 1,
+                    "batch_size": len(batch),
+                    "delay_seconds": round(delay, 2),
+                    "error": str(e)
+                })
+                await asyncio.sleep(delay)
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed document texts without blocking the event loop."""
+        if not texts:
+            return []
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def run(batch: list[str]) -> list[list[float]]:
+            async with semaphore:
+                return await self._aembed_batch(batch)
+        
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*(run(batch) for batch in batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def aembed_query(self, text: str) -> list[float]:
+        """Embed a single query text without blocking the event loop.
+        
+        Cache misses wait up to ``batch_window_ms`` for other queries and are
+        then embedded together; identical pending queries share one result.
+        """
+        key = self._query_key(text)
+        cached = self._cached_query(key)
+        if cached is not None:
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        pending = self._pending_queries.get(key)
+        if pending is not None and pending[1].get_loop() is loop:
+            return await asyncio.shield(pending[1])
+        
+        future = loop.create_future()
+        self._pending_queries[key] = (text, future)
+        if len(self._pending_queries) >= self.batch_size:
+            self._flush_queries()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush_queries)
+        return await asyncio.shield(future)
+
+    async def aembed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Async counterpart of embed_queries."""
+        keys = [self._query_key(text) for text in texts]
+        vectors = [self._cached_query(key) for key in keys]
+        misses = {key: text for key, text, vector in zip(keys, texts, vectors) if vector is None}
+        if misses:
+            embedded = dict(zip(misses, await self._aembed_batch(list(misses.values()))))
+            for key, vector in embedded.items():
+                self._store_query(key, vector)
+            vectors = [vector if vector is not None else embedded[key] for key, vector in zip(keys, vectors)]
+        return vectors
+
+    def _flush_queries(self) -> None:
+        """Send every pending query as one batch; runs as an event loop callback."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending_queries:
+            return
+        
+        batch = list(self._pending_queries.items())
+        self._pending_queries.clear()
+        self._stats["query_batches"] += 1
+        self._stats["batched_queries"] += len(batch)
+        asyncio.get_running_loop().create_task(self._resolve_queries(batch))
+
+    async def _resolve_queries(self, batch: list) -> None:
+        try:
+            vectors = await self._aembed_batch([text for _, (text, _) in batch])
+        except Exception as e:
+            for _, (_, future) in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (key, (_, future)), vector in zip(batch, vectors):
+            self._store_query(key, vector)
+            if not future.done():
+                future.set_result(vector)
+
+    def close(self) -> None:
+        """Release pooled connections and worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """Release the async client as well as the sync resources."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+        self.close()
 
 
 class VectorStore:
@@ -68,7 +396,12 @@ class VectorStore:
         self, 
         embeddings=None, 
         uri: str = "http://milvus:19530",
-        on_source_deleted: Optional[Callable[[str], None]] = None
+        on_source_deleted: Optional[Callable[[str], None]] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        flush_interval: Optional[float] = None,
+        index_config: Optional[VectorIndexConfig] = None,
+        num_partitions: Optional[int] = None,
+        lexical_index: Optional[LexicalIndex] = None
     ):
         """Initialize the vector store.
         
@@ -76,11 +409,43 @@ class VectorStore:
             embeddings: Embedding model to use (defaults to OllamaEmbeddings)
             uri: Milvus connection URI
             on_source_deleted: Optional callback when a source is deleted
+            embedding_cache: Persistent chunk embedding cache (defaults to the
+                SQLite cache at EMBEDDING_CACHE_PATH)
+            flush_interval: Seconds to coalesce collection flushes after writes
+                (defaults to MILVUS_FLUSH_INTERVAL_SECONDS or 5)
+            index_config: ANN index and search settings for the ``context``
+                collection (defaults to langchain-milvus' HNSW defaults)
+            num_partitions: Physical partitions behind the ``source`` partition
+                key (defaults to MILVUS_SOURCE_PARTITIONS or 64)
+            lexical_index: BM25 index fused with dense results (defaults to the
+                SQLite index at LEXICAL_INDEX_PATH when HYBRID_SEARCH_ENABLED)
         """
         try:
-            self.embeddings = embeddings or CustomEmbeddings(model="qwen3-embedding-custom")
+            self.embeddings = embeddings or CustomEmbeddings.from_env(model="qwen3-embedding-custom")
             self.uri = uri
             self.on_source_deleted = on_source_deleted
+            self.index_config = index_config
+            self.num_partitions = num_partitions or int(os.getenv("MILVUS_SOURCE_PARTITIONS", 64))
+            self.embedding_cache = embedding_cache if embedding_cache is not None else default_embedding_cache()
+            if lexical_index is None and os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true":
+                lexical_index = default_lexical_index()
+            self.lexical_index = lexical_index
+            self.rrf_k = int(os.getenv("HYBRID_RRF_K", 60))
+            self.hybrid_candidates = int(os.getenv("HYBRID_CANDIDATES_PER_K", 3))
+            self._executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("VECTOR_STORE_WORKERS", 4)),
+                thread_name_prefix="vector-store"
+            )
+            self.flush_interval = flush_interval if flush_interval is not None else float(
+                os.getenv("MILVUS_FLUSH_INTERVAL_SECONDS", 5)
+            )
+            self._alias: Optional[str] = None
+            self._dirty_collections: set = set()
+            self._flush_timer: Optional[threading.Timer] = None
+            self._flush_lock = threading.Lock()
+            self._warmed_up = False
+            self._collection_prepared = False
+            self._dimensions: Optional[int] = None
             self._initialize_store()
             
             self.text_splitter = RecursiveCharacterTextSplitter(
@@ -99,16 +464,27 @@ class VectorStore:
             raise
     
     def _initialize_store(self):
+        index_kwargs = {}
+        if self.index_config is not None:
+            index_kwargs = {
+                "index_params": self.index_config.index_params(),
+                "search_params": self.index_config.milvus_search_params()
+            }
         self._store = Milvus(
             embedding_function=self.embeddings,
             collection_name="context",
             connection_args={"uri": self.uri},
-            auto_id=True
+            auto_id=True,
+            partition_key_field="source",
+            num_partitions=self.num_partitions,
+            **index_kwargs
         )
+        self._alias = None
         logger.debug({
             "message": "Milvus vector store initialized",
             "uri": self.uri,
-            "collection": "context"
+            "collection": "context",
+            "index": index_kwargs.get("index_params")
         })
 
     def _load_documents(self, file_paths: List[str] = None, input_dir: str = None) -> List[str]:
@@ -246,8 +622,16 @@ class VectorStore:
                 "chunk_count": len(splits)
             })
             
-            self._store.add_documents(splits)
-            self.flush_store()
+            if splits:
+                texts = [doc.page_content for doc in splits]
+                metadatas = [doc.metadata for doc in splits]
+                vectors = self._embed_chunks(texts)
+                self._check_dimensions(vectors)
+                ids = self._add_chunks(texts, vectors, metadatas)
+                if self.lexical_index is not None:
+                    self.lexical_index.add(ids, texts, metadatas)
+                self._prepare_collection()
+                self.flush_store()
             
             logger.debug({
                 "message": "Document indexing completed"
@@ -259,61 +643,767 @@ class VectorStore:
             }, exc_info=True)
             raise
 
-    def flush_store(self):
+    @property
+    def _embedding_model(self) -> str:
+        """Model name used to key the chunk embedding cache."""
+        return getattr(self.embeddings, "model_key", None) or getattr(self.embeddings, "model", type(self.embeddings).__name__)
+
+    def _embed_chunks(self, texts: List[str]) -> List[List[float]]:
+        """Embed chunk texts, reusing vectors from the persistent cache."""
+        if self.embedding_cache is None:
+            return self.embeddings.embed_documents(texts)
+        return self.embedding_cache.embed(self._embedding_model, texts, self.embeddings.embed_documents)
+
+    async def _aembed_chunks(self, texts: List[str]) -> List[List[float]]:
+        """Async _embed_chunks; cache reads and writes run on the worker threads."""
+        cache = self.embedding_cache
+        if cache is None:
+            return await self._aembed_documents(texts)
+
+        model = self._embedding_model
+        hashes = [cache.hash_text(text) for text in texts]
+        vectors = await self._run_in_executor(cache.get_many, model, hashes)
+
+        missing = {}
+        for chunk_hash, text in zip(hashes, texts):
+            if chunk_hash not in vectors:
+                missing.setdefault(chunk_hash, text)
+        if missing:
+            fresh = dict(zip(missing.keys(), await self._aembed_documents(list(missing.values()))))
+            await self._run_in_executor(cache.put_many, model, fresh)
+            vectors.update(fresh)
+
+        cache.record(hits=len(texts) - sum(1 for h in hashes if h in missing), misses=len(missing))
+        logger.debug({
+            "message": "Chunk embedding cache lookup",
+            "chunks": len(texts),
+            "embedded": len(missing)
+        })
+        return [vectors[chunk_hash] for chunk_hash in hashes]
+
+    def _connection(self) -> str:
+        """Return the alias of the store's Milvus connection, connecting only if it was lost.
+        
+        The langchain Milvus store already holds a connection; admin calls reuse
+        its alias instead of calling connections.connect for every operation.
+        """
+        if self._alias and connections.has_connection(self._alias):
+            return self._alias
+        alias = getattr(self._store, "alias", None)
+        if not (alias and connections.has_connection(alias)):
+            alias = f"vector_store_{id(self)}"
+            connections.connect(alias=alias, uri=self.uri)
+        self._alias = alias
+        return alias
+
+    @property
+    def connection_alias(self) -> str:
+        """Alias of the open Milvus connection, for components that share it."""
+        return self._connection()
+
+    def _collection(self, collection_name: str = "context") -> Optional[Collection]:
+        """Return a handle on ``collection_name``, or None if it does not exist."""
+        alias = self._connection()
+        if not utility.has_collection(collection_name, using=alias):
+            return None
+        return Collection(name=collection_name, using=alias)
+
+    def flush_store(self, collection_name: str = "context", immediate: bool = False):
+        """
+        Persist recent writes to ``collection_name``.
+        
+        Inserts and deletes are searchable before they are flushed, so flushes are
+        deferred and coalesced: every collection written within ``flush_interval``
+        seconds is flushed once when the timer fires. Only the affected
+        collections are flushed, never the whole server.
+        
+        Args:
+            collection_name: Collection that was written to
+            immediate: Flush now instead of scheduling it
+        """
+        with self._flush_lock:
+            self._dirty_collections.add(collection_name)
+            if not immediate and self.flush_interval > 0:
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(self.flush_interval, self._flush_pending)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+                return
+        self._flush_pending()
+
+    def _flush_pending(self):
+        """Flush every collection marked dirty since the last flush."""
+        with self._flush_lock:
+            pending, self._dirty_collections = self._dirty_collections, set()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        
+        for collection_name in pending:
+            try:
+                collection = self._collection(collection_name)
+                if collection is not None:
+                    collection.flush()
+                logger.debug({
+                    "message": "Milvus collection flushed (persisted to disk)",
+                    "collection": collection_name
+                })
+            except Exception as e:
+                logger.error({
+                    "message": "Error flushing Milvus collection",
+                    "collection": collection_name,
+                    "error": str(e)
+                }, exc_info=True)
+
+    def warm_up(self, collection_name: str = "context") -> None:
+        """Load ``collection_name`` and touch it once so the first user query does
+        not pay for segment loading. Runs once per process.
+        """
+        if self._warmed_up:
+            return
+        try:
+            if collection_name == "context":
+                self._prepare_collection()
+            collection = self._collection(collection_name)
+            if collection is None:
+                return
+            collection.load()
+            collection.query(expr="", limit=1, output_fields=["pk"])
+            self._warmed_up = True
+            logger.debug({
+                "message": "Milvus collection loaded and warmed up",
+                "collection": collection_name
+            })
+        except Exception as e:
+            logger.warning({
+                "message": "Milvus warm-up failed",
+                "collection": collection_name,
+                "error": str(e)
+            })
+
+    def _prepare_collection(self) -> None:
+        """Bring the ``context`` collection up to the expected layout, once.
+        
+        Migrates an unpartitioned collection to the ``source`` partition key,
+        applies ``index_config`` and adds the scalar indexes, then loads it.
+        The collection only exists after the first insert, so ingestion calls
+        this as well as warm_up.
+        """
+        if self._collection_prepared:
+            return
+        if self._resume_partition_migration("context"):
+            self._initialize_store()
+        collection = self._collection("context")
+        if collection is None:
+            return
+        if self._migrate_to_partition_key(collection):
+            self._initialize_store()
+            collection = self._collection("context")
+        self._dimensions = None
+        configured = getattr(self.embeddings, "dimensions", None)
+        if configured:
+            self._check_dimensions([[0.0] * configured])
+        self._apply_index_config(collection)
+        self._ensure_scalar_indexes(collection)
+        collection.load()
+        self._backfill_lexical_index(collection)
+        self._collection_prepared = True
+
+    def _collection_dimensions(self) -> Optional[int]:
+        """Vector size of the ``context`` collection, or None before the first insert."""
+        if self._dimensions is None and self._store.col is not None:
+            field = next(field for field in self._store.col.schema.fields if field.name == self._vector_field)
+            self._dimensions = int(field.params["dim"])
+        return self._dimensions
+
+    def _check_dimensions(self, vectors: List[List[float]]) -> None:
+        """Reject vectors whose size differs from the collection's.
+        
+        Raises:
+            ValueError: If the embedding output size does not match the stored vectors
+        """
+        expected = self._collection_dimensions()
+        if expected is None or not vectors:
+            return
+        actual = len(vectors[0])
+        if actual != expected:
+            raise ValueError(
+                f"The context collection stores {expected}-dimensional vectors but the embedding model "
+                f"produces {actual}; set EMBEDDING_DIMENSIONS={expected} or re-index into a new collection"
+            )
+
+    def _backfill_lexical_index(self, collection: Collection) -> None:
+        """Index chunks ingested before hybrid search was enabled."""
+        if self.lexical_index is None or self.lexical_index.count() or not collection.num_entities:
+            return
+        pk_field = collection.schema.primary_field.name
+        text_field = getattr(self._store, "_text_field", "text")
+        skip = {pk_field, text_field} | {
+            field.name for field in collection.schema.fields
+            if "VECTOR" in field.dtype.name
+        }
+        output_fields = [field.name for field in collection.schema.fields if field.name not in skip or field.name == text_field]
+        
+        def rows():
+            iterator = collection.query_iterator(batch_size=1000, expr="", output_fields=output_fields)
+            while True:
+                batch = iterator.next()
+                if not batch:
+                    iterator.close()
+                    return
+                for row in batch:
+                    metadata = {key: value for key, value in row.items() if key not in skip}
+                    yield row[pk_field], row[text_field], metadata
+        
+        indexed = self.lexical_index.backfill(rows())
+        logger.info({
+            "message": "Backfilled lexical index from Milvus",
+            "collection": collection.name,
+            "chunks": indexed
+        })
+
+    @staticmethod
+    def _is_partitioned(collection: Collection) -> bool:
+        return any(field.is_partition_key for field in collection.schema.fields)
+
+    def _resume_partition_migration(self, collection_name: str = "context") -> bool:
+        """Finish a partition-key migration that stopped during the swap.
+        
+        The swap renames the old collection to ``<name>_legacy``, renames the
+        copy ``<name>_partitioned`` into place and only then drops the legacy
+        one, so whichever step was interrupted, one complete copy still exists.
+        
+        Returns:
+            True if a collection was renamed into place
+        """
+        alias = self._connection()
+        temp_name, legacy_name = f"{collection_name}_partitioned", f"{collection_name}_legacy"
+        restored = None
+        if not utility.has_collection(collection_name, using=alias):
+            # A copy is only renamed aside after it is complete.
+            restored = next(
+                (name for name in (temp_name, legacy_name) if utility.has_collection(name, using=alias)),
+                None
+            )
+            if restored is not None:
+                utility.rename_collection(restored, collection_name, using=alias)
+                logger.info({
+                    "message": "Resumed interrupted partition-key migration",
+                    "collection": collection_name,
+                    "restored_from": restored
+                })
+        
+        if utility.has_collection(legacy_name, using=alias) and utility.has_collection(collection_name, using=alias):
+            if self._is_partitioned(Collection(collection_name, using=alias)):
+                utility.drop_collection(legacy_name, using=alias)
+        return restored is not None
+
+    def _migrate_to_partition_key(self, collection: Collection) -> bool:
+        """Copy a collection created before partitioning into one keyed by ``source``.
+        
+        Stored vectors are copied as-is, so nothing is re-embedded. The new
+        collection is built under a temporary name; a complete copy left by an
+        interrupted run is reused, an incomplete one rebuilt. The swap never
+        drops data before the copy is in place (see _resume_partition_migration).
+        
+        Returns:
+            True if the collection was migrated
+        """
+        fields = collection.schema.fields
+        if self._is_partitioned(collection) or "source" not in {field.name for field in fields}:
+            return False
+        
+        alias = self._connection()
+        temp_name = f"{collection.name}_partitioned"
+        legacy_name = f"{collection.name}_legacy"
+        collection.flush()
+        
+        target = None
+        if utility.has_collection(temp_name, using=alias):
+            existing = Collection(temp_name, using=alias)
+            existing.flush()
+            vector_indexed = any(index.field_name == self._vector_field for index in existing.indexes)
+            if self._is_partitioned(existing) and vector_indexed and existing.num_entities == collection.num_entities:
+                target = existing
+            else:
+                # The original collection is untouched, so a partial copy can go.
+                utility.drop_collection(temp_name, using=alias)
+        
+        copied = collection.num_entities
+        if target is None:
+            schema = CollectionSchema(
+                [
+                    FieldSchema(
+                        field.name,
+                        field.dtype,
+                        description=field.description,
+                        is_primary=field.is_primary,
+                        auto_id=field.auto_id,
+                        is_partition_key=field.name == "source",
+                        **field.params
+                    )
+                    for field in fields
+                ],
+                description=collection.schema.description,
+                enable_dynamic_field=collection.schema.enable_dynamic_field
+            )
+            target = Collection(temp_name, schema, using=alias, num_partitions=self.num_partitions)
+            
+            auto_pk = collection.schema.primary_field.name if collection.schema.auto_id else None
+            copy_fields = [field.name for field in fields if field.name != auto_pk]
+            collection.load()
+            iterator = collection.query_iterator(batch_size=1000, expr="", output_fields=copy_fields)
+            copied = 0
+            while True:
+                rows = iterator.next()
+                if not rows:
+                    iterator.close()
+                    break
+                if auto_pk:
+                    rows = [{key: value for key, value in row.items() if key != auto_pk} for row in rows]
+                target.insert(rows)
+                copied += len(rows)
+            target.flush()
+            
+            # Indexes last: an indexed copy with every entity marks a finished copy.
+            for index in sorted(collection.indexes, key=lambda index: index.field_name == self._vector_field):
+                params = dict(index.params)
+                if isinstance(params.get("params"), str):
+                    params["params"] = json.loads(params["params"])
+                target.create_index(field_name=index.field_name, index_params=params, index_name=index.index_name)
+        
+        collection.release()
+        if utility.has_collection(legacy_name, using=alias):
+            utility.drop_collection(legacy_name, using=alias)
+        utility.rename_collection(collection.name, legacy_name, using=alias)
+        utility.rename_collection(temp_name, collection.name, using=alias)
+        utility.drop_collection(legacy_name, using=alias)
+        logger.info({
+            "message": "Migrated Milvus collection to source partition key",
+            "collection": collection.name,
+            "entities": copied,
+            "num_partitions": self.num_partitions
+        })
+        return True
+
+    def _ensure_scalar_indexes(self, collection: Collection) -> None:
+        """Add INVERTED indexes on ``source`` and ``task_id`` if they are missing."""
+        field_names = {field.name for field in collection.schema.fields}
+        indexed = {index.field_name for index in collection.indexes}
+        missing = [name for name in ("source", "task_id") if name in field_names and name not in indexed]
+        if not missing:
+            return
+        collection.release()
+        for name in missing:
+            collection.create_index(field_name=name, index_params={"index_type": "INVERTED"}, index_name=f"{name}_inverted")
+        logger.debug({
+            "message": "Created scalar indexes",
+            "collection": collection.name,
+            "fields": missing
+        })
+
+    @property
+    def _vector_field(self) -> str:
+        field_name = getattr(self._store, "_vector_field", "vector")
+        return field_name[0] if isinstance(field_name, list) else field_name
+
+    def _apply_index_config(self, collection: Collection) -> None:
+        """Rebuild the vector index if it differs from ``index_config``.
+        
+        langchain-milvus only creates an index for new collections, so a changed
+        index type or build parameter would otherwise never reach Milvus.
+        """
+        if self.index_config is None:
+            return
+        properties = collection.describe().get("properties") or {}
+        if isinstance(properties, list):
+            properties = {item["key"]: item["value"] for item in properties}
+        if self.index_config.mmap and str(properties.get("mmap.enabled", "")).lower() != "true":
+            collection.release()
+            collection.set_properties({"mmap.enabled": True})
+            logger.info({"message": "Enabled mmap for raw vectors", "collection": collection.name})
+        
+        wanted = self.index_config.index_params()
+        field_name = self._vector_field
+        current = next((index for index in collection.indexes if index.field_name == field_name), None)
+        if current is not None:
+            params = dict(current.params)
+            existing_params = params.get("params", {})
+            if isinstance(existing_params, str):
+                existing_params = json.loads(existing_params)
+            if (
+                params.get("index_type") == wanted["index_type"]
+                and params.get("metric_type") == wanted["metric_type"]
+                and {k: str(v) for k, v in existing_params.items()} == {k: str(v) for k, v in wanted["params"].items()}
+            ):
+                return
+        
+        logger.info({
+            "message": "Rebuilding Milvus vector index",
+            "collection": collection.name,
+            "index": wanted
+        })
+        collection.release()
+        if current is not None:
+            collection.drop_index(index_name=current.index_name)
+        collection.create_index(field_name=field_name, index_params=wanted)
+        utility.wait_for_index_building_complete(collection.name, using=self._connection())
+
+    def close(self) -> None:
+        """Flush pending writes, close the Milvus connection and stop worker threads."""
+        self._flush_pending()
+        if self._alias and connections.has_connection(self._alias):
+            connections.disconnect(self._alias)
+        self._alias = None
+        self._executor.shutdown(wait=False)
+
+
+    def get_documents(self, query: str, k: int = 8, sources: List[str] = None) -> List[Document]:
         """
-        Flush the Milvus collection to ensure that all added documents are persisted to disk.
+        Get relevant documents for ``query``, optionally restricted to ``sources``.
+        
+        With a lexical index, the BM25 search runs on a worker thread alongside
+        the dense search and both rankings are fused with reciprocal rank fusion.
         """
         try:
-            from pymilvus import connections
+            candidates = k if self.lexical_index is None else k * self.hybrid_candidates
+            if sources:
+                logger.debug({
+                    "message": "Retrieving with filter",
+                    "sources": sources
+                })
             
-            connections.connect(uri=self.uri)
+            lexical = None
+            if self.lexical_index is not None:
+                lexical = self._executor.submit(self.lexical_index.search, query, candidates, sources)
             
+            vector = self.embeddings.embed_query(query)
+            self._check_dimensions([vector])
+            docs = self._dense_search(vector, candidates, sources)
+            if lexical is not None:
+                docs = self._fuse(docs, lexical.result(), k)
+            logger.debug({
+                "message": "Retrieved documents",
+                "query": query,
+                "document_count": len(docs)
+            })
+            
+            return docs
+        except Exception as e:
+            logger.error({
+                "message": "Error retrieving documents",
+                "error": str(e)
+            }, exc_info=True)
+            return []
 
-            from pymilvus import utility
-            utility.flush_all()
+    def get_documents_batch(
+        self,
+        queries: List[str],
+        k: int = 8,
+        sources: List[str] = None,
+        dedupe: bool = False
+    ) -> List[List[Document]]:
+        """
+        Get relevant documents for several queries in one round trip.
+        
+        All queries are embedded in one request and searched with one
+        multi-vector Milvus call; BM25 searches run on worker threads meanwhile
+        and are fused per query as in get_documents.
+        
+        Args:
+            queries: Query texts
+            k: Documents to return per query
+            sources: Optional sources to restrict every query to
+            dedupe: Return each chunk only for the query that ranks it highest
             
+        Returns:
+            One document list per query, in the order of ``queries``
+        """
+        if not queries:
+            return []
+        try:
+            candidates = k if self.lexical_index is None else k * self.hybrid_candidates
+            
+            lexical = []
+            if self.lexical_index is not None:
+                lexical = [self._executor.submit(self.lexical_index.search, query, candidates, sources) for query in queries]
+            
+            vectors = self._embed_queries(queries)
+            self._check_dimensions(vectors)
+            results = self._dense_search_batch(vectors, candidates, sources)
+            if lexical:
+                results = [self._fuse(docs, future.result(), k) for docs, future in zip(results, lexical)]
+            if dedupe:
+                results = self._dedupe(results)
             logger.debug({
-                "message": "Milvus store flushed (persisted to disk)"
+                "message": "Retrieved documents for query batch",
+                "query_count": len(queries),
+                "document_counts": [len(docs) for docs in results]
             })
+            return results
         except Exception as e:
             logger.error({
-                "message": "Error flushing Milvus store",
+                "message": "Error retrieving documents for query batch",
                 "error": str(e)
             }, exc_info=True)
+            return [[] for _ in queries]
 
+    def _dense_search(self, vector: List[float], k: int, sources: Optional[List[str]] = None) -> List[Document]:
+        """Nearest chunks to ``vector`` in the ``context`` collection."""
+        search_kwargs = {"k": k}
+        filter_expr = self._source_filter(sources)
+        if filter_expr:
+            search_kwargs["expr"] = filter_expr
+        if self.index_config is not None and self.index_config.rescore_factor > 1 and self._store.col is not None:
+            return self._rescored_search(vector, k, filter_expr)
+        return self._store.similarity_search_by_vector(vector, **search_kwargs)
 
-    def get_documents(self, query: str, k: int = 8, sources: List[str] = None) -> List[Document]:
+    def _rescored_search(self, vector: List[float], k: int, filter_expr: Optional[str]) -> List[Document]:
+        """Over-fetch from a quantized index, then rank by exact distance.
+        
+        The first pass returns ``k * rescore_factor`` candidates from the
+        (e.g. IVF_SQ8 or IVF_PQ) index. Their full-precision vectors are then
+        fetched by primary key and the candidates re-ranked exactly.
+        """
+        collection = self._store.col
+        pk_field = collection.schema.primary_field.name
+        text_field = getattr(self._store, "_text_field", "text")
+        vector_field = self._vector_field
+        
+        hits = collection.search(
+            data=[vector],
+            anns_field=vector_field,
+            param=self.index_config.milvus_search_params(),
+            limit=k * self.index_config.rescore_factor,
+            expr=filter_expr,
+            output_fields=[pk_field]
+        )[0]
+        ids = [hit.id for hit in hits]
+        if not ids:
+            return []
+        
+        output_fields = [field.name for field in collection.schema.fields]
+        rows = collection.query(expr=f"{pk_field} in {json.dumps(ids)}", output_fields=output_fields)
+        if not rows:
+            return []
+        
+        matrix = np.asarray([row[vector_field] for row in rows], dtype=np.float32)
+        query = np.asarray(vector, dtype=np.float32)
+        if self.index_config.metric_type == "L2":
+            order = np.argsort(((matrix - query) ** 2).sum(axis=1))
+        else:
+            scores = matrix @ query
+            if self.index_config.metric_type == "COSINE":
+                scores = scores / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+            order = np.argsort(-scores)
+        
+        return [
+            Document(
+                page_content=rows[i][text_field],
+                metadata={key: value for key, value in rows[i].items() if key not in (text_field, vector_field)}
+            )
+            for i in order[:k]
+        ]
+
+    def _dense_search_batch(
+        self,
+        vectors: List[List[float]],
+        k: int,
+        sources: Optional[List[str]] = None
+    ) -> List[List[Document]]:
+        """Nearest chunks to each of ``vectors`` with a single Milvus search request."""
+        collection = self._store.col
+        if collection is None:
+            return [[] for _ in vectors]
+        filter_expr = self._source_filter(sources)
+        if self.index_config is not None and self.index_config.rescore_factor > 1:
+            return [self._rescored_search(vector, k, filter_expr) for vector in vectors]
+        
+        text_field = getattr(self._store, "_text_field", "text")
+        vector_field = self._vector_field
+        output_fields = [field.name for field in collection.schema.fields if field.name != vector_field]
+        
+        results = collection.search(
+            data=vectors,
+            anns_field=vector_field,
+            param=self._search_params(collection),
+            limit=k,
+            expr=filter_expr,
+            output_fields=output_fields
+        )
+        return [
+            [
+                Document(
+                    page_content=hit.entity.get(text_field),
+                    metadata={field: hit.entity.get(field) for field in output_fields if field != text_field}
+                )
+                for hit in hits
+            ]
+            for hits in results
+        ]
+
+    def _add_chunks(self, texts: List[str], vectors: List[List[float]], metadatas: List[dict]) -> List:
+        """Insert embedded chunks into the ``context`` collection.
+        
+        Returns:
+            Primary keys of the inserted chunks
+        """
+        return self._store.add_embeddings(texts=texts, embeddings=vectors, metadatas=metadatas)
+
+    def _fuse(self, dense: List[Document], lexical: List[Tuple[str, str, dict]], k: int) -> List[Document]:
+        """Merge dense and BM25 rankings with reciprocal rank fusion.
+        
+        Each chunk scores sum(1 / (rrf_k + rank)) over the rankings it appears
+        in; chunks found only lexically are rebuilt from the index's copy.
+        """
+        scores: Dict[str, float] = {}
+        docs: Dict[str, Document] = {}
+        for rank, doc in enumerate(dense, start=1):
+            key = str(doc.metadata.get("pk", id(doc)))
+            scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank)
+            docs[key] = doc
+        for rank, (chunk_id, text, metadata) in enumerate(lexical, start=1):
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + 1.0 / (self.rrf_k + rank)
+            docs.setdefault(chunk_id, Document(page_content=text, metadata={**metadata, "pk": chunk_id}))
+        
+        ranked = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [docs[key] for key in ranked]
+
+    def _search_params(self, collection: Collection) -> dict:
+        """Search params of the ``context`` index, the same ones similarity_search uses."""
+        if self.index_config is not None:
+            return self.index_config.milvus_search_params()
+        if getattr(self._store, "search_params", None) is None and hasattr(self._store, "_create_search_params"):
+            self._store._create_search_params()
+        params = getattr(self._store, "search_params", None)
+        if isinstance(params, list):
+            params = params[0] if params else None
+        if params:
+            return params
+        
+        index = next((index for index in collection.indexes if index.field_name == self._vector_field), None)
+        metric_type = index.params.get("metric_type", "L2") if index is not None else "L2"
+        return {"metric_type": metric_type, "params": {}}
+
+    @staticmethod
+    def _dedupe(results: List[List[Document]]) -> List[List[Document]]:
+        """Keep each chunk only in the result list where it ranks highest; ties go to the earlier query."""
+        best: Dict[str, Tuple[int, int]] = {}
+        for query_index, docs in enumerate(results):
+            for rank, doc in enumerate(docs):
+                key = str(doc.metadata.get("pk", id(doc)))
+                if key not in best or rank < best[key][1]:
+                    best[key] = (query_index, rank)
+        return [
+            [doc for rank, doc in enumerate(docs) if best[str(doc.metadata.get("pk", id(doc)))] == (query_index, rank)]
+            for query_index, docs in enumerate(results)
+        ]
+
+    @staticmethod
+    def _source_filter(sources: Optional[List[str]]) -> Optional[str]:
+        """Build the Milvus filter expression restricting results to ``sources``.
+        
+        ``source`` is the partition key, so the filter also prunes the search to
+        the partitions holding those sources.
         """
-        Get relevant documents using the retriever's invoke method.
+        if not sources:
+            return None
+        return f"source in {json.dumps(list(sources), ensure_ascii=False)}"
+
+    async def _run_in_executor(self, func: Callable, *args, **kwargs):
+        """Run a blocking Milvus or loader call on the vector store's worker threads."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: func(*args, **kwargs))
+
+    async def _aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self.embeddings, "aembed_documents"):
+            return await self.embeddings.aembed_documents(texts)
+        return await self._run_in_executor(self.embeddings.embed_documents, texts)
+
+    async def _aembed_query(self, text: str) -> List[float]:
+        if hasattr(self.embeddings, "aembed_query"):
+            return await self.embeddings.aembed_query(text)
+        return await self._run_in_executor(self.embeddings.embed_query, text)
+
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self.embeddings, "embed_queries"):
+            return self.embeddings.embed_queries(texts)
+        return self.embeddings.embed_documents(texts)
+
+    async def _aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self.embeddings, "aembed_queries"):
+            return await self.embeddings.aembed_queries(texts)
+        return await self._run_in_executor(self._embed_queries, texts)
+
+    async def aload_documents(self, file_paths: List[str] = None, input_dir: str = None) -> List[Document]:
+        """Async wrapper of _load_documents; parsing runs on the worker threads."""
+        return await self._run_in_executor(self._load_documents, file_paths, input_dir)
+
+    async def aindex_documents(self, documents: List[Document]) -> None:
+        """Split, embed and insert documents without blocking the event loop.
+        
+        Chunks already in the embedding cache are not sent to the server; the rest
+        are fetched with the async client. Splitting, cache I/O, the Milvus insert
+        and the flush run on the vector store's worker threads.
         """
         try:
-            search_kwargs = {"k": k}
+            splits = await self._run_in_executor(self.text_splitter.split_documents, documents)
+            logger.debug({
+                "message": "Split documents into chunks",
+                "chunk_count": len(splits)
+            })
+            if not splits:
+                return
             
-            if sources:
-                if len(sources) == 1:
-                    filter_expr = f'source == "{sources[0]}"'
-                else:
-                    source_conditions = [f'source == "{source}"' for source in sources]
-                    filter_expr = " || ".join(source_conditions)
-                
-                search_kwargs["expr"] = filter_expr
-                logger.debug({
-                    "message": "Retrieving with filter",
-                    "filter": filter_expr
-                })
+            texts = [doc.page_content for doc in splits]
+            metadatas = [doc.metadata for doc in splits]
+            vectors = await self._aembed_chunks(texts)
+            self._check_dimensions(vectors)
+            ids = await self._run_in_executor(self._add_chunks, texts, vectors, metadatas)
+            if self.lexical_index is not None:
+                await self._run_in_executor(self.lexical_index.add, ids, texts, metadatas)
+            if not self._collection_prepared:
+                await self._run_in_executor(self._prepare_collection)
+            await self._run_in_executor(self.flush_store)
             
-            retriever = self._store.as_retriever(
-                search_type="similarity",
-                search_kwargs=search_kwargs
-            )
+            logger.debug({
+                "message": "Async document indexing completed",
+                "chunk_count": len(splits)
+            })
+        except Exception as e:
+            logger.error({
+                "message": "Error during async document indexing",
+                "error": str(e)
+            }, exc_info=True)
+            raise
+
+    async def aget_documents(self, query: str, k: int = 8, sources: List[str] = None) -> List[Document]:
+        """Async counterpart of get_documents.
+        
+        The query is embedded with the async client and only the Milvus search
+        and the BM25 search run on worker threads, concurrently.
+        """
+        try:
+            candidates = k if self.lexical_index is None else k * self.hybrid_candidates
+            
+            async def dense_search() -> List[Document]:
+                vector = await self._aembed_query(query)
+                self._check_dimensions([vector])
+                return await self._run_in_executor(self._dense_search, vector, candidates, sources)
             
-            docs = retriever.invoke(query)
+            if self.lexical_index is None:
+                docs = await dense_search()
+            else:
+                dense, lexical = await asyncio.gather(
+                    dense_search(),
+                    self._run_in_executor(self.lexical_index.search, query, candidates, sources)
+                )
+                docs = self._fuse(dense, lexical, k)
             logger.debug({
                 "message": "Retrieved documents",
                 "query": query,
                 "document_count": len(docs)
             })
-            
             return docs
         except Exception as e:
             logger.error({
@@ -322,6 +1412,47 @@ class VectorStore:
             }, exc_info=True)
             return []
 
+    async def aget_documents_batch(
+        self,
+        queries: List[str],
+        k: int = 8,
+        sources: List[str] = None,
+        dedupe: bool = False
+    ) -> List[List[Document]]:
+        """Async counterpart of get_documents_batch."""
+        if not queries:
+            return []
+        try:
+            candidates = k if self.lexical_index is None else k * self.hybrid_candidates
+            
+            async def dense_search() -> List[List[Document]]:
+                vectors = await self._aembed_queries(queries)
+                self._check_dimensions(vectors)
+                return await self._run_in_executor(self._dense_search_batch, vectors, candidates, sources)
+            
+            if self.lexical_index is None:
+                results = await dense_search()
+            else:
+                dense, *lexical = await asyncio.gather(
+                    dense_search(),
+                    *(self._run_in_executor(self.lexical_index.search, query, candidates, sources) for query in queries)
+                )
+                results = [self._fuse(docs, hits, k) for docs, hits in zip(dense, lexical)]
+            if dedupe:
+                results = self._dedupe(results)
+            logger.debug({
+                "message": "Retrieved documents for query batch",
+                "query_count": len(queries),
+                "document_counts": [len(docs) for docs in results]
+            })
+            return results
+        except Exception as e:
+            logger.error({
+                "message": "Error retrieving documents for query batch",
+                "error": str(e)
+            }, exc_info=True)
+            return [[] for _ in queries]
+
     def delete_collection(self, collection_name: str) -> bool:
         """
         Delete a collection from Milvus.
@@ -333,14 +1464,15 @@ class VectorStore:
             bool: True if successful, False otherwise
         """
         try:
-            from pymilvus import connections, Collection, utility
-            
-            connections.connect(uri=self.uri)
+            collection = self._collection(collection_name)
             
-            if utility.has_collection(collection_name):
-                collection = Collection(name=collection_name)
+            if collection is not None:
+                with self._flush_lock:
+                    self._dirty_collections.discard(collection_name)
                 
                 collection.drop()
+                if collection_name == "context" and self.lexical_index is not None:
+                    self.lexical_index.delete_all()
                 
                 if self.on_source_deleted:
                     self.on_source_deleted(collection_name)
@@ -364,33 +1496,37 @@ class VectorStore:
             }, exc_info=True)
             return False
 
-    def delete_documents_by_task(self, task_id: str) -> int:
+    def delete_documents_by_task(self, task_id: str, sources: Optional[List[str]] = None) -> int:
         """
         Delete documents from the Milvus collection that were ingested for a specific task.
 
         Args:
             task_id: Identifier used when ingesting documents
+            sources: Sources the task ingested, if known; limits the delete to
+                their partitions instead of scanning every partition
 
         Returns:
             Number of deleted entities
         """
         try:
-            from pymilvus import connections, Collection, utility
+            collection = self._collection("context")
 
-            connections.connect(uri=self.uri)
-
-            if not utility.has_collection("context"):
+            if collection is None:
                 logger.warning({
                     "message": "Attempted to delete task documents from missing collection",
                     "task_id": task_id
                 })
                 return 0
 
-            collection = Collection(name="context")
-            expr = f'task_id == "{task_id}"'
+            expr = f"task_id == {json.dumps(task_id)}"
+            source_filter = self._source_filter(sources)
+            if source_filter:
+                expr = f"{source_filter} && {expr}"
             result = collection.delete(expr)
+            if self.lexical_index is not None:
+                self.lexical_index.delete_by_task(task_id)
 
-            collection.flush()
+            self.flush_store("context")
 
             delete_count = getattr(result, "delete_count", 0)
             logger.debug({
@@ -407,10 +1543,21 @@ class VectorStore:
             }, exc_info=True)
             raise
 
+    async def adelete_documents_by_task(self, task_id: str, sources: Optional[List[str]] = None) -> int:
+        """Delete a task's documents on the vector store's worker threads.
+        
+        See delete_documents_by_task; the Milvus delete and flush block, so
+        request handlers call this instead.
+        """
+        return await self._run_in_executor(self.delete_documents_by_task, task_id, sources)
+
 
 def create_vector_store_with_config(config_manager, uri: str = "http://milvus:19530") -> VectorStore:
     """Factory function to create a VectorStore with ConfigManager integration.
     
+    VECTOR_STORE_BACKEND=local selects the in-process LocalVectorStore, stored
+    under LOCAL_VECTOR_STORE_PATH, instead of Milvus.
+    
     Args:
         config_manager: ConfigManager instance for source management
         uri: Milvus connection URI
@@ -425,8 +1572,21 @@ def create_vector_store_with_config(config_manager, uri: str = "http://milvus:19
             config.sources.remove(source_name)
             config_manager.write_config(config)
     
+    if os.getenv("VECTOR_STORE_BACKEND", "milvus").lower() == "local":
+        from local_vector_store import LocalVectorStore
+        return LocalVectorStore(
+            path=os.getenv(
+                "LOCAL_VECTOR_STORE_PATH",
+                os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_vector_store")
+            ),
+            on_source_deleted=handle_source_deleted,
+            quantization=os.getenv("LOCAL_VECTOR_QUANTIZATION", "none").lower(),
+            rescore_factor=int(os.getenv("LOCAL_VECTOR_RESCORE_FACTOR", 0)) or None
+        )
+    
     return VectorStore(
         uri=uri,
-        on_source_deleted=handle_source_deleted
+        on_source_deleted=handle_source_deleted,
+        index_config=config_manager.read_config().vector_indexes.get("context")
     )
 
@@ -204,6 +204,8 @@ export default function QuerySection({
   const tokenBufferRef = useRef("");
   const tokenFlushScheduledRef = useRef(false);
   const tokenFlushHandleRef = useRef<number | null>(null);
+  const historyCursorRef = useRef<number | null>(null);
+  const loadingOlderRef = useRef(false);
 
   const appendAssistantChunk = useCallback((chunk: string) => {
     if (!chunk) return;
@@ -360,6 +362,8 @@ export default function QuerySection({
                 setResponseRef.current(JSON.stringify(msg.messages));
                 setIsStreamingRef.current(false);
               }
+              historyCursorRef.current = msg.has_more ? msg.cursor : null;
+              loadingOlderRef.current = false;
               setToolOutput("");
               if (tokenFlushHandleRef.current !== null) {
                 cancelAnimationFrame(tokenFlushHandleRef.current);
@@ -371,6 +375,29 @@ export default function QuerySection({
               hasAssistantContent.current = false;
               break;
             }
+            case "history_older": {
+              historyCursorRef.current = msg.has_more ? msg.cursor : null;
+              loadingOlderRef.current = false;
+              if (Array.isArray(msg.messages) && msg.messages.length > 0) {
+                const container = chatContainerRef.current;
+                const previousHeight = container ? container.scrollHeight : 0;
+                setResponseRef.current(prev => {
+                  try {
+                    const messages = JSON.parse(prev);
+                    return JSON.stringify([...msg.messages, ...(Array.isArray(messages) ? messages : [])]);
+                  } catch {
+                    return JSON.stringify(msg.messages);
+                  }
+                });
+                // Keep the viewport anchored on the message the user was reading
+                requestAnimationFrame(() => {
+                  if (container) {
+                    container.scrollTop += container.scrollHeight - previousHeight;
+                  }
+                });
+              }
+              break;
+            }
             case "tool_token": {
               if (text !== undefined && text !== "undefined") {
                 setToolOutput(prev => prev + text);
@@ -572,6 +599,20 @@ export default function QuerySection({
     const handleScroll = () => {
       isUserScrollingRef.current = true;
       checkScrollPosition();
+
+      // Lazily page in older history once the user reaches the top
+      if (
+        container.scrollTop < 50 &&
+        historyCursorRef.current !== null &&
+        !loadingOlderRef.current &&
+        wsRef.current?.readyState === WebSocket.OPEN
+      ) {
+        loadingOlderRef.current = true;
+        wsRef.current.send(JSON.stringify({
+          type: "load_older",
+          before: historyCursorRef.current,
+        }));
+      }
       
       // Reset user scrolling flag after scroll stops
       clearTimeout(scrollTimer);